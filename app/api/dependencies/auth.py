@@ -11,43 +11,78 @@ from app.infrastructure.db.database import get_db
 from app.infrastructure.db.config import get_settings
 from app.infrastructure.db.models.user import User
 from app.core.security import decode_access_token
+from app.core.metrics import PRINCIPAL_CACHE_LOOKUPS
+from app.core.principal import Principal, get_principal_cache
+from app.infrastructure.repositories.users import UserProfile, UserRepository
 
 settings = get_settings()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-async def _get_user_by_id(user_id: str, db: AsyncSession) -> Optional[User]:
-    res = await db.execute(select(User).where(User.id == user_id))
-    return res.scalar_one_or_none()
+async def _get_user_by_id(
+    user_id: str, db: AsyncSession, profile: UserProfile = UserProfile.FULL
+) -> Optional[User]:
+    return await UserRepository.get_by_id(db, user_id, profile)
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
-    credentials_exc = HTTPException(
+async def _get_principal_by_id(user_id: str, db: AsyncSession) -> Optional[Principal]:
+    # только колонки идентичности: ORM-объект и его связи не поднимаются
+    res = await db.execute(select(User.id, User.email, User.is_admin).where(User.id == user_id))
+    row = res.first()
+    if row is None:
+        return None
+    return Principal(id=str(row.id), email=row.email, is_admin=bool(row.is_admin))
+
+def _credentials_exc() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+async def get_current_principal(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> Principal:
+    """
+    Идентичность из токена. Повторные запросы с тем же токеном обслуживаются
+    из кэша (sub, iat) без обращения к users.
+    """
     try:
         payload = decode_access_token(token)
         user_id: Optional[str] = payload.get("sub")
         if not user_id:
-            raise credentials_exc
+            raise _credentials_exc()
     except JWTError:
-        raise credentials_exc
+        raise _credentials_exc()
 
-    user = await _get_user_by_id(user_id, db)
+    cache = get_principal_cache()
+    iat = payload.get("iat")
+    principal = cache.get(user_id, iat)
+    PRINCIPAL_CACHE_LOOKUPS.labels("hit" if principal is not None else "miss").inc()
+    if principal is None:
+        principal = await _get_principal_by_id(user_id, db)
+        if principal is None:
+            raise _credentials_exc()
+        cache.set(user_id, iat, principal)
+    return principal
+
+async def get_current_user(
+    principal: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> User:
+    """Полный ORM-пользователь — только для мест, которым он действительно нужен."""
+    user = await _get_user_by_id(principal.id, db)
     if not user:
-        raise credentials_exc
+        get_principal_cache().invalidate(principal.id)
+        raise _credentials_exc()
     return user
 
 async def get_current_admin(
-    current_user: Annotated[User, Depends(get_current_user)],
-) -> User:
-    if not current_user.is_admin:
+    principal: Annotated[Principal, Depends(get_current_principal)],
+) -> Principal:
+    if not principal.is_admin:
         raise HTTPException(status_code=403, detail="Admin privileges required")
-    return current_user
+    return principal
 
 oauth2_optional = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 
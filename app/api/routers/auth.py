@@ -7,9 +7,11 @@ from sqlalchemy.exc import IntegrityError
 from app.infrastructure.db.database import get_db
 from app.infrastructure.db.config import get_settings
 from app.core.security import create_access_token
-from app.api.dependencies.auth import get_current_user
+from app.api.dependencies.auth import get_current_principal
+from app.core.principal import Principal
 from app.infrastructure.db.models.user import User
 from app.infrastructure.db.models.wallet import Wallet
+from app.infrastructure.repositories.users import UserProfile, UserRepository
 from app.domain.schemas.auth import TokenOut, ProfileOut, SignResponse, UserAuth
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -22,23 +24,16 @@ async def register(data: UserAuth, db: AsyncSession = Depends(get_db)) -> SignRe
     Регистрация пользователя. Создаёт пустой кошелёк.
     """
     email = (data.email or "").strip().lower()
+    # bcrypt — в пуле потоков и до транзакции, чтобы не держать её открытой на время хеширования
+    user = User(email=email)
+    await user.set_password_async(data.password)
+
     async with db.begin():
         # предикативная проверка (идемпотентность)
-        res = await db.execute(select(User).where(User.email == email))
-        if res.scalar_one_or_none():
+        exists = await db.scalar(select(User.id).where(User.email == email))
+        if exists:
             raise HTTPException(status_code=400, detail="User with this email already exists")
 
-        # создание пользователя
-        user = User(email=email)
-        if not hasattr(user, "set_password"):
-            # fallback: если set_password отсутствует, но есть фабрика
-            if hasattr(User, "create_instance"):
-                user = User.create_instance(email=email, password=data.password, initial_balance=0)
-            else:
-                raise HTTPException(status_code=500, detail="User model missing set_password()")
-        else:
-            user.set_password(data.password)
-
         db.add(user)
         await db.flush()
 
@@ -55,11 +50,14 @@ async def login(data: UserAuth, db: AsyncSession = Depends(get_db)) -> TokenOut:
     Логин по email + password. Возвращает JWT access token.
     """
     email = (data.email or "").strip().lower()
-    res = await db.execute(select(User).where(User.email == email))
-    user = res.scalar_one_or_none()
+    # нужен хеш пароля, но не история
+    user = await UserRepository.get_by_email(db, email, UserProfile.FULL)
 
-    if not user or not hasattr(user, "check_password") or not user.check_password(data.password):
+    if not user or not await user.check_password_async(data.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if db.is_modified(user):
+        # хеш пересчитан под новый cost
+        await db.commit()
 
     token = create_access_token(
         data={"sub": str(user.id)},
@@ -74,5 +72,5 @@ async def login(data: UserAuth, db: AsyncSession = Depends(get_db)) -> TokenOut:
 
 
 @router.get("/me", response_model=ProfileOut)
-async def me(current_user: User = Depends(get_current_user)) -> ProfileOut:
+async def me(current_user: Principal = Depends(get_current_principal)) -> ProfileOut:
     return ProfileOut(id=str(current_user.id), email=current_user.email)
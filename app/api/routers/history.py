@@ -1,119 +1,201 @@
 #app/api/routers/history.py
-from fastapi import APIRouter, Depends
-from sqlalchemy import select, desc
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any
-from app.infrastructure.db.database import get_db
-from app.api.dependencies.auth import get_current_user
-from app.infrastructure.db.models.user import User
+from app.infrastructure.db.database import get_read_db, ReadSessionLocal
+from app.api.dependencies.auth import get_current_principal, get_current_admin
+from app.core.settings import get_settings
+from app.core.principal import Principal
 from app.infrastructure.db.models.transaction import Transaction
 from app.infrastructure.db.models.translation import Translation
 from app.domain.schemas.classes import TranslationItem, TransactionItem
+from app.infrastructure.repositories.history import (
+    EXPORT_COLUMNS,
+    HistoryRepository,
+    InvalidCursor,
+    export_query,
+    stream_export,
+)
 
 router = APIRouter(prefix="/history", tags=["history"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+async def _page(db, model, user_id: str, response: Response, *, limit: int, cursor: Optional[str], skip: int):
+    try:
+        items, next_cursor = await HistoryRepository.page(
+            db, model, user_id, limit=limit, cursor=cursor, skip=skip
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
+
 @router.get("/translations", response_model=list[TranslationItem])
 async def list_translations(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     История переводов текущего пользователя.
-    По умолчанию — последние 100 записей.
+    По умолчанию — последние 100 записей. Следующая страница — по курсору
+    из заголовка X-Next-Cursor (skip оставлен для совместимости).
     """
-    stmt = (
-        select(Translation)
-        .where(Translation.user_id == current_user.id)
-        .order_by(desc(Translation.timestamp))
-        .offset(skip)
-        .limit(limit)
-    )
-    result = await db.execute(stmt)
-    items = result.scalars().all()
-    return items
+    return await _page(db, Translation, current_user.id, response, limit=limit, cursor=cursor, skip=skip)
 
 
 @router.get("/transactions", response_model=list[TransactionItem])
 async def list_transactions(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     История транзакций кошелька текущего пользователя.
-    По умолчанию — последние 100 записей.
+    По умолчанию — последние 100 записей, постранично — как /translations.
     """
-    stmt = (
-        select(Transaction)
-        .where(Transaction.user_id == current_user.id)
-        .order_by(desc(Transaction.timestamp))
-        .offset(skip)
-        .limit(limit)
-    )
-    result = await db.execute(stmt)
-    items = result.scalars().all()
-    return items
+    return await _page(db, Transaction, current_user.id, response, limit=limit, cursor=cursor, skip=skip)
 
 
 @router.get("/", response_model=list[TranslationItem], include_in_schema=False)
 async def history_root(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    return await list_translations(skip=skip, limit=limit, db=db, current_user=current_user)
+    return await list_translations(
+        response=response, skip=skip, limit=limit, cursor=cursor, db=db, current_user=current_user
+    )
 
 @router.get("", response_model=list[dict[str, Any]])
 async def history(
+    response: Response,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    # забираем последние записи отдельно
-    tr_stmt = (
-        select(Translation)
-        .where(Translation.user_id == current_user.id)
-        .order_by(desc(Translation.timestamp))
-        .limit(limit)
+    """
+    Общая лента переводов и транзакций, новые сверху.
+    Слияние, сортировка и обрезка — в БД одним запросом; продолжение — по X-Next-Cursor.
+    """
+    try:
+        items, next_cursor = await HistoryRepository.timeline(
+            db, current_user.id, limit=limit, cursor=cursor
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
+
+
+# ───────────── потоковый экспорт ─────────────
+ExportKind = Literal["translations", "transactions"]
+ExportFormat = Literal["ndjson", "csv"]
+
+
+def _cell(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def _ndjson(chunks: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[str]:
+    async for rows in chunks:
+        yield "".join(
+            json.dumps({k: _cell(v) for k, v in row.items()}, ensure_ascii=False) + "\n" for row in rows
+        )
+
+
+async def _csv(chunks: AsyncIterator[List[Dict[str, Any]]], columns) -> AsyncIterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    async for rows in chunks:
+        writer.writerows([_cell(row[c]) for c in columns] for row in rows)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def _export_response(
+    kind: str,
+    fmt: str,
+    *,
+    user_id: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    source_lang: Optional[str],
+    target_lang: Optional[str],
+) -> StreamingResponse:
+    stmt = export_query(
+        kind, user_id=user_id, since=since, until=until,
+        source_lang=source_lang, target_lang=target_lang,
+    )
+    chunks = stream_export(ReadSessionLocal, stmt, get_settings().EXPORT_BATCH_ROWS)
+    if fmt == "csv":
+        body, media_type = _csv(chunks, EXPORT_COLUMNS[kind]), "text/csv; charset=utf-8"
+    else:
+        body, media_type = _ndjson(chunks), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{fmt}"'},
     )
-    tx_stmt = (
-        select(Transaction)
-        .where(Transaction.user_id == current_user.id)
-        .order_by(desc(Transaction.timestamp))
-        .limit(limit)
+
+
+@router.get("/export")
+async def export_history(
+    kind: ExportKind = "translations",
+    format: ExportFormat = "ndjson",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    source_lang: Optional[str] = None,
+    target_lang: Optional[str] = None,
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Вся история пользователя одним потоком (NDJSON или CSV), память постоянная.
+    since/until — полуинтервал [since, until); языковая пара — только для переводов.
+    """
+    return _export_response(
+        kind, format, user_id=current_user.id, since=since, until=until,
+        source_lang=source_lang, target_lang=target_lang,
     )
 
-    tr_res = await db.execute(tr_stmt)
-    tx_res = await db.execute(tx_stmt)
-    translations = tr_res.scalars().all()
-    transactions = tx_res.scalars().all()
-
-    # приводим к единому виду, где у переводов есть source_text
-    items: list[dict[str, Any]] = []
-
-    for t in translations:
-        items.append({
-            "kind": "translation",
-            "timestamp": t.timestamp,
-            "source_text": t.input_text,     # <-- ключ, который ждут тесты
-            "output_text": t.output_text,
-            "source_lang": t.source_lang,
-            "target_lang": t.target_lang,
-            "cost": t.cost,
-        })
-
-    for tx in transactions:
-        items.append({
-            "kind": "transaction",
-            "timestamp": tx.timestamp,
-            "type": tx.type,
-            "amount": tx.amount,
-        })
-
-    # общая сортировка по времени по убыванию и обрезка до limit
-    items.sort(key=lambda x: x["timestamp"], reverse=True)
-    return items[:limit]
\ No newline at end of file
+
+@router.get("/admin/export")
+async def export_history_admin(
+    kind: ExportKind = "translations",
+    format: ExportFormat = "ndjson",
+    user_id: Optional[str] = Query(None, description="без user_id — по всем пользователям"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    source_lang: Optional[str] = None,
+    target_lang: Optional[str] = None,
+    admin: Principal = Depends(get_current_admin),
+):
+    """Экспорт для администратора: по одному пользователю или по всем."""
+    return _export_response(
+        kind, format, user_id=user_id, since=since, until=until,
+        source_lang=source_lang, target_lang=target_lang,
+    )
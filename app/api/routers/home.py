@@ -1,7 +1,10 @@
 ## app/api/routers/home.py
-from typing import Dict
+from typing import Any, Dict
 from fastapi import APIRouter, HTTPException
 
+from app.core.settings import get_settings
+from app.domain.services.translation_request import Model
+
 router = APIRouter(tags=["Home"])
 
 @router.get("/", response_model=Dict[str, str])
@@ -10,7 +13,13 @@ async def index() -> Dict[str, str]:
 
 @router.get("/health", response_model=Dict[str, str])
 async def health() -> Dict[str, str]:
+    if get_settings().INFERENCE_WARMUP_ON_START and not Model.readiness()["ready"]:
+        raise HTTPException(status_code=503, detail="Models are warming up")
     try:
         return {"status": "healthy"}
     except Exception:
-        raise HTTPException(status_code=503, detail="Service unavailable")
\ No newline at end of file
+        raise HTTPException(status_code=503, detail="Service unavailable")
+
+@router.get("/health/inference", response_model=Dict[str, Any])
+async def health_inference() -> Dict[str, Any]:
+    return Model.readiness()
\ No newline at end of file
@@ -1,95 +1,344 @@
 # app/api/routers/translate.py
-from fastapi import APIRouter, Depends, HTTPException
+import json
+import time
+import uuid
+
+from typing import Optional
+
+import asyncio
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.infrastructure.db.database import get_db
-from app.api.dependencies.auth import get_current_user
-from app.infrastructure.db.models.user import User
-from app.infrastructure.db.models.wallet import Wallet
+from app.infrastructure.db.database import ReadSessionLocal, get_db, get_read_db
+from app.api.dependencies.auth import get_current_principal
+from app.core.principal import Principal
 from app.infrastructure.db.models.transaction import Transaction, TransactionType
 from app.infrastructure.db.models.translation import Translation
-from app.domain.schemas.classes import TranslationIn, TranslationOut, TranslationOutQueued
-from app.domain.services.bus import publish_task
+from app.infrastructure.db.models.task import TERMINAL_STATUSES
+from app.infrastructure.repositories.tasks import TaskStateRepository
+from app.core.settings import get_settings
+from app.domain.schemas.classes import (
+    TranslationIn,
+    TranslationOut,
+    TranslationOutQueued,
+    TranslationBatchIn,
+    TranslationBatchQueued,
+)
+from app.domain.services.bus import publish_task_async, publish_batch_async
+from app.domain.services.inference import InferenceBusy, get_inference_service
+from app.domain.services.translation_request import Model
+from app.domain.services.admission import admit_tasks
+from app.domain.services.wallet_ledger import InsufficientFunds, WalletLedger, WalletNotFound, ledger_id
+from app.infrastructure.bus.publisher import PublishError
+from app.infrastructure.bus.topology import lane_for
+from app.infrastructure.bus.events import get_event_hub
 
 router = APIRouter(prefix="/translate", tags=["Translate"])
 
+SSE_KEEPALIVE_S = 15.0
+
 
 @router.post("/queue", response_model=TranslationOutQueued)
 async def translate_queue(
     data: TranslationIn,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     if not data.input_text or len(data.input_text.strip()) == 0:
         raise HTTPException(422, "input_text is empty")
 
-    task_id = publish_task({
-        "user_id": str(current_user.id),
-        "input_text": data.input_text,
-        "source_lang": data.source_lang,
-        "target_lang": data.target_lang,
-        "model": getattr(data, "model", "marian"),
-    })
+    task_id = await _enqueue(db, str(current_user.id), data)
     return {"task_id": task_id, "status": "queued"}
 
-@router.get("/task/{task_id}", response_model=TranslationOutQueued)
-async def get_task_status(task_id: str, db: AsyncSession = Depends(get_db)):
+
+async def _admit(db: AsyncSession, user_id: str, n_items: int):
+    """Контроль допуска: 429 + Retry-After при перегруженной очереди или лимите пользователя."""
+    decision = await admit_tasks(db, user_id, n_items)
+    if decision.rejected:
+        raise HTTPException(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            decision.reason,
+            headers={"Retry-After": str(decision.retry_after_s)},
+        )
+    return decision
+
+
+async def _enqueue(db: AsyncSession, user_id: str, data, task_id: Optional[str] = None) -> str:
+    """Одна задача в очередь воркеров; 429 по контролю допуска, 503, если брокер недоступен."""
+    decision = await _admit(db, user_id, 1)
+    # состояние пишем до публикации: воркер может взять задачу раньше, чем мы ответим
+    task_id = task_id or str(uuid.uuid4())
+    await TaskStateRepository.mark_queued(db, [task_id], user_id)
+    await db.commit()
+
+    try:
+        await publish_task_async({
+            "correlation_id": task_id,
+            "user_id": user_id,
+            "input_text": data.input_text,
+            "source_lang": data.source_lang,
+            "target_lang": data.target_lang,
+            "model": getattr(data, "model", "marian"),
+            "priority": decision.priority,
+            # пониженные допуском задачи уходят в bulk и не задерживают интерактивные
+            "lane": lane_for(decision.priority),
+        })
+    except PublishError:
+        await TaskStateRepository.mark_failed(db, [task_id], user_id, "message broker is unavailable")
+        await db.commit()
+        raise HTTPException(503, "Message broker is unavailable, try again later")
+    return task_id
+
+@router.post("/queue/batch", response_model=TranslationBatchQueued)
+async def translate_queue_batch(
+    data: TranslationBatchIn,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Пакетная постановка в очередь: один HTTP-запрос и одно AMQP-сообщение на всю пачку.
+    """
+    max_items = get_settings().QUEUE_BATCH_MAX_ITEMS
+    if len(data.items) > max_items:
+        raise HTTPException(422, f"too many items, max {max_items}")
+    empty = [i for i, item in enumerate(data.items) if not item.input_text or not item.input_text.strip()]
+    if empty:
+        raise HTTPException(422, f"input_text is empty in items {empty}")
+
+    user_id = str(current_user.id)
+    decision = await _admit(db, user_id, len(data.items))
+    task_ids = [str(uuid.uuid4()) for _ in data.items]
+    await TaskStateRepository.mark_queued(db, task_ids, user_id)
+    await db.commit()
+
+    try:
+        await publish_batch_async(user_id, [
+            {
+                "input_text": item.input_text,
+                "source_lang": item.source_lang,
+                "target_lang": item.target_lang,
+                "model": item.model,
+            }
+            for item in data.items
+        ], task_ids=task_ids, priority=decision.priority)
+    except PublishError:
+        await TaskStateRepository.mark_failed(db, task_ids, user_id, "message broker is unavailable")
+        await db.commit()
+        raise HTTPException(503, "Message broker is unavailable, try again later")
+    return {"tasks": [{"task_id": tid, "status": "queued"} for tid in task_ids]}
+
+async def _task_status(db: AsyncSession, task_id: str) -> dict:
+    # db — сессия реплики: только что поставленная задача может быть ещё не видна,
+    # тогда ответ "pending", а терминальный статус всё равно придёт событием
+    status = await TaskStateRepository.get_status(db, task_id)
+    if status is not None:
+        return status
+    # задачи, поставленные до появления таблицы tasks
     result = await db.execute(select(Translation).where(Translation.external_id == task_id))
     tr = result.scalar_one_or_none()
     if not tr:
         return {"task_id": task_id, "status": "pending"}
     return {"task_id": task_id, "status": "done", "output_text": tr.output_text, "cost": tr.cost}
 
+
+def _event_status(task_id: str, event: dict) -> dict:
+    return {
+        "task_id": task_id,
+        "status": event.get("status", "done"),
+        "output_text": event.get("output_text"),
+        "cost": event.get("cost"),
+        "error": event.get("error"),
+    }
+
+
+async def _read_task_status(task_id: str) -> dict:
+    """Статус в короткой сессии: соединение из пула возвращается сразу после чтения."""
+    async with ReadSessionLocal() as db:
+        return await _task_status(db, task_id)
+
+
+@router.get("/task/{task_id}", response_model=TranslationOutQueued)
+async def get_task_status(
+    task_id: str,
+    wait: float = Query(0, ge=0, description="long-poll: сколько секунд ждать завершения"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    hub = get_event_hub()
+    if wait <= 0 or hub is None:
+        return await _task_status(db, task_id)
+
+    # подписываемся до проверки статуса, чтобы не пропустить событие между ними
+    q = await hub.subscribe(task_id)
+    try:
+        status = await _task_status(db, task_id)
+        if status["status"] in TERMINAL_STATUSES:
+            return status
+        # на время ожидания не держим ни транзакцию, ни соединение из пула
+        await db.close()
+        event = await hub.wait(q, timeout=min(wait, get_settings().TASK_WAIT_MAX_S))
+        if event is not None:
+            return _event_status(task_id, event)
+        return await _read_task_status(task_id)
+    finally:
+        await hub.unsubscribe(task_id, q)
+
+
+@router.get("/task/{task_id}/events")
+async def task_events(task_id: str):
+    """
+    Server-sent events: одно событие с итоговым статусом задачи,
+    пока ждём — комментарии-keepalive. БД читается короткими сессиями:
+    в начале и, если событие так и не пришло, перед ответом timeout.
+    """
+    hub = get_event_hub()
+    if hub is None:
+        raise HTTPException(503, "Task events are not available")
+
+    q = await hub.subscribe(task_id)
+    try:
+        status = await _read_task_status(task_id)
+    except Exception:
+        await hub.unsubscribe(task_id, q)
+        raise
+
+    async def _stream():
+        try:
+            if status["status"] in TERMINAL_STATUSES:
+                yield f"event: {status['status']}\ndata: {json.dumps(status, default=str)}\n\n"
+                return
+            deadline = time.monotonic() + get_settings().TASK_WAIT_MAX_S
+            while time.monotonic() < deadline:
+                event = await hub.wait(q, timeout=min(SSE_KEEPALIVE_S, deadline - time.monotonic()))
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                payload = _event_status(task_id, event)
+                yield f"event: {payload['status']}\ndata: {json.dumps(payload)}\n\n"
+                return
+            final = await _read_task_status(task_id)
+            kind = final["status"] if final["status"] in TERMINAL_STATUSES else "timeout"
+            yield f"event: {kind}\ndata: {json.dumps(final, default=str)}\n\n"
+        finally:
+            await hub.unsubscribe(task_id, q)
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # --- СИНХРОННЫЙ ПЕРЕВОД ПО /translate
-@router.post("", response_model=TranslationOut)  # путь "/translate"
+@router.post(  # путь "/translate"
+    "",
+    response_model=TranslationOut,
+    responses={status.HTTP_202_ACCEPTED: {"model": TranslationOutQueued}},
+)
 async def translate_sync(
     data: TranslationIn,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
     text = getattr(data, "input_text", None) or getattr(data, "text", None)
-    source = getattr(data, "source_lang", None)
-    target = getattr(data, "target_lang", None)
+    source = (getattr(data, "source_lang", None) or "").strip().lower()
+    target = (getattr(data, "target_lang", None) or "").strip().lower()
 
     if not text or len(text.strip()) == 0:
         raise HTTPException(status_code=422, detail="input_text is empty")
-
-    # найдём/создадим кошелёк
-    result = await db.execute(select(Wallet).where(Wallet.user_id == current_user.id))
-    wallet: Wallet | None = result.scalar_one_or_none()
-    if wallet is None:
-        wallet = Wallet(user_id=current_user.id, balance=0)
-        db.add(wallet)
-        await db.flush()
+    if (source, target) not in Model.SUPPORTED_MODELS:
+        raise HTTPException(422, "Модель перевода не поддерживается")
 
     # считаем стоимость
     cost = 1
+    user_id = str(current_user.id)
+
+    # повтор запроса с тем же Idempotency-Key отдаёт уже записанный перевод
+    if idempotency_key:
+        external_id = ledger_id(user_id, f"translate:{idempotency_key}")
+        existing = await db.scalar(select(Translation).where(Translation.external_id == external_id))
+        if existing is not None:
+            return TranslationOut.model_validate(existing)
+    else:
+        external_id = str(uuid.uuid4())
+
+    # резерв до инференса: без средств — 402 и модель не вызывается;
+    # коммитим сразу, чтобы строка кошелька не была заблокирована на время перевода
+    try:
+        hold = await WalletLedger.hold(db, user_id, cost, idempotency_key=external_id)
+    except (InsufficientFunds, WalletNotFound):
+        await db.rollback()
+        raise HTTPException(status.HTTP_402_PAYMENT_REQUIRED, "Недостаточно средств на балансе")
+    await db.commit()
+    if not hold.applied:
+        # тот же ключ уже в работе: параллельный запрос или задача в очереди
+        return await _replay_in_progress(db, external_id)
 
-    # имитация перевода
-    output = text
+    # перевод через общий с воркером сервис; перегружен — уходим в очередь,
+    # задача получает external_id, так что повтор с тем же ключом не переведёт дважды
+    try:
+        output = await get_inference_service().translate_sync(text, source, target)
+    except InferenceBusy:
+        # очередь резервирует сама, по тому же ключу
+        await _release_hold(db, user_id, external_id)
+        task_id = await _enqueue(db, user_id, data, task_id=external_id)
+        return _queued(task_id)
+    except asyncio.TimeoutError:
+        await _release_hold(db, user_id, external_id)
+        raise HTTPException(status.HTTP_504_GATEWAY_TIMEOUT, "Translation timed out, try /translate/queue")
+    except Exception:
+        await _release_hold(db, user_id, external_id)
+        raise
 
-    # записываем перевод
+    # резерв → списание в одной транзакции с переводом и записью журнала
     tr = Translation(
-        user_id=current_user.id,
+        user_id=user_id,
         input_text=text,
         output_text=output,
         source_lang=data.source_lang,
         target_lang=data.target_lang,
-        cost=cost if wallet.balance >= cost else 0,
+        cost=cost,
+        external_id=external_id,
     )
-    db.add(tr)
-
-    # списание только если хватает средств
-    if wallet.balance >= cost:
-        wallet.balance -= cost
-        txn = Transaction(
-            user_id=current_user.id,
-            amount=1,
+    try:
+        db.add(tr)
+        db.add(Transaction(
+            id=ledger_id(user_id, external_id),
+            user_id=user_id,
+            amount=cost,
             type=TransactionType.DEBIT.value,  # << строка "DEBIT"
-        )
-        db.add(txn)
-
-    await db.commit()
+        ))
+        await db.flush()
+        await WalletLedger.settle(db, user_id, idempotency_key=external_id)
+        await db.commit()
+    except Exception:
+        await _release_hold(db, user_id, external_id)
+        raise
     # возвращаем из ORM в Pydantic v2
     return TranslationOut.model_validate(tr)
+
+
+def _queued(task_id: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"task_id": task_id, "status": "queued"},
+        headers={"Location": f"/translate/task/{task_id}"},
+    )
+
+
+async def _release_hold(db: AsyncSession, user_id: str, external_id: str) -> None:
+    """Возврат резерва синхронного перевода; не вернули здесь — вернёт reconciler воркера."""
+    await db.rollback()
+    await WalletLedger.release(db, user_id, idempotency_key=external_id)
+    await db.commit()
+
+
+async def _replay_in_progress(db: AsyncSession, external_id: str):
+    existing = await db.scalar(select(Translation).where(Translation.external_id == external_id))
+    if existing is not None:
+        return TranslationOut.model_validate(existing)
+    if await TaskStateRepository.get_status(db, external_id) is not None:
+        return _queued(external_id)
+    raise HTTPException(status.HTTP_409_CONFLICT, "Request with this Idempotency-Key is in progress")
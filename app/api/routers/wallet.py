@@ -1,14 +1,17 @@
 # app/api/routers/wallet.py
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.infrastructure.db.database import get_db
-from app.api.dependencies.auth import get_current_user
-from app.infrastructure.db.models.user import User
+from app.api.dependencies.auth import get_current_principal
+from app.core.principal import Principal
 from app.infrastructure.db.models.wallet import Wallet
 from app.infrastructure.db.models.transaction import Transaction, TransactionType
 from app.domain.schemas.classes import TopUpIn, BalanceOut
+from app.domain.services.wallet_ledger import WalletLedger
 
 router = APIRouter(prefix="/wallet", tags=["wallet"])
 
@@ -16,7 +19,7 @@ router = APIRouter(prefix="/wallet", tags=["wallet"])
 @router.get("/", response_model=BalanceOut)
 async def get_balance(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Получить текущий баланс кошелька пользователя.
@@ -36,33 +39,28 @@ async def get_balance(
 @router.get("/balance")
 async def get_balance_alias(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     return await get_balance(db=db, current_user=current_user)
 
 @router.post("/topup", response_model=BalanceOut)
-async def topup(data: TopUpIn, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def topup(
+    data: TopUpIn,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
     if data.amount <= 0:
         raise HTTPException(status_code=400, detail="amount must be positive")
 
-    # найдём/создадим кошелёк
-    res = await db.execute(select(Wallet).where(Wallet.user_id == current_user.id))
-    wallet = res.scalar_one_or_none()
-    if wallet is None:
-        wallet = Wallet(user_id=current_user.id, balance=0)
-        db.add(wallet)
-        await db.flush()
-
-    wallet.balance += data.amount
-
-
-    txn = Transaction(
-        user_id=current_user.id,
-        amount=data.amount,
-        type=TransactionType.TOPUP.value,
+    # одно условное UPDATE ... RETURNING + запись в журнал; повтор с тем же ключом не начисляет
+    result = await WalletLedger.credit(
+        db,
+        current_user.id,
+        data.amount,
+        tx_type=TransactionType.TOPUP.value,
+        idempotency_key=f"topup:{idempotency_key}" if idempotency_key else None,
+        create_wallet=True,
     )
-    db.add(txn)
-
     await db.commit()
-    await db.refresh(wallet)
-    return BalanceOut(balance=wallet.balance)
+    return BalanceOut(balance=result.balance)
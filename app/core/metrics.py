@@ -0,0 +1,183 @@
+# app/core/metrics.py
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Iterable, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# Метрики процесса (API или воркер). Обновление — счётчик/гистограмма под локом
+# в памяти процесса, без I/O: дёшево держать включённым в проде.
+# Лейблы — только с ограниченным набором значений: шаблон маршрута, языковая пара, очередь.
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_INFERENCE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+_BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+# === HTTP ===
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса",
+    ("method", "route", "status"), buckets=_LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP-запросы в обработке")
+
+# === AMQP ===
+AMQP_PUBLISH_SECONDS = Histogram(
+    "amqp_publish_duration_seconds", "Публикация в брокер до publisher confirm",
+    ("queue",), buckets=_LATENCY_BUCKETS,
+)
+AMQP_PUBLISH_FAILURES = Counter(
+    "amqp_publish_failures_total", "Публикации, не подтверждённые брокером сразу",
+    ("queue", "outcome"),   # outcome: buffered | rejected
+)
+AMQP_CONSUME_SECONDS = Histogram(
+    "amqp_consume_duration_seconds", "Обработка сообщения воркером от получения до ack",
+    ("lane", "outcome"), buckets=_INFERENCE_BUCKETS,  # outcome: done | retry | failed | requeued | bad_message
+)
+AMQP_QUEUE_DEPTH = Gauge("amqp_queue_depth", "Сообщений в очереди по данным брокера", ("queue",))
+WORKER_LANE_PENDING = Gauge(
+    "worker_lane_pending", "Полученные воркером, но ещё не начатые сообщения полосы", ("lane",),
+)
+WORKER_LANE_DISPATCHED = Counter(
+    "worker_lane_dispatched_total", "Сообщения, отданные планировщиком воркера в обработку", ("lane",),
+)
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions_total", "Решения контроля допуска в очередь", ("action",),  # accept | downgrade | reject
+)
+ADMISSION_ESTIMATED_WAIT = Gauge("admission_estimated_wait_seconds", "Оценка ожидания новой задачи в очереди")
+
+# === Inference ===
+INFERENCE_SECONDS = Histogram(
+    "inference_batch_duration_seconds", "Один вызов модели на пачку текстов",
+    ("pair",), buckets=_INFERENCE_BUCKETS,
+)
+INFERENCE_TOKENS = Counter(
+    "inference_input_tokens_total", "Входные токены, прошедшие через модель (tokens/sec = rate())",
+    ("pair",),
+)
+INFERENCE_ERRORS = Counter("inference_errors_total", "Ошибки вызова модели", ("pair",))
+INFERENCE_PADDED_TOKENS = Counter(
+    "inference_padded_tokens_total", "Токены с паддингом, которые реально считает модель", ("pair",),
+)
+INFERENCE_PADDING_EFFICIENCY = Histogram(
+    "inference_padding_efficiency", "Доля реальных токенов в пачке (1.0 — без паддинга)",
+    ("pair",), buckets=(0.1, 0.25, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0),
+)
+BATCH_SIZE = Histogram(
+    "inference_batch_size", "Текстов в одном вызове модели", ("pair",), buckets=_BATCH_BUCKETS,
+)
+BATCH_WAIT_SECONDS = Histogram(
+    "inference_batch_wait_seconds", "Ожидание попутчиков в батчере",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+MODEL_LOAD_SECONDS = Gauge(
+    "inference_model_load_seconds", "Время загрузки модели при прогреве", ("pair", "worker"),
+)
+
+# === Cache ===
+CACHE_LOOKUPS = Counter(
+    "translation_cache_lookups_total", "Обращения к кэшу переводов",
+    ("result",),   # local_hit | shared_hit | miss
+)
+PRINCIPAL_CACHE_LOOKUPS = Counter(
+    "principal_cache_lookups_total", "Обращения к кэшу принципалов", ("result",),   # hit | miss
+)
+
+
+def pair_label(key: Iterable[str]) -> str:
+    return "-".join(key)
+
+
+# ────────────────────────── DB POOL ───────────────────────────────────
+class _PoolCollector:
+    """
+    Снимает состояние пулов соединений в момент скрейпа, без хуков на каждый checkout.
+    Пулы без счётчиков (NullPool/StaticPool у SQLite) просто пропускаются.
+    """
+
+    _FIELDS = (
+        ("size", "db_pool_size", "Размер пула (без overflow)"),
+        ("checkedout", "db_pool_checked_out", "Соединения, выданные сессиям"),
+        ("checkedin", "db_pool_checked_in", "Свободные соединения в пуле"),
+        ("overflow", "db_pool_overflow", "Соединения сверх pool_size"),
+    )
+
+    def __init__(self) -> None:
+        self._engines: Dict[str, Any] = {}
+
+    def add(self, name: str, engine: Any) -> None:
+        self._engines[name] = getattr(engine, "sync_engine", engine)
+
+    def collect(self):
+        families = {attr: GaugeMetricFamily(metric, doc, labels=["engine"]) for attr, metric, doc in self._FIELDS}
+        for name, engine in self._engines.items():
+            pool = engine.pool
+            for attr, family in families.items():
+                getter = getattr(pool, attr, None)
+                if callable(getter):
+                    family.add_metric([name], float(getter()))
+        yield from families.values()
+
+
+_pools = _PoolCollector()
+REGISTRY.register(_pools)
+
+
+def register_engine(name: str, engine: Any) -> None:
+    """Подключает пул движка (sync или async) к /metrics под лейблом engine=name."""
+    _pools.add(name, engine)
+
+
+# ────────────────────────── HTTP ──────────────────────────────────────
+class MetricsMiddleware:
+    """
+    ASGI-middleware: латентность по шаблону маршрута (/history/{id}, а не сам путь),
+    чтобы число рядов не росло с числом пользователей. Ответы вне роутинга — route="unmatched".
+    Время — до отправки заголовков и тела целиком (для стриминга — вся отдача).
+    """
+
+    def __init__(self, app, exclude: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def _send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope.get("method", ""), getattr(route, "path", "unmatched"), status
+            ).observe(time.perf_counter() - started)
+
+
+def render_latest() -> Tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    """Отдельный HTTP-порт с /metrics — для воркера, у которого нет своего веб-сервера."""
+    start_http_server(port)
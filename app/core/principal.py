@@ -0,0 +1,90 @@
+# app/core/principal.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    Кто делает запрос: только идентичность, без ORM-графа.
+    Этого хватает зависимостям, которым нужен user_id / email / права.
+    """
+    id: str
+    email: str
+    is_admin: bool = False
+
+
+class PrincipalCache:
+    """
+    LRU + TTL кэш принципалов по (sub, iat) токена.
+    iat в ключе — чтобы новый токен (после смены пароля, перелогина) не попадал
+    на старую запись. Инвалидация по user_id снимает все токены пользователя.
+    Кэш локальный для процесса: между репликами API устаревание ограничено TTL.
+    """
+
+    def __init__(self, max_items: int = 10000, ttl_s: float = 30.0):
+        self.max_items = max(1, int(max_items))
+        self.ttl_s = float(ttl_s)
+        self._data: "OrderedDict[Tuple[str, Hashable], Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_s > 0
+
+    def get(self, sub: str, iat: Hashable) -> Optional[Principal]:
+        if not self.enabled:
+            return None
+        key = (sub, iat)
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, principal = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return principal
+
+    def set(self, sub: str, iat: Hashable, principal: Principal) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[(sub, iat)] = (time.monotonic() + self.ttl_s, principal)
+            self._data.move_to_end((sub, iat))
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            for key in [k for k in self._data if k[0] == user_id]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    global _cache
+    if _cache is None:
+        from app.core.settings import get_settings
+
+        settings = get_settings()
+        _cache = PrincipalCache(
+            max_items=settings.PRINCIPAL_CACHE_MAX_ITEMS,
+            ttl_s=settings.PRINCIPAL_CACHE_TTL_S,
+        )
+    return _cache
@@ -1,10 +1,65 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import bcrypt
 
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _settings():
+    from app.core.settings import get_settings
+
+    return get_settings()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Отдельный ограниченный пул под bcrypt: всплеск логинов ждёт в его очереди,
+    а не занимает общий default executor (инференс и прочее) и не блокирует event loop.
+    bcrypt отпускает GIL, так что потоки действительно работают параллельно.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, _settings().PASSWORD_HASH_WORKERS),
+                thread_name_prefix="bcrypt",
+            )
+        return _executor
+
+
 class PasswordHasher:
     @staticmethod
-    def hash(password: str) -> str:
-        return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    def rounds() -> int:
+        return _settings().PASSWORD_BCRYPT_ROUNDS
+
+    @staticmethod
+    def hash(password: str, rounds: Optional[int] = None) -> str:
+        salt = bcrypt.gensalt(rounds=rounds or PasswordHasher.rounds())
+        return bcrypt.hashpw(password.encode(), salt).decode()
 
     @staticmethod
     def check(password: str, hashed: str) -> bool:
         return bcrypt.checkpw(password.encode(), hashed.encode())
+
+    @staticmethod
+    def needs_rehash(hashed: str) -> bool:
+        """Хеш сделан с другим cost ($2b$<cost>$...), чем задан сейчас."""
+        try:
+            return int(hashed.split("$")[2]) != PasswordHasher.rounds()
+        except (IndexError, ValueError):
+            return False
+
+    # --- async: для обработчиков FastAPI ---
+    @staticmethod
+    async def hash_async(password: str, rounds: Optional[int] = None) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), PasswordHasher.hash, password, rounds)
+
+    @staticmethod
+    async def check_async(password: str, hashed: str) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), PasswordHasher.check, password, hashed)
@@ -86,3 +86,13 @@ class TranslationOutQueued(BaseModel):
     status: str
     output_text: Optional[str] = None
     cost: Optional[float] = None
+    error: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+
+class TranslationBatchIn(BaseModel):
+    items: list[TranslationIn] = Field(..., min_length=1)
+
+
+class TranslationBatchQueued(BaseModel):
+    tasks: list[TranslationOutQueued]
@@ -1,44 +1,42 @@
+from typing import Any, AsyncIterator, Dict
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from app.core.settings import get_settings
 from app.infrastructure.db.models.user import User
-from app.infrastructure.db.models.wallet import Wallet
-from app.infrastructure.db.models.transaction import Transaction
-from app.infrastructure.db.models.translation import Translation
+from app.domain.services.wallet_ledger import WalletLedger
+from app.infrastructure.repositories.history import export_query
 
 
 class AdminActions:
 
     @staticmethod
     async def approve_bonus(
-            db: AsyncSession, user_id: str, amount: int, description: str = "Бонус"
+            db: AsyncSession, user_id: str, amount: int, description: str = "Бонус",
+            idempotency_key: str = None,
     ):
-        result = await db.execute(select(Wallet).where(Wallet.user_id == user_id))
-        wallet = result.scalar_one_or_none()
-        if not wallet:
-            raise ValueError(f"Wallet not found for user {user_id}")
-
-        wallet.balance += amount
-
-        db.add(Transaction(
-            user_id=user_id,
-            amount=amount,
-            type=description
-        ))
-
+        result = await WalletLedger.credit(
+            db, user_id, amount,
+            tx_type=description,
+            idempotency_key=f"bonus:{idempotency_key}" if idempotency_key else None,
+        )
         await db.commit()
+        return result
+
+    # потоковые формы: серверный курсор, только колонки экспорта,
+    # в памяти не больше EXPORT_BATCH_ROWS строк
+    @staticmethod
+    async def view_transactions(db: AsyncSession, user_id: str = None) -> AsyncIterator[Dict[str, Any]]:
+        async for row in AdminActions._stream(db, export_query("transactions", user_id=user_id)):
+            yield row
 
     @staticmethod
-    async def view_transactions(db: AsyncSession, user_id: str = None):
-        query = select(Transaction)
-        if user_id:
-            query = query.where(Transaction.user_id == user_id)
-        result = await db.execute(query)
-        return result.scalars().all()
+    async def view_translations(db: AsyncSession, user_id: str = None) -> AsyncIterator[Dict[str, Any]]:
+        async for row in AdminActions._stream(db, export_query("translations", user_id=user_id)):
+            yield row
 
     @staticmethod
-    async def view_translations(db: AsyncSession, user_id: str = None):
-        query = select(Translation)
-        if user_id:
-            query = query.where(Translation.user_id == user_id)
-        result = await db.execute(query)
-        return result.scalars().all()
\ No newline at end of file
+    async def _stream(db: AsyncSession, stmt) -> AsyncIterator[Dict[str, Any]]:
+        batch_rows = get_settings().EXPORT_BATCH_ROWS
+        result = await db.stream(stmt.execution_options(yield_per=batch_rows))
+        async for row in result.mappings():
+            yield dict(row)
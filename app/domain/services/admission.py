@@ -0,0 +1,81 @@
+# app/domain/services/admission.py
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import ADMISSION_DECISIONS
+from app.core.settings import get_settings
+from app.infrastructure.bus.admission import QueueStats, get_queue_monitor
+from app.infrastructure.bus.topology import PRIORITY_LOW, PRIORITY_NORMAL
+from app.infrastructure.repositories.tasks import TaskStateRepository
+
+ACCEPT = "accept"
+DOWNGRADE = "downgrade"
+REJECT = "reject"
+
+
+@dataclass(frozen=True)
+class AdmissionDecision:
+    action: str
+    reason: str = ""
+    retry_after_s: int = 0
+    priority: str = PRIORITY_NORMAL
+
+    @property
+    def rejected(self) -> bool:
+        return self.action == REJECT
+
+
+def _retry_after(wait_s: float) -> int:
+    cap = get_settings().ADMISSION_RETRY_AFTER_MAX_S
+    if math.isinf(wait_s):
+        return cap
+    return max(1, min(cap, int(math.ceil(wait_s))))
+
+
+def decide(stats: Optional[QueueStats], user_inflight: int, n_items: int) -> AdmissionDecision:
+    """
+    Чистое решение по снимку очереди и числу незавершённых задач пользователя:
+      - лимит пользователя превышен → reject (один клиент не забивает очередь);
+      - очередь глубже REJECT-порогов (по числу сообщений или по оценке ожидания) → reject;
+      - глубже DOWNGRADE-порогов → принять с пониженным приоритетом;
+      - снимка нет (брокер не опрашивается) — по очереди не режем.
+    """
+    settings = get_settings()
+    # без замеренного темпа (воркеры только стартовали, тишина в окне) оценке ожидания
+    # не верим — остаются пороги по глубине
+    wait_s = stats.estimated_wait_s if stats and stats.throughput > 0 else 0.0
+
+    cap = settings.ADMISSION_USER_MAX_INFLIGHT
+    if cap > 0 and user_inflight + n_items > cap:
+        return AdmissionDecision(
+            REJECT,
+            f"too many unfinished tasks for this user (limit {cap})",
+            _retry_after(wait_s or settings.ADMISSION_POLL_S),
+        )
+    if stats is None:
+        return AdmissionDecision(ACCEPT)
+
+    if stats.depth >= settings.ADMISSION_REJECT_DEPTH or wait_s >= settings.ADMISSION_REJECT_WAIT_S:
+        return AdmissionDecision(REJECT, "task queue is overloaded", _retry_after(wait_s or math.inf))
+    if stats.depth >= settings.ADMISSION_DOWNGRADE_DEPTH or wait_s >= settings.ADMISSION_DOWNGRADE_WAIT_S:
+        return AdmissionDecision(DOWNGRADE, "task queue is busy", priority=PRIORITY_LOW)
+    return AdmissionDecision(ACCEPT)
+
+
+async def admit_tasks(db: AsyncSession, user_id: str, n_items: int = 1) -> AdmissionDecision:
+    """Решение о постановке n_items задач пользователя в очередь."""
+    settings = get_settings()
+    if not settings.ADMISSION_ENABLED:
+        return AdmissionDecision(ACCEPT)
+    monitor = get_queue_monitor()
+    since = datetime.utcnow() - timedelta(seconds=settings.TASK_STALE_S)
+    inflight = await TaskStateRepository.count_inflight(db, user_id, since=since)
+    decision = decide(monitor.stats if monitor else None, inflight, n_items)
+    ADMISSION_DECISIONS.labels(decision.action).inc()
+    return decision
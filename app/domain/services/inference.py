@@ -0,0 +1,132 @@
+# app/domain/services/inference.py
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import threading
+from typing import Any, List, Optional, Tuple
+
+from app.core.settings import get_settings
+from app.domain.services.translation_request import Model
+from app.infrastructure.inference.cache import get_translation_cache
+
+log = logging.getLogger("inference.service")
+
+
+class InferenceBusy(RuntimeError):
+    """Синхронный перевод сейчас не принять — вызывающему стоит уйти в очередь."""
+
+
+class InferenceService:
+    """
+    Единая точка вызова модели для API и воркера: кэш переводов, вынос инференса
+    из event loop и учёт запросов в работе. Через неё идут и синхронный /translate,
+    и задачи из очереди (TranslationRequest), поэтому путь перевода один.
+
+    admit() — контроль допуска для синхронного пути: модели загружены в этом процессе,
+    не больше INFERENCE_SYNC_MAX_INFLIGHT синхронных переводов, очередь батчера/пула
+    не глубже INFERENCE_SYNC_MAX_BACKLOG, текст не длиннее INFERENCE_SYNC_MAX_CHARS.
+    Сам сервис модели не грузит: в API это делает только INFERENCE_WARMUP_ON_START.
+    """
+
+    def __init__(self, model: Optional[Model] = None):
+        self.model = model or Model()
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    # --- допуск ---
+    @property
+    def inflight(self) -> int:
+        """Синхронных переводов, занявших слот в admit() и ещё не завершившихся."""
+        return self._inflight
+
+    def admit(self, text: str) -> Optional[str]:
+        """
+        None — слот синхронного перевода занят за вызывающим, его возвращает _release();
+        иначе причина, по которой запрос уходит в очередь.
+        """
+        settings = get_settings()
+        if not settings.INFERENCE_SYNC_ENABLED:
+            return "sync inference is disabled"
+        if len(text) > settings.INFERENCE_SYNC_MAX_CHARS:
+            return "text is too long for sync inference"
+        if not Model.readiness()["ready"]:
+            # ленивый прогрев из запроса поднимал бы модели и пул процессов внутри uvicorn
+            return "models are not loaded in this process"
+        if Model.backlog() >= settings.INFERENCE_SYNC_MAX_BACKLOG:
+            return "inference backlog is too deep"
+        # проверка и захват слота — один шаг под блокировкой
+        with self._lock:
+            if self._inflight >= settings.INFERENCE_SYNC_MAX_INFLIGHT:
+                return "too many sync translations in flight"
+            self._inflight += 1
+        return None
+
+    def _release(self, _: Any = None) -> None:
+        with self._lock:
+            self._inflight -= 1
+
+    # --- инференс ---
+    async def run(self, text: str, source_lang: str, target_lang: str) -> str:
+        """Только модель, без кэша; CPU-bound работа — в пуле потоков."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(
+                self.model.translate,
+                origin_text=text,
+                source_lang=source_lang,
+                target_lang=target_lang,
+            ),
+        )
+
+    async def run_many(self, items: List[Tuple[str, str, str]]) -> List[Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.model.translate_many, items)
+
+    async def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        """Кэш → модель → кэш."""
+        cache = get_translation_cache()
+        model_name = self.model.model_name(source_lang, target_lang)
+        if cache is not None:
+            cached = await cache.get(text, source_lang, target_lang, model_name)
+            if cached is not None:
+                return cached
+        output = await self.run(text, source_lang, target_lang)
+        if cache is not None:
+            await cache.set(text, source_lang, target_lang, model_name, output)
+        return output
+
+    async def translate_sync(
+        self, text: str, source_lang: str, target_lang: str, *, timeout: Optional[float] = None
+    ) -> str:
+        """
+        Синхронный перевод с допуском и таймаутом.
+        ValueError — пара не поддерживается (проверяется до допуска);
+        InferenceBusy — не допущен; asyncio.TimeoutError — не уложились в timeout
+        (поток инференса при этом доработает и положит результат в кэш).
+        """
+        if (source_lang, target_lang) not in Model.SUPPORTED_MODELS:
+            raise ValueError("Модель перевода не поддерживается")
+        reason = self.admit(text)
+        if reason is not None:
+            raise InferenceBusy(reason)
+        timeout = get_settings().INFERENCE_SYNC_TIMEOUT_S if timeout is None else timeout
+        # слот освобождается, когда перевод действительно закончился, а не по таймауту
+        task = asyncio.ensure_future(self.translate(text, source_lang, target_lang))
+        task.add_done_callback(self._release)
+        # shield: по таймауту бросаем ожидание, а не сам перевод — он дойдёт до кэша
+        return await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+
+
+_service: Optional[InferenceService] = None
+_service_lock = threading.Lock()
+
+
+def get_inference_service() -> InferenceService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = InferenceService()
+        return _service
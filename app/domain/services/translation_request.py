@@ -2,17 +2,42 @@
 from dataclasses import dataclass
 from typing import List, Optional, Tuple, Dict, ClassVar, Any
 from datetime import datetime
+import threading
+import time
 import uuid
 
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlalchemy.sql import Select
 
+from app.core.metrics import (
+    BATCH_SIZE,
+    INFERENCE_ERRORS,
+    INFERENCE_PADDED_TOKENS,
+    INFERENCE_PADDING_EFFICIENCY,
+    INFERENCE_SECONDS,
+    INFERENCE_TOKENS,
+    MODEL_LOAD_SECONDS,
+    pair_label,
+)
+from app.core.settings import get_settings
+from app.infrastructure.inference.backends import REFERENCE_BACKEND, backend_for, load_pipeline
+from app.infrastructure.inference.batcher import BatchingEngine, parse_buckets
+from app.infrastructure.inference.cache import cache_key, get_translation_cache
+from app.infrastructure.inference.generation import (
+    Encoding,
+    budget_chunks,
+    padding_stats,
+    translate_encoded,
+)
+from app.infrastructure.inference.pool import get_pool, start_pool, stop_pool
+from app.infrastructure.inference.segmenter import Segmented, segment
 from app.infrastructure.db.models.transaction import Transaction
 from app.infrastructure.db.models.translation import Translation
 from app.infrastructure.db.models.user import User
 from app.infrastructure.db.models.wallet import Wallet
+from app.infrastructure.repositories.users import UserProfile, UserRepository
+from app.domain.services.wallet_ledger import WalletLedger, ledger_id
 
 
 
@@ -31,26 +56,300 @@ class Model:
         # ("en", "ru"): "Helsinki-NLP/opus-mt-en-ru",
     }
     _pipes: ClassVar[Dict[Tuple[str, str], Any]] = {}
-
-    def _get_translator(self, source_lang: str, target_lang: str):
-        from transformers import pipeline
+    _tokenizers: ClassVar[Dict[Tuple[str, str], Any]] = {}
+    _loaded_backends: ClassVar[Dict[Tuple[str, str], str]] = {}
+    _warm: ClassVar[bool] = False
+    _batcher: ClassVar[Optional[BatchingEngine]] = None
+    _batcher_lock: ClassVar[threading.Lock] = threading.Lock()
+    _load_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def _check_supported(self, source_lang: str, target_lang: str) -> Tuple[str, str]:
         key = (source_lang, target_lang)
         if key not in self.SUPPORTED_MODELS:
             raise ValueError("Модель перевода не поддерживается")
+        return key
+
+    def _get_translator(self, source_lang: str, target_lang: str):
+        key = self._check_supported(source_lang, target_lang)
         if key not in self._pipes:
-            self._pipes[key] = pipeline("translation", model=self.SUPPORTED_MODELS[key])
+            with self._load_lock:
+                if key not in self._pipes:
+                    started = time.monotonic()
+                    pipe, backend = load_pipeline(self.SUPPORTED_MODELS[key], backend_for(key))
+                    self._loaded_backends[key] = backend
+                    self._pipes[key] = pipe
+                    MODEL_LOAD_SECONDS.labels(pair_label(key), "local").set(time.monotonic() - started)
         return self._pipes[key]
 
+    @classmethod
+    def backends(cls) -> Dict[Tuple[str, str], str]:
+        return {key: backend_for(key) for key in cls.SUPPORTED_MODELS}
+
+    @classmethod
+    def loaded_backend(cls, key: Tuple[str, str]) -> Optional[str]:
+        """Бэкенд, которым модель пары реально загружена (в пуле или здесь); None — ещё не загружена."""
+        pool = get_pool()
+        if pool is not None:
+            return pool.loaded_backend(key)
+        return cls._loaded_backends.get(key)
+
+    def model_name(self, source_lang: str, target_lang: str) -> str:
+        """
+        Имя модели для ключей кэша: переводы не-эталонных бэкендов кэшируются отдельно.
+        Суффикс — по реально загруженному бэкенду (откат на эталон не пишет под чужим
+        именем); до загрузки — по настройке, под ним лежат только её же переводы.
+        """
+        key = self._check_supported(source_lang, target_lang)
+        backend = self.loaded_backend(key) or backend_for(key)
+        name = self.SUPPORTED_MODELS[key]
+        return name if backend == REFERENCE_BACKEND else f"{name}@{backend}"
+
+    def _get_tokenizer(self, source_lang: str, target_lang: str):
+        # в режиме пула сами модели живут в дочерних процессах, здесь нужен только токенизатор
+        key = self._check_supported(source_lang, target_lang)
+        if key in self._pipes:
+            return self._pipes[key].tokenizer
+        if key not in self._tokenizers:
+            from transformers import AutoTokenizer
+            with self._load_lock:
+                if key not in self._tokenizers:
+                    self._tokenizers[key] = AutoTokenizer.from_pretrained(self.SUPPORTED_MODELS[key])
+        return self._tokenizers[key]
+
+    def _encode(self, key: Tuple[str, str], text: str) -> Encoding:
+        return list(self._get_tokenizer(*key).encode(text))
+
+    def _count_tokens(self, key: Tuple[str, str], text: str) -> int:
+        return len(self._encode(key, text))
+
+    def _segment(self, key: Tuple[str, str], text: str) -> Tuple[Segmented, List[Optional[Encoding]]]:
+        """
+        Сегментация с запоминанием input_ids: возвращает куски и их input_ids,
+        если кусок целиком токенизировался при нарезке (иначе None — посчитает батчер).
+        """
+        seen: Dict[str, Encoding] = {}
+
+        def count(piece: str) -> int:
+            if piece not in seen:
+                seen[piece] = self._encode(key, piece)
+            return len(seen[piece])
+
+        segmented = segment(text, count, get_settings().INFERENCE_SEGMENT_MAX_TOKENS)
+        return segmented, [seen.get(t) for t in segmented.texts]
+
+    # --- прогрев и готовность ---
+    @classmethod
+    def warmup(cls, wait: bool = True) -> None:
+        """
+        Загружает все SUPPORTED_MODELS заранее, вне пути обработки запросов:
+        либо в пул процессов (INFERENCE_POOL_WORKERS > 0), либо в текущий процесс.
+        """
+        settings = get_settings()
+        if settings.INFERENCE_POOL_WORKERS > 0:
+            pool = start_pool(
+                cls.SUPPORTED_MODELS,
+                workers=settings.INFERENCE_POOL_WORKERS,
+                threads=settings.INFERENCE_POOL_THREADS,
+                backends=cls.backends(),
+            )
+            if wait:
+                pool.wait_ready()
+            cls._warm = pool.ready
+            return
+        model = cls()
+        for key in cls.SUPPORTED_MODELS:
+            model._get_translator(*key)
+        cls._warm = True
+
+    @classmethod
+    def readiness(cls) -> Dict[str, Any]:
+        pool = get_pool()
+        if pool is not None:
+            return pool.health()
+        return {
+            "mode": "local",
+            "ready": cls._warm,
+            "loaded": ["-".join(k) for k in cls._pipes],
+            "backends": {"-".join(k): cls._loaded_backends.get(k, b) for k, b in cls.backends().items()},
+        }
+
+    @classmethod
+    def shutdown(cls) -> None:
+        with cls._batcher_lock:
+            if cls._batcher is not None:
+                cls._batcher.close()
+                cls._batcher = None
+        stop_pool()
+        cls._warm = False
+
+    @classmethod
+    def _get_batcher(cls) -> Optional[BatchingEngine]:
+        settings = get_settings()
+        if not settings.INFERENCE_BATCHING:
+            return None
+        with cls._batcher_lock:
+            if cls._batcher is None:
+                model = cls()
+                cls._batcher = BatchingEngine(
+                    lambda key, texts, encodings: model.translate_batch(texts, *key, encodings=encodings),
+                    window_ms=settings.INFERENCE_BATCH_WINDOW_MS,
+                    max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+                    max_batch_tokens=settings.INFERENCE_MAX_BATCH_TOKENS,
+                    length_buckets=parse_buckets(settings.INFERENCE_LENGTH_BUCKETS),
+                    encode=model._encode,
+                    workers=max(1, settings.INFERENCE_POOL_WORKERS),
+                )
+            return cls._batcher
+
+    @classmethod
+    def batching_stats(cls) -> Dict[str, float]:
+        return cls._batcher.stats.snapshot() if cls._batcher else {}
+
+    @classmethod
+    def backlog(cls) -> int:
+        """Глубина очереди инференса процесса: тексты в батчере + пачки в пуле процессов."""
+        pool = get_pool()
+        batcher = cls._batcher
+        return (batcher.pending() if batcher else 0) + (pool.pending if pool else 0)
+
+    def translate_batch(
+        self,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        encodings: Optional[List[Encoding]] = None,
+    ) -> List[str]:
+        """
+        Пачка текстов одной языковой пары. Тексты сортируются по длине и режутся
+        на вызовы generate в пределах INFERENCE_MAX_BATCH_TOKENS с учётом паддинга;
+        пачка из батчера уже укладывается в бюджет и уходит одним вызовом.
+        encodings — готовые input_ids тех же текстов, иначе токенизируем здесь.
+        """
+        key = self._check_supported(source_lang, target_lang)
+        pair = pair_label(key)
+        if encodings is None:
+            encodings = [self._encode(key, t) for t in texts]
+        settings = get_settings()
+        chunks = budget_chunks(encodings, settings.INFERENCE_MAX_BATCH_TOKENS, settings.INFERENCE_MAX_BATCH_SIZE)
+        for idx in chunks:
+            real, padded = padding_stats([encodings[i] for i in idx])
+            BATCH_SIZE.labels(pair).observe(len(idx))
+            INFERENCE_TOKENS.labels(pair).inc(real)
+            INFERENCE_PADDED_TOKENS.labels(pair).inc(padded)
+            INFERENCE_PADDING_EFFICIENCY.labels(pair).observe(real / padded)
+        started = time.perf_counter()
+        try:
+            chunk_outputs = self._run_batch(
+                key, [([texts[i] for i in idx], [encodings[i] for i in idx]) for idx in chunks]
+            )
+        except Exception:
+            INFERENCE_ERRORS.labels(pair).inc()
+            raise
+        INFERENCE_SECONDS.labels(pair).observe(time.perf_counter() - started)
+        outputs: List[str] = [""] * len(texts)
+        for idx, chunk in zip(chunks, chunk_outputs):
+            for i, out in zip(idx, chunk):
+                outputs[i] = out
+        return outputs
+
+    def _run_batch(
+        self, key: Tuple[str, str], chunks: List[Tuple[List[str], List[Encoding]]]
+    ) -> List[List[str]]:
+        settings = get_settings()
+        pool = get_pool()
+        if pool is not None:
+            # куски расходятся по процессам пула параллельно
+            futures = [pool.submit(key, texts, encodings) for texts, encodings in chunks]
+            return [f.result(timeout=settings.INFERENCE_POOL_TIMEOUT_S) for f in futures]
+        translator = self._get_translator(*key)
+        return [translate_encoded(translator, encodings) for _, encodings in chunks]
+
+    def _translate_segments(
+        self, key: Tuple[str, str], texts: List[str], encodings: Optional[List[Optional[Encoding]]] = None
+    ) -> List[str]:
+        """
+        Переводит куски одного текста одной пачкой.
+        Для многокусочных текстов повторяющиеся куски берутся из локального кэша.
+        encodings — input_ids кусков, посчитанные при сегментации (None — нет).
+        """
+        encoded = {t: e for t, e in zip(texts, encodings or []) if e is not None}
+        cache = get_translation_cache() if len(texts) > 1 else None
+        model_name = self.model_name(*key)
+        keys = [cache_key(t, key[0], key[1], model_name) for t in texts] if cache else []
+
+        results: List[Optional[str]] = [cache.get_local(k) for k in keys] if cache else [None] * len(texts)
+        # одинаковые куски внутри текста переводим один раз
+        todo: Dict[str, List[int]] = {}
+        for i, r in enumerate(results):
+            if r is None:
+                todo.setdefault(texts[i], []).append(i)
+        if todo:
+            unique = list(todo)
+            batcher = self._get_batcher()
+            if batcher is None:
+                outputs = self.translate_batch(unique, *key, encodings=[
+                    encoded.get(text) or self._encode(key, text) for text in unique
+                ])
+            else:
+                futures = [batcher.submit(key, text, encoded.get(text)) for text in unique]
+                outputs = [f.result() for f in futures]
+            for text, out in zip(unique, outputs):
+                for i in todo[text]:
+                    results[i] = out
+                if cache:
+                    cache.set_local(keys[todo[text][0]], out)
+        return [r or "" for r in results]
+
+    def translate_many(self, items: List[Tuple[str, str, str]]) -> List[Any]:
+        """
+        Переводит сразу много (text, source_lang, target_lang): куски всех текстов
+        одной пары уходят в модель вместе. Для каждого элемента — текст или исключение.
+        """
+        results: List[Any] = [None] * len(items)
+        groups: Dict[Tuple[str, str], List[Tuple[int, Any, List[Optional[Encoding]]]]] = {}
+        for i, (text, source_lang, target_lang) in enumerate(items):
+            try:
+                key = self._check_supported(source_lang, target_lang)
+                segmented, encodings = self._segment(key, text)
+            except Exception as e:
+                results[i] = e
+                continue
+            if not segmented.texts:
+                results[i] = text
+                continue
+            groups.setdefault(key, []).append((i, segmented, encodings))
+
+        for key, group in groups.items():
+            texts = [t for _, segmented, _ in group for t in segmented.texts]
+            encodings = [e for _, _, item_encodings in group for e in item_encodings]
+            try:
+                outputs = self._translate_segments(key, texts, encodings)
+            except Exception as e:
+                for i, _, _ in group:
+                    results[i] = e
+                continue
+            pos = 0
+            for i, segmented, _ in group:
+                n = len(segmented.texts)
+                results[i] = segmented.join(outputs[pos:pos + n])
+                pos += n
+        return results
+
     def translate(self, origin_text: str, source_lang: str, target_lang: str) -> str:
-        translator = self._get_translator(source_lang, target_lang)
-        return translator(origin_text)[0]["translation_text"]
+        key = self._check_supported(source_lang, target_lang)
+        # длинные тексты режем по предложениям в пределах бюджета токенов модели;
+        # input_ids, посчитанные при нарезке, переиспользуются для generate
+        segmented, encodings = self._segment(key, origin_text)
+        if not segmented.texts:
+            return origin_text
+        return segmented.join(self._translate_segments(key, segmented.texts, encodings))
 
 
 # ────────────────────────────────────────────────────────────────────────────────
 @dataclass
 class TranslationRequest:
     user_id: str
-    wallet: Wallet
+    wallet: Optional[Wallet]
     input_text: str
     source_lang: str
     target_lang: str
@@ -63,50 +362,65 @@ class TranslationRequest:
     def _normalize_lang(v: str) -> str:
         return (v or "").strip().lower()
 
-    async def process(self, db: AsyncSession) -> str:
-
-        self.source_lang = self._normalize_lang(self.source_lang)
-        self.target_lang = self._normalize_lang(self.target_lang)
-        self.input_text = (self.input_text or "").strip()
-        if not self.input_text:
-            raise ValueError("input_text is empty")
-
+    async def _find_existing(self, db: AsyncSession) -> Optional[Translation]:
+        if not (self.external_id and hasattr(Translation, "external_id")):
+            return None
+        existing = await db.execute(
+            select(Translation).where(Translation.external_id == self.external_id)
+        )
+        return existing.scalar_one_or_none()
+
+    async def _reserve(self, db: AsyncSession) -> Optional[str]:
+        """
+        Короткая транзакция №1: «холд» — стоимость списывается одним условным UPDATE,
+        без блокировки строки кошелька на время транзакции, и тут же пишется строка
+        резерва по external_id: повторная доставка задачи переиспользует её.
+        Возвращает готовый текст, если задача уже выполнена.
+        """
         async with db.begin():
-
-            has_external_id = hasattr(Translation, "external_id")
-
-            if self.external_id and has_external_id:
-                existing = await db.execute(
-                    select(Translation).where(Translation.external_id == self.external_id)
-                )
-                existed = existing.scalar_one_or_none()
-                if existed:
-                    return existed.output_text
-
-            wallet_q: Select = (
-                select(Wallet)
-                .where(Wallet.user_id == self.user_id)
-                .with_for_update()
-            )
-            res = await db.execute(wallet_q)
-            locked_wallet: Optional[Wallet] = res.scalar_one_or_none()
-
-            if locked_wallet is None:
-                raise ValueError("Wallet not found")
-
-            if locked_wallet.balance is None or locked_wallet.balance < self.cost:
-                raise ValueError("Недостаточно средств на балансе")
-
-            output_text = self.model.translate(
-                origin_text=self.input_text,
-                source_lang=self.source_lang,
-                target_lang=self.target_lang,
-            )
-
-            locked_wallet.balance -= self.cost
-            db.add(locked_wallet)
-
-            ext_id = self.external_id or str(uuid.uuid4())
+            existed = await self._find_existing(db)
+            if existed:
+                return existed.output_text
+            await WalletLedger.hold(db, self.user_id, self.cost, idempotency_key=self.external_id)
+        return None
+
+    async def _refund(self, db: AsyncSession) -> None:
+        """
+        Снимаем холд, если перевод не удалось зафиксировать. Если и это не удалось,
+        резерв остаётся held и его вернёт WalletLedger.release_stale.
+        """
+        async with db.begin():
+            await WalletLedger.release(db, self.user_id, idempotency_key=self.external_id)
+
+    async def _cache_get(self) -> Optional[str]:
+        cache = get_translation_cache()
+        if cache is None:
+            return None
+        return await cache.get(
+            self.input_text, self.source_lang, self.target_lang,
+            self.model.model_name(self.source_lang, self.target_lang),
+        )
+
+    async def _cache_set(self, output_text: str) -> None:
+        cache = get_translation_cache()
+        if cache is None:
+            return
+        await cache.set(
+            self.input_text, self.source_lang, self.target_lang,
+            self.model.model_name(self.source_lang, self.target_lang),
+            output_text,
+        )
+
+    async def _infer(self) -> str:
+        # тот же сервис, что у синхронного /translate (инференс — вне event loop)
+        from app.domain.services.inference import get_inference_service
+
+        return await get_inference_service().run(self.input_text, self.source_lang, self.target_lang)
+
+    async def _settle(self, db: AsyncSession, output_text: str) -> None:
+        """Короткая транзакция №2: фиксируем перевод, запись о списании и закрываем резерв."""
+        async with db.begin():
+            ext_id = self.external_id
             tr_kwargs = dict(
                 user_id=self.user_id,
                 input_text=self.input_text,
@@ -115,23 +429,131 @@ class TranslationRequest:
                 target_lang=self.target_lang,
                 cost=self.cost,
             )
-            if has_external_id:
+            if hasattr(Translation, "external_id"):
                 tr_kwargs["external_id"] = ext_id
 
             translation = Translation(**tr_kwargs)
             db.add(translation)
 
             tx = Transaction(
-                id=str(uuid.uuid4()),
+                # id из external_id: повторная фиксация той же задачи не даст второй записи
+                id=ledger_id(self.user_id, ext_id),
                 timestamp=datetime.now(),
                 user_id=self.user_id,
                 amount=self.cost,
                 type="Списание",
             )
             db.add(tx)
+            await db.flush()
+            await WalletLedger.settle(db, self.user_id, idempotency_key=ext_id)
 
+    def _prepare(self) -> None:
+        self.source_lang = self._normalize_lang(self.source_lang)
+        self.target_lang = self._normalize_lang(self.target_lang)
+        self.input_text = (self.input_text or "").strip()
+        if not self.input_text:
+            raise ValueError("input_text is empty")
+        # без external_id резерв и перевод всё равно связываются общим ключом
+        self.external_id = self.external_id or str(uuid.uuid4())
+
+    async def _commit(self, db: AsyncSession, output_text: str) -> str:
+        """Фиксация результата; при неудаче снимаем холд."""
+        try:
+            await self._settle(db, output_text)
+        except IntegrityError:
+            # параллельная доставка той же задачи успела зафиксироваться первой
+            await self._refund(db)
+            async with db.begin():
+                existed = await self._find_existing(db)
+            if existed is None:
+                raise
+            return existed.output_text
+        except Exception:
+            await self._refund(db)
+            raise
         return output_text
 
+    async def process(self, db: AsyncSession) -> str:
+        """
+        reserve → infer → commit/refund.
+        Ни строка кошелька, ни соединение из пула не удерживаются на время инференса.
+        """
+        self._prepare()
+
+        done = await self._reserve(db)
+        if done is not None:
+            return done
+
+        try:
+            # попадание в кэш тарифицируется как обычно, но инференс пропускается
+            output_text = await self._cache_get()
+            if output_text is None:
+                output_text = await self._infer()
+                await self._cache_set(output_text)
+        except Exception:
+            await self._refund(db)
+            raise
+
+        return await self._commit(db, output_text)
+
+    @classmethod
+    async def process_many(cls, db: AsyncSession, requests: List["TranslationRequest"]) -> List[Any]:
+        """
+        Пакетный вариант process: резервы и фиксации — по каждому запросу,
+        а инференс для всех промахов кэша — одним вызовом Model.translate_many.
+        Возвращает по элементу на запрос: текст перевода или исключение.
+        """
+        results: List[Any] = [None] * len(requests)
+        pending: List[int] = []
+        for i, req in enumerate(requests):
+            try:
+                req._prepare()
+                done = await req._reserve(db)
+                if done is not None:
+                    results[i] = done
+                    continue
+            except Exception as e:
+                results[i] = e
+                continue
+            try:
+                cached = await req._cache_get()
+            except Exception as e:
+                await req._refund(db)
+                results[i] = e
+                continue
+            if cached is None:
+                pending.append(i)
+                continue
+            try:
+                results[i] = await req._commit(db, cached)
+            except Exception as e:
+                results[i] = e
+
+        if pending:
+            jobs = [
+                (requests[i].input_text, requests[i].source_lang, requests[i].target_lang)
+                for i in pending
+            ]
+            from app.domain.services.inference import get_inference_service
+
+            try:
+                outputs = await get_inference_service().run_many(jobs)
+            except Exception as e:
+                outputs = [e] * len(pending)
+
+            for i, out in zip(pending, outputs):
+                req = requests[i]
+                if isinstance(out, Exception):
+                    await req._refund(db)
+                    results[i] = out
+                    continue
+                try:
+                    await req._cache_set(out)
+                    results[i] = await req._commit(db, out)
+                except Exception as e:
+                    results[i] = e
+        return results
+
 
 # ────────────────────────────────────────────────────────────────────────────────
 async def process_translation_request(
@@ -147,13 +569,9 @@ async def process_translation_request(
       2) выполняет перевод (идемпотентно по external_id, если поддерживается)
       3) возвращает текст и стоимость
     """
-    # 1) пользователь + кошелёк
-    result = await db.execute(
-        select(User)
-        .options(selectinload(User.wallet))
-        .where(User.id == user_id)
-    )
-    user: Optional[User] = result.scalar_one_or_none()
+    # 1) пользователь + кошелёк (отдельная короткая транзакция)
+    async with db.begin():
+        user: Optional[User] = await UserRepository.get_by_id(db, user_id, UserProfile.WITH_WALLET)
     if not user:
         raise ValueError("User not found")
 
@@ -178,3 +596,47 @@ async def process_translation_request(
         "timestamp": datetime.now().isoformat(),
         "external_id": external_id,
     }
+
+
+async def process_translation_batch(
+    db: AsyncSession,
+    user_id: str,
+    items: List[Tuple[str, Any]],
+) -> List[Any]:
+    """
+    Пакетная точка входа для воркера: items — пары (external_id, data).
+    Возвращает по элементу на задачу: dict как у process_translation_request или исключение.
+    """
+    async with db.begin():
+        exists = await db.scalar(select(User.id).where(User.id == user_id))
+    if not exists:
+        raise ValueError("User not found")
+
+    model = Model()
+    requests = [
+        TranslationRequest(
+            user_id=user_id,
+            wallet=None,
+            input_text=data.input_text,
+            source_lang=data.source_lang,
+            target_lang=data.target_lang,
+            model=model,
+            external_id=external_id,
+            cost=1,
+        )
+        for external_id, data in items
+    ]
+    outputs = await TranslationRequest.process_many(db, requests)
+
+    results: List[Any] = []
+    for req, out in zip(requests, outputs):
+        if isinstance(out, Exception):
+            results.append(out)
+            continue
+        results.append({
+            "output_text": out,
+            "cost": req.cost,
+            "timestamp": datetime.now().isoformat(),
+            "external_id": req.external_id,
+        })
+    return results
@@ -0,0 +1,252 @@
+# app/domain/services/wallet_ledger.py
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.db.models.transaction import Transaction
+from app.infrastructure.db.models.wallet import HOLD_HELD, HOLD_RELEASED, HOLD_SETTLED, Wallet, WalletHold
+
+# пространство имён для детерминированных id записей журнала по ключу идемпотентности
+_LEDGER_NS = uuid.UUID("6f1c2a4e-9b7d-4e3a-8c55-2d0f3b9a1e77")
+
+
+class WalletNotFound(ValueError):
+    pass
+
+
+class InsufficientFunds(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class LedgerResult:
+    balance: int
+    applied: bool          # False — повтор по уже использованному ключу идемпотентности
+    transaction_id: Optional[str] = None
+
+
+def ledger_id(user_id: str, idempotency_key: str) -> str:
+    return str(uuid.uuid5(_LEDGER_NS, f"{user_id}:{idempotency_key}"))
+
+
+class WalletLedger:
+    """
+    Движения по кошельку одним условным UPDATE ... RETURNING, без SELECT FOR UPDATE
+    и без read-modify-write в Python. Запись журнала (transactions) и изменение баланса
+    идут в одном SAVEPOINT внутри транзакции вызывающего; коммит — на его стороне.
+
+    Ключ идемпотентности превращается в id записи журнала: повтор с тем же ключом
+    упирается в первичный ключ и возвращает текущий баланс, ничего не меняя.
+    """
+
+    @staticmethod
+    async def credit(
+        db: AsyncSession,
+        user_id: str,
+        amount: int,
+        *,
+        tx_type: str,
+        idempotency_key: Optional[str] = None,
+        create_wallet: bool = False,
+    ) -> LedgerResult:
+        return await WalletLedger._apply(
+            db, user_id, amount, tx_type=tx_type, idempotency_key=idempotency_key,
+            create_wallet=create_wallet,
+        )
+
+    @staticmethod
+    async def debit(
+        db: AsyncSession,
+        user_id: str,
+        amount: int,
+        *,
+        tx_type: str,
+        idempotency_key: Optional[str] = None,
+    ) -> LedgerResult:
+        return await WalletLedger._apply(
+            db, user_id, -amount, tx_type=tx_type, idempotency_key=idempotency_key,
+        )
+
+    @staticmethod
+    async def hold(db: AsyncSession, user_id: str, amount: int, *, idempotency_key: str) -> LedgerResult:
+        """
+        Резерв на время инференса: баланс уменьшается, в wallet_holds появляется
+        строка held — в одном SAVEPOINT. Запись «Списание» в журнале появляется
+        при фиксации перевода (settle), при неудаче — release.
+        Повтор с тем же ключом (повторная доставка задачи) переиспользует резерв;
+        отменённый резерв берётся заново.
+        """
+        hold_id = ledger_id(user_id, idempotency_key)
+        status = await WalletLedger._hold_status(db, hold_id)
+        if status in (HOLD_HELD, HOLD_SETTLED):
+            return await WalletLedger._replay(db, user_id, hold_id)
+        try:
+            async with db.begin_nested():
+                if status == HOLD_RELEASED:
+                    reopened = await WalletLedger._move_hold(db, hold_id, HOLD_RELEASED, HOLD_HELD, amount=amount)
+                    if reopened is None:
+                        # параллельная доставка успела взять резерв заново
+                        return await WalletLedger._replay(db, user_id, hold_id)
+                else:
+                    db.add(WalletHold(id=hold_id, user_id=user_id, amount=amount, status=HOLD_HELD))
+                    await db.flush()
+                balance = await WalletLedger._change_balance(db, user_id, -amount)
+        except IntegrityError as e:
+            if await WalletLedger._hold_status(db, hold_id) is None:
+                if not await db.scalar(select(Wallet.id).where(Wallet.user_id == user_id)):
+                    raise WalletNotFound(f"Wallet not found for user {user_id}") from e
+                raise
+            # параллельная доставка вставила резерв первой
+            return await WalletLedger._replay(db, user_id, hold_id)
+        return LedgerResult(balance=balance, applied=True, transaction_id=hold_id)
+
+    @staticmethod
+    async def settle(db: AsyncSession, user_id: str, *, idempotency_key: str) -> None:
+        """
+        Резерв превращается в списание (в транзакции, где фиксируется перевод).
+        Если резерв уже вернули (reconciler счёл его брошенным) — списываем заново.
+        """
+        hold_id = ledger_id(user_id, idempotency_key)
+        if await WalletLedger._move_hold(db, hold_id, HOLD_HELD, HOLD_SETTLED) is not None:
+            return
+        status = await WalletLedger._hold_status(db, hold_id)
+        if status == HOLD_SETTLED:
+            return
+        if status is None:
+            raise ValueError(f"hold {hold_id} not found")
+        amount = await WalletLedger._move_hold(db, hold_id, HOLD_RELEASED, HOLD_SETTLED)
+        if amount is not None:
+            await WalletLedger._change_balance(db, user_id, -amount)
+
+    @staticmethod
+    async def release(db: AsyncSession, user_id: str, *, idempotency_key: str) -> bool:
+        """Возврат резерва на баланс; False — резерва нет или он уже закрыт."""
+        return await WalletLedger._release_hold(db, user_id, ledger_id(user_id, idempotency_key))
+
+    @staticmethod
+    async def release_stale(db: AsyncSession, older_than: datetime, limit: int = 500) -> int:
+        """
+        Возвращает на баланс резервы, не закрытые с older_than: воркер упал между
+        резервом и фиксацией, а задача так и не была доставлена снова.
+        """
+        rows = (await db.execute(
+            select(WalletHold.id, WalletHold.user_id)
+            .where(WalletHold.status == HOLD_HELD, WalletHold.updated_at < older_than)
+            .order_by(WalletHold.updated_at)
+            .limit(limit)
+        )).all()
+        released = 0
+        for hold_id, user_id in rows:
+            if await WalletLedger._release_hold(db, user_id, hold_id):
+                released += 1
+        return released
+
+    @staticmethod
+    async def ensure_wallet(db: AsyncSession, user_id: str) -> None:
+        """Пустой кошелёк, если его ещё нет; гонка двух вставок безопасна (unique user_id)."""
+        exists = await db.scalar(select(Wallet.id).where(Wallet.user_id == user_id))
+        if exists:
+            return
+        try:
+            async with db.begin_nested():
+                db.add(Wallet(user_id=user_id, balance=0))
+        except IntegrityError:
+            pass
+
+    # --- внутреннее ---
+    @staticmethod
+    async def _hold_status(db: AsyncSession, hold_id: str) -> Optional[str]:
+        return await db.scalar(select(WalletHold.status).where(WalletHold.id == hold_id))
+
+    @staticmethod
+    async def _replay(db: AsyncSession, user_id: str, hold_id: str) -> LedgerResult:
+        balance = await db.scalar(select(Wallet.balance).where(Wallet.user_id == user_id))
+        return LedgerResult(balance=balance or 0, applied=False, transaction_id=hold_id)
+
+    @staticmethod
+    async def _move_hold(
+        db: AsyncSession, hold_id: str, src: str, dst: str, *, amount: Optional[int] = None
+    ) -> Optional[int]:
+        """Условный переход статуса резерва; возвращает сумму или None, если резерв не в src."""
+        values = {"status": dst, "updated_at": datetime.utcnow()}
+        if amount is not None:
+            values["amount"] = amount
+        stmt = (
+            update(WalletHold)
+            .where(WalletHold.id == hold_id, WalletHold.status == src)
+            .values(**values)
+            .returning(WalletHold.amount)
+            .execution_options(synchronize_session=False)
+        )
+        return (await db.execute(stmt)).scalar_one_or_none()
+
+    @staticmethod
+    async def _release_hold(db: AsyncSession, user_id: str, hold_id: str) -> bool:
+        async with db.begin_nested():
+            amount = await WalletLedger._move_hold(db, hold_id, HOLD_HELD, HOLD_RELEASED)
+            if amount is None:
+                return False
+            await WalletLedger._change_balance(db, user_id, amount)
+        return True
+
+    @staticmethod
+    async def _change_balance(db: AsyncSession, user_id: str, delta: int) -> int:
+        stmt = update(Wallet).where(Wallet.user_id == user_id)
+        if delta < 0:
+            stmt = stmt.where(Wallet.balance >= -delta)
+        stmt = (
+            stmt.values(balance=Wallet.balance + delta)
+            .returning(Wallet.balance)
+            .execution_options(synchronize_session=False)
+        )
+        balance = (await db.execute(stmt)).scalar_one_or_none()
+        if balance is not None:
+            return balance
+
+        exists = await db.scalar(select(Wallet.id).where(Wallet.user_id == user_id))
+        if not exists:
+            raise WalletNotFound(f"Wallet not found for user {user_id}")
+        raise InsufficientFunds("Недостаточно средств на балансе")
+
+    @staticmethod
+    async def _apply(
+        db: AsyncSession,
+        user_id: str,
+        delta: int,
+        *,
+        tx_type: str,
+        idempotency_key: Optional[str],
+        create_wallet: bool = False,
+    ) -> LedgerResult:
+        if delta == 0:
+            raise ValueError("amount must be non-zero")
+        tx_id = ledger_id(user_id, idempotency_key) if idempotency_key else str(uuid.uuid4())
+
+        if create_wallet:
+            await WalletLedger.ensure_wallet(db, user_id)
+
+        try:
+            async with db.begin_nested():
+                # сначала журнал: дубль ключа отсекается уникальностью id ещё до изменения баланса
+                db.add(Transaction(id=tx_id, user_id=user_id, amount=abs(delta), type=tx_type))
+                await db.flush()
+                balance = await WalletLedger._change_balance(db, user_id, delta)
+        except IntegrityError as e:
+            replay = None
+            if idempotency_key:
+                replay = await db.scalar(select(Transaction.id).where(Transaction.id == tx_id))
+            if replay is None:
+                # FK журнала на несуществующего пользователя — та же ошибка, что и без кошелька
+                if not await db.scalar(select(Wallet.id).where(Wallet.user_id == user_id)):
+                    raise WalletNotFound(f"Wallet not found for user {user_id}") from e
+                raise
+            balance = await db.scalar(select(Wallet.balance).where(Wallet.user_id == user_id))
+            return LedgerResult(balance=balance or 0, applied=False, transaction_id=tx_id)
+        return LedgerResult(balance=balance, applied=True, transaction_id=tx_id)
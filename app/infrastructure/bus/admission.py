@@ -0,0 +1,182 @@
+# app/infrastructure/bus/admission.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from urllib.parse import quote, urlsplit
+
+import aio_pika
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import AMQP_QUEUE_DEPTH, ADMISSION_ESTIMATED_WAIT
+from app.infrastructure.repositories.tasks import TaskStateRepository
+
+log = logging.getLogger("bus.admission")
+
+
+@dataclass(frozen=True)
+class QueueStats:
+    depth: int = 0               # готовых к выдаче сообщений во всех очередях задач
+    consumers: int = 0
+    throughput: float = 0.0      # задач в секунду, которые сейчас завершают воркеры
+    updated_at: float = 0.0      # time.monotonic() последнего успешного опроса
+
+    @property
+    def estimated_wait_s(self) -> float:
+        """Сколько новой задаче стоять в очереди при текущем темпе; inf — очередь не разбирается."""
+        if self.depth <= 0:
+            return 0.0
+        if self.throughput <= 0:
+            return math.inf
+        return self.depth / self.throughput
+
+
+class QueueMonitor:
+    """
+    Фоновый опрос глубины очередей задач для контроля допуска.
+    Глубина — passive declare (или management API, если задан RABBITMQ_MANAGEMENT_URL),
+    темп воркеров — ack rate из management API, иначе число задач, завершённых
+    за последние window_s секунд, по таблице tasks.
+    Данные старше stale_after_s считаются неизвестными: допуск тогда не режет по очереди.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        queues: List[str],
+        *,
+        session_factory: Callable[[], AsyncSession],
+        poll_s: float = 2.0,
+        window_s: float = 60.0,
+        management_url: Optional[str] = None,
+    ):
+        self.url = url
+        self.queues = list(queues)
+        self.poll_s = max(0.5, float(poll_s))
+        self.window_s = max(1.0, float(window_s))
+        self.stale_after_s = self.poll_s * 5
+        self.management_url = (management_url or "").rstrip("/") or None
+        self._session_factory = session_factory
+        self._connection: Optional[aio_pika.abc.AbstractRobustConnection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = QueueStats()
+
+    # --- lifecycle ---
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    @property
+    def stats(self) -> Optional[QueueStats]:
+        if time.monotonic() - self._stats.updated_at > self.stale_after_s:
+            return None
+        return self._stats
+
+    # --- polling ---
+    async def _loop(self) -> None:
+        while True:
+            try:
+                if self.management_url:
+                    depth, consumers, throughput = await self._poll_management()
+                else:
+                    depth, consumers = await self._poll_broker()
+                    throughput = await self._throughput_from_tasks()
+                self._stats = QueueStats(depth, consumers, throughput, time.monotonic())
+                ADMISSION_ESTIMATED_WAIT.set(min(self._stats.estimated_wait_s, 1e9))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("queue monitor poll failed: %s", e)
+            await asyncio.sleep(self.poll_s)
+
+    async def _poll_broker(self):
+        if self._connection is None:
+            self._connection = await aio_pika.connect_robust(self.url)
+        depth = consumers = 0
+        async with self._connection.channel() as channel:
+            for name in self.queues:
+                queue = await channel.declare_queue(name, passive=True)
+                result = queue.declaration_result
+                AMQP_QUEUE_DEPTH.labels(name).set(result.message_count)
+                depth += result.message_count
+                consumers += result.consumer_count
+        return depth, consumers
+
+    async def _poll_management(self):
+        parts = urlsplit(self.management_url)
+        auth = (parts.username or "", parts.password or "") if parts.username else None
+        base = f"{parts.scheme}://{parts.hostname}{':' + str(parts.port) if parts.port else ''}{parts.path}"
+        vhost = quote(urlsplit(self.url).path.lstrip("/") or "/", safe="")
+        depth = consumers = 0
+        throughput = 0.0
+        async with httpx.AsyncClient(auth=auth, timeout=self.poll_s) as client:
+            for name in self.queues:
+                resp = await client.get(f"{base}/api/queues/{vhost}/{quote(name, safe='')}")
+                resp.raise_for_status()
+                data = resp.json()
+                ready = int(data.get("messages_ready", 0))
+                AMQP_QUEUE_DEPTH.labels(name).set(ready)
+                depth += ready
+                consumers += int(data.get("consumers", 0))
+                rate = (data.get("message_stats") or {}).get("ack_details") or {}
+                throughput += float(rate.get("rate", 0.0))
+        return depth, consumers, throughput
+
+    async def _throughput_from_tasks(self) -> float:
+        since = datetime.utcnow() - timedelta(seconds=self.window_s)
+        async with self._session_factory() as db:
+            finished = await TaskStateRepository.count_finished_since(db, since)
+        return finished / self.window_s
+
+
+# ────────────────────────── SINGLETON ─────────────────────────────────
+_monitor: Optional[QueueMonitor] = None
+
+
+async def start_queue_monitor() -> Optional[QueueMonitor]:
+    global _monitor
+    from app.core.settings import get_settings
+    from app.infrastructure.bus.topology import task_queue_names
+    from app.infrastructure.db.database import ReadSessionLocal
+
+    settings = get_settings()
+    if not settings.ADMISSION_ENABLED:
+        return None
+    if _monitor is None:
+        _monitor = QueueMonitor(
+            settings.AMQP_URL,
+            task_queue_names(),
+            session_factory=ReadSessionLocal,
+            poll_s=settings.ADMISSION_POLL_S,
+            window_s=settings.ADMISSION_THROUGHPUT_WINDOW_S,
+            management_url=settings.RABBITMQ_MANAGEMENT_URL,
+        )
+        await _monitor.start()
+    return _monitor
+
+
+def get_queue_monitor() -> Optional[QueueMonitor]:
+    return _monitor
+
+
+async def stop_queue_monitor() -> None:
+    global _monitor
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
@@ -0,0 +1,114 @@
+# app/infrastructure/bus/events.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from contextlib import suppress
+from typing import Any, Dict, Optional, Set
+
+import aio_pika
+
+log = logging.getLogger("bus.events")
+
+
+class TaskEventHub:
+    """
+    Подписка API-процесса на события завершения задач.
+    Воркер публикует событие в topic-exchange с routing key = task_id,
+    хаб привязывает свою эксклюзивную очередь только к тем task_id,
+    которых сейчас кто-то ждёт, и раздаёт события подписчикам.
+    """
+
+    def __init__(self, url: str, exchange: str):
+        self.url = url
+        self.exchange_name = exchange
+        self._connection: Optional[aio_pika.abc.AbstractRobustConnection] = None
+        self._exchange: Optional[aio_pika.abc.AbstractExchange] = None
+        self._queue: Optional[aio_pika.abc.AbstractQueue] = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._lock = asyncio.Lock()
+
+    # --- lifecycle ---
+    async def start(self) -> None:
+        self._connection = await aio_pika.connect_robust(self.url)
+        channel = await self._connection.channel()
+        self._exchange = await channel.declare_exchange(
+            self.exchange_name, aio_pika.ExchangeType.TOPIC, durable=True
+        )
+        self._queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+        await self._queue.consume(self._on_event, no_ack=True)
+        log.info("task event hub listening on exchange '%s'", self.exchange_name)
+
+    async def stop(self) -> None:
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    # --- subscriptions ---
+    async def subscribe(self, task_id: str) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue()
+        async with self._lock:
+            subs = self._subscribers.setdefault(task_id, set())
+            if not subs:
+                await self._queue.bind(self._exchange, routing_key=task_id)
+            subs.add(q)
+        return q
+
+    async def unsubscribe(self, task_id: str, q: asyncio.Queue) -> None:
+        async with self._lock:
+            subs = self._subscribers.get(task_id)
+            if not subs:
+                return
+            subs.discard(q)
+            if not subs:
+                del self._subscribers[task_id]
+                with suppress(Exception):
+                    await self._queue.unbind(self._exchange, routing_key=task_id)
+
+    async def wait(self, q: asyncio.Queue, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(q.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _on_event(self, message: aio_pika.abc.AbstractIncomingMessage) -> None:
+        try:
+            event = json.loads(message.body.decode("utf-8"))
+        except Exception as e:
+            log.error("bad task event: %s", e)
+            return
+        for q in list(self._subscribers.get(message.routing_key or "", ())):
+            q.put_nowait(event)
+
+
+# ────────────────────────── SINGLETON ─────────────────────────────────
+_hub: Optional[TaskEventHub] = None
+
+
+async def start_event_hub() -> Optional[TaskEventHub]:
+    global _hub
+    from app.core.settings import get_settings
+
+    settings = get_settings()
+    if _hub is None:
+        hub = TaskEventHub(settings.AMQP_URL, settings.TASK_EVENTS_EXCHANGE)
+        try:
+            await hub.start()
+        except Exception as e:
+            # без брокера API продолжает работать, просто без push-уведомлений
+            log.error("task event hub is not available: %s", e)
+            return None
+        _hub = hub
+    return _hub
+
+
+def get_event_hub() -> Optional[TaskEventHub]:
+    return _hub
+
+
+async def stop_event_hub() -> None:
+    global _hub
+    if _hub is not None:
+        await _hub.stop()
+        _hub = None
@@ -0,0 +1,218 @@
+# app/infrastructure/bus/publisher.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from contextlib import suppress
+from typing import Any, Dict, Optional, Tuple
+
+import aio_pika
+from aio_pika.pool import Pool
+
+from app.core.metrics import AMQP_PUBLISH_FAILURES, AMQP_PUBLISH_SECONDS
+from app.infrastructure.bus.topology import amqp_priority, lane_queue, task_queue_arguments, task_queue_names
+
+log = logging.getLogger("bus.publisher")
+
+
+class PublishError(RuntimeError):
+    """Брокер недоступен и локальный буфер переполнен."""
+
+
+class AsyncPublisher:
+    """
+    Долгоживущий издатель задач: одно robust-соединение на процесс,
+    пул каналов с publisher confirms, автопереподключение и
+    ограниченный локальный буфер на время коротких недоступностей брокера.
+    Очередь выбирается по полосе задачи (payload["lane"]); без полосы — queue.
+    """
+
+    RETRY_DELAY_S = 1.0
+    MAX_RETRY_DELAY_S = 30.0
+
+    def __init__(
+        self,
+        url: str,
+        queue: str,
+        *,
+        channels: int = 4,
+        buffer_size: int = 1000,
+        confirm_timeout: float = 5.0,
+    ):
+        self.url = url
+        self.queue = queue
+        self.channels = max(1, int(channels))
+        self.confirm_timeout = float(confirm_timeout)
+
+        self._connection: Optional[aio_pika.abc.AbstractRobustConnection] = None
+        self._pool: Optional[Pool] = None
+        self._buffer: "asyncio.Queue[Tuple[bytes, str, Optional[int], str]]" = asyncio.Queue(
+            maxsize=max(1, int(buffer_size))
+        )
+        self._connected = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    # --- lifecycle ---
+    async def start(self) -> None:
+        self._tasks.append(asyncio.create_task(self._connect_loop()))
+        self._tasks.append(asyncio.create_task(self._flush_loop()))
+        # даём шанс подключиться сразу, но не блокируем старт приложения
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._connected.wait(), timeout=self.confirm_timeout)
+
+    async def stop(self) -> None:
+        if self._connected.is_set() and not self._buffer.empty():
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._buffer.join(), timeout=self.confirm_timeout)
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+        await self._close_connection()
+        if not self._buffer.empty():
+            log.error("publisher stopped with %s undelivered messages", self._buffer.qsize())
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    @property
+    def buffered(self) -> int:
+        return self._buffer.qsize()
+
+    async def _get_channel(self) -> aio_pika.abc.AbstractChannel:
+        assert self._connection is not None
+        return await self._connection.channel(publisher_confirms=True)
+
+    async def _connect_loop(self) -> None:
+        """
+        Подключение и объявление очередей — один шаг под общим ретраем с backoff:
+        ошибка declare после открытия соединения (нет прав, конфликт аргументов
+        очереди) логируется и повторяется, а не молча завершает задачу.
+        """
+        delay = self.RETRY_DELAY_S
+        while True:
+            try:
+                await self._connect()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error("publisher connect/declare failed: %s (retry in %.1fs)", e, delay)
+                await self._close_connection()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RETRY_DELAY_S)
+
+    async def _connect(self) -> None:
+        self._connection = await aio_pika.connect_robust(self.url)
+        self._connection.close_callbacks.add(lambda *_: self._connected.clear())
+        self._connection.reconnect_callbacks.add(lambda *_: self._connected.set())
+        self._pool = Pool(self._get_channel, max_size=self.channels)
+        queues = list(dict.fromkeys([self.queue, *task_queue_names()]))
+        async with self._pool.acquire() as channel:
+            for name in queues:
+                await channel.declare_queue(name, durable=True, arguments=task_queue_arguments())
+        self._connected.set()
+        log.info("publisher connected, queues %s", queues)
+
+    async def _close_connection(self) -> None:
+        self._connected.clear()
+        pool, connection = self._pool, self._connection
+        self._pool = self._connection = None
+        if pool is not None:
+            with suppress(Exception):
+                await pool.close()
+        if connection is not None:
+            with suppress(Exception):
+                await connection.close()
+
+    # --- publishing ---
+    async def _send(
+        self, body: bytes, corr_id: str, priority: Optional[int] = None, queue: Optional[str] = None
+    ) -> None:
+        queue = queue or self.queue
+        if not self._connected.is_set() or self._pool is None:
+            raise ConnectionError("broker is not connected")
+        message = aio_pika.Message(
+            body=body,
+            content_type="application/json",
+            correlation_id=corr_id,
+            priority=priority,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        )
+        started = time.perf_counter()
+        async with self._pool.acquire() as channel:
+            # с publisher confirms publish ждёт basic.ack от брокера
+            await channel.default_exchange.publish(
+                message, routing_key=queue, timeout=self.confirm_timeout
+            )
+        AMQP_PUBLISH_SECONDS.labels(queue).observe(time.perf_counter() - started)
+
+    async def publish(self, payload: Dict[str, Any]) -> str:
+        corr_id = str(payload.get("correlation_id") or uuid.uuid4())
+        body = json.dumps({**payload, "correlation_id": corr_id}).encode("utf-8")
+        priority = amqp_priority(payload.get("priority"))
+        queue = lane_queue(payload["lane"]) if payload.get("lane") else self.queue
+        try:
+            await self._send(body, corr_id, priority, queue)
+        except Exception as e:
+            try:
+                self._buffer.put_nowait((body, corr_id, priority, queue))
+            except asyncio.QueueFull:
+                AMQP_PUBLISH_FAILURES.labels(queue, "rejected").inc()
+                raise PublishError("message broker is unavailable") from e
+            AMQP_PUBLISH_FAILURES.labels(queue, "buffered").inc()
+            log.warning("publish of %s deferred (%s), buffered=%s", corr_id, e, self._buffer.qsize())
+        return corr_id
+
+    async def _flush_loop(self) -> None:
+        while True:
+            body, corr_id, priority, queue = await self._buffer.get()
+            try:
+                while True:
+                    await self._connected.wait()
+                    try:
+                        await self._send(body, corr_id, priority, queue)
+                        break
+                    except Exception as e:
+                        log.warning("buffered publish of %s failed: %s", corr_id, e)
+                        await asyncio.sleep(self.RETRY_DELAY_S)
+            finally:
+                self._buffer.task_done()
+
+
+# ────────────────────────── SINGLETON ─────────────────────────────────
+_publisher: Optional[AsyncPublisher] = None
+
+
+async def start_publisher() -> AsyncPublisher:
+    global _publisher
+    from app.core.settings import get_settings
+
+    settings = get_settings()
+    if _publisher is None:
+        _publisher = AsyncPublisher(
+            settings.AMQP_URL,
+            settings.TASK_QUEUE,
+            channels=settings.PUBLISHER_CHANNELS,
+            buffer_size=settings.PUBLISHER_BUFFER_SIZE,
+            confirm_timeout=settings.PUBLISHER_CONFIRM_TIMEOUT_S,
+        )
+        await _publisher.start()
+    return _publisher
+
+
+def get_publisher() -> Optional[AsyncPublisher]:
+    return _publisher
+
+
+async def stop_publisher() -> None:
+    global _publisher
+    if _publisher is not None:
+        await _publisher.stop()
+        _publisher = None
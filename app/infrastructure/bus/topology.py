@@ -0,0 +1,71 @@
+# app/infrastructure/bus/topology.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+# Приоритет задачи в payload ("priority"); в AMQP-приоритет он превращается,
+# только если очередь объявлена с x-max-priority (TASK_QUEUE_MAX_PRIORITY > 0).
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+
+# Полосы: interactive — одиночные запросы (API, бот), bulk — пакеты и задачи,
+# пониженные контролем допуска. interactive живёт в TASK_QUEUE, как и раньше.
+LANE_INTERACTIVE = "interactive"
+LANE_BULK = "bulk"
+
+
+def _settings():
+    from app.core.settings import get_settings
+
+    return get_settings()
+
+
+def lanes_enabled() -> bool:
+    return _settings().TASK_LANES_ENABLED
+
+
+def lane_for(priority: Optional[str] = None, *, bulk: bool = False) -> str:
+    return LANE_BULK if bulk or priority == PRIORITY_LOW else LANE_INTERACTIVE
+
+
+def lane_queue(lane: Optional[str]) -> str:
+    queue = _settings().TASK_QUEUE
+    if lane == LANE_BULK and lanes_enabled():
+        return f"{queue}.{LANE_BULK}"
+    return queue
+
+
+def task_queues() -> Dict[str, str]:
+    """Полоса → имя очереди (без полос — одна очередь interactive)."""
+    lanes = (LANE_INTERACTIVE, LANE_BULK) if lanes_enabled() else (LANE_INTERACTIVE,)
+    return {lane: lane_queue(lane) for lane in lanes}
+
+
+def task_queue_names() -> List[str]:
+    return list(task_queues().values())
+
+
+def task_queue_arguments() -> Optional[Dict[str, Any]]:
+    """
+    Аргументы объявления очередей задач — одинаковые у API и воркера, иначе брокер
+    ответит PRECONDITION_FAILED. Смена x-max-priority у существующей очереди
+    требует её пересоздания.
+    """
+    max_priority = _settings().TASK_QUEUE_MAX_PRIORITY
+    return {"x-max-priority": max_priority} if max_priority > 0 else None
+
+
+def amqp_priority(priority: Optional[str]) -> Optional[int]:
+    max_priority = _settings().TASK_QUEUE_MAX_PRIORITY
+    if max_priority <= 0:
+        return None
+    return 0 if priority == PRIORITY_LOW else max_priority
+
+
+# повторы ждут в "<очередь>.retry" (per-message TTL) и возвращаются в свою же полосу
+def retry_queue(queue: str) -> str:
+    return f"{queue}.retry"
+
+
+def retry_queue_arguments(queue: str) -> Dict[str, Any]:
+    return {"x-dead-letter-exchange": "", "x-dead-letter-routing-key": queue}
@@ -46,6 +46,18 @@ class Settings(BaseSettings):
     # Универсальная асинхронная строка подключения. Если задана переменная окружения
     # DATABASE_URL — используем её. Иначе собираем из компонентов Postgres.
     DATABASE_URL: Optional[str] = None
+    # Реплика только для чтения (история, дашборд, статусы задач). Пусто — всё на основной БД.
+    DATABASE_READ_URL: Optional[str] = None
+
+    # === Connection pool (для SQLite не применяется) ===
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_S: float = 30.0     # сколько ждать свободное соединение при checkout
+    DB_POOL_RECYCLE_S: int = 1800       # пересоздавать соединения старше N секунд; -1 — никогда
+    # "always" — SELECT 1 на каждый checkout: оборванное соединение (рестарт БД, failover)
+    # заменяется до запроса; "recycle" (по явному выбору) — без пинга, экономит round-trip,
+    # но запрос на оборванном соединении падает с ошибкой, спасает только DB_POOL_RECYCLE_S
+    DB_POOL_PRE_PING: str = "always"
 
     model_config = SettingsConfigDict(
         env_file=str(ENV_PATH),
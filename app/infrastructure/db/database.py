@@ -1,9 +1,11 @@
 # app/infrastructure/db/database.py
 from __future__ import annotations
 
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
 
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
@@ -47,16 +49,42 @@ def _resolve_database_url() -> str:
     return f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{name}"
 
 
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    Параметры пула из настроек DB_POOL_*. Для SQLite размеры пула не передаём:
+    у aiosqlite свой пул (для :memory: — StaticPool), и он их не принимает.
+    """
+    options: Dict[str, Any] = {
+        "echo": bool(getattr(settings, "DB_ECHO", False)),
+        # пинг отключает только явное "recycle": опечатка в значении не выключит его молча
+        "pool_pre_ping": str(settings.DB_POOL_PRE_PING).strip().lower() != "recycle",
+        "future": True,
+    }
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_S,
+            pool_recycle=settings.DB_POOL_RECYCLE_S,
+        )
+    return options
+
+
+def make_engine(url: str) -> AsyncEngine:
+    return create_async_engine(url, **engine_options(url))
+
+
 # --- DATABASE URL ---
 DATABASE_URL = _resolve_database_url()
+DATABASE_READ_URL = (getattr(settings, "DATABASE_READ_URL", None) or "").strip() or None
 
 # --- Engine & sessions ---
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=bool(getattr(settings, "DB_ECHO", False)),
-    pool_pre_ping=True,
-    future=True,
-)
+# engine — основная БД: все записи и биллинг.
+# read_engine — реплика для тяжёлых чтений (история, дашборд, статусы задач);
+# без DATABASE_READ_URL это тот же engine. Реплика может отставать: читать с неё
+# то, что нужно сразу после собственной записи в том же запросе, нельзя.
+engine = make_engine(DATABASE_URL)
+read_engine = make_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
 
 SessionLocal = async_sessionmaker(
     bind=engine,
@@ -64,8 +92,20 @@ SessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+) if read_engine is not engine else SessionLocal
+
 
 # --- Dependency ---
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         yield session
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Сессия на реплике (или на основной БД, если реплика не задана)."""
+    async with ReadSessionLocal() as session:
+        yield session
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.infrastructure.db.config import get_settings
 from app.infrastructure.db.database import engine, SessionLocal, Base
 from app.infrastructure.db.models.user import User
+from app.infrastructure.repositories.stats import StatsRepository
 
 settings = get_settings()
 
@@ -21,6 +22,9 @@ async def init(drop_all: Optional[bool] = None) -> None:
         wallet as _wallet,        # noqa: F401
         transaction as _tx,       # noqa: F401
         translation as _tr,       # noqa: F401
+        translation_cache as _tc, # noqa: F401
+        task as _task,            # noqa: F401
+        stats as _stats,          # noqa: F401
     )
 
     async with engine.begin() as conn:
@@ -30,6 +34,13 @@ async def init(drop_all: Optional[bool] = None) -> None:
         print("[init_db] CREATE ALL...")
         await conn.run_sync(Base.metadata.create_all)
 
+    async with SessionLocal() as session:  # type: AsyncSession
+        # счётчики дашборда на уже существующей базе: один раз пересчитать из таблиц,
+        # дальше они поддерживаются инкрементально
+        if await StatsRepository.rebuild_if_empty(session):
+            print("[init_db] Статистика дашборда пересчитана.")
+        await session.commit()
+
     async with SessionLocal() as session:  # type: AsyncSession
         try:
             print("[init_db] Добавление пользователей...")
@@ -0,0 +1,130 @@
+# app/infrastructure/db/models/stats.py
+from __future__ import annotations
+
+import random
+from collections import Counter
+from datetime import date
+
+from sqlalchemy import BigInteger, Date, Integer, String, event, func
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from app.infrastructure.db.database import Base
+
+
+class StatsCounter(Base):
+    """
+    Глобальные счётчики дашборда. Каждый счётчик разбит на шарды: вставка увеличивает
+    случайный шард, поэтому параллельные транзакции не ждут друг друга на одной строке.
+    Значение = сумма шардов (их фиксированное число — чтение O(1)).
+    """
+    __tablename__ = "stats_counters"
+
+    name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class StatsTranslationDaily(Base):
+    """
+    Переводы и списания по дням и языковым парам. Шардирована так же, как
+    StatsCounter: иначе строка (сегодня, популярная пара) — общая блокировка
+    для всех транзакций списания. Значение = сумма по шардам.
+    """
+    __tablename__ = "stats_translation_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    source_lang: Mapped[str] = mapped_column(String(16), primary_key=True)
+    target_lang: Mapped[str] = mapped_column(String(16), primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True, default=0)
+    translations: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    cost: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+# таблица сущности → имя счётчика
+COUNTED_TABLES = {"users": "users", "translations": "translations", "transactions": "transactions"}
+
+
+def translation_day(timestamp):
+    """
+    День перевода для разбивки по дням — всегда на стороне БД и из того же времени,
+    что и translations.timestamp (server_default now()): и listener, и rebuild.
+    """
+    return func.date(timestamp)
+
+
+def _insert_for(conn):
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif conn.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def upsert_increment(conn, table, keys: dict, increments: dict) -> None:
+    """INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col."""
+    insert = _insert_for(conn)
+    if insert is None:
+        # прочие СУБД: UPDATE, а если строки ещё нет — INSERT
+        where = [table.c[k] == v for k, v in keys.items()]
+        res = conn.execute(
+            table.update().where(*where).values({k: table.c[k] + v for k, v in increments.items()})
+        )
+        if res.rowcount == 0:
+            conn.execute(table.insert().values(**keys, **increments))
+        return
+    stmt = insert(table).values(**keys, **increments)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={k: table.c[k] + stmt.excluded[k] for k in increments},
+    )
+    conn.execute(stmt)
+
+
+def _shards() -> int:
+    from app.core.settings import get_settings
+
+    return max(1, get_settings().STATS_COUNTER_SHARDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed(session, flush_context) -> None:
+    """
+    Инкрементальное обновление счётчиков в той же транзакции, что и сама вставка:
+    откат транзакции откатывает и счётчики. Все строки — в один случайный шард.
+    """
+    totals: Counter = Counter()
+    daily: Counter = Counter()
+
+    for obj, sign in [(o, 1) for o in session.new] + [(o, -1) for o in session.deleted]:
+        name = COUNTED_TABLES.get(getattr(obj, "__tablename__", None))
+        if name is None:
+            continue
+        totals[name] += sign
+        if name == "translations":
+            key = (obj.source_lang or "", obj.target_lang or "")
+            daily[key + ("translations",)] += sign
+            daily[key + ("cost",)] += sign * int(obj.cost or 0)
+
+    if not totals:
+        return
+    conn = session.connection()
+    shard = random.randrange(_shards())
+    for name, delta in totals.items():
+        if delta:
+            upsert_increment(conn, StatsCounter.__table__, {"name": name, "shard": shard}, {"value": delta})
+
+    # день — как у строки перевода: now() той же транзакции, а не часы приложения
+    day = translation_day(func.now())
+    pairs = {key[:2] for key in daily}
+    for src, tgt in pairs:
+        upsert_increment(
+            conn,
+            StatsTranslationDaily.__table__,
+            {"day": day, "source_lang": src, "target_lang": tgt, "shard": shard},
+            {
+                "translations": daily[(src, tgt, "translations")],
+                "cost": daily[(src, tgt, "cost")],
+            },
+        )
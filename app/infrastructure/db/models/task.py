@@ -0,0 +1,50 @@
+# app/infrastructure/db/models/task.py
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum as PyEnum
+
+from sqlalchemy import String, DateTime, Integer, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.infrastructure.db.database import Base
+
+
+class TaskStatus(PyEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+TERMINAL_STATUSES = (TaskStatus.DONE.value, TaskStatus.FAILED.value)
+
+
+class TaskState(Base):
+    """Состояние задачи из очереди: пишет API при публикации и воркер на каждом шаге."""
+    __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_user_status", "user_id", "status"),
+        # пропускная способность воркеров для контроля допуска: завершённые за последние N секунд
+        Index("ix_tasks_finished_at", "finished_at"),
+        # поиск брошенных задач воркером: queued/running с давним updated_at
+        Index("ix_tasks_status_updated", "status", "updated_at"),
+    )
+
+    # совпадает с correlation_id сообщения и Translation.external_id
+    task_id: Mapped[str] = mapped_column(String, primary_key=True)
+    user_id: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default=TaskStatus.QUEUED.value)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<TaskState(task_id={self.task_id}, status={self.status}, attempts={self.attempts})>"
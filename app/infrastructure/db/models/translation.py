@@ -18,7 +18,8 @@ class Translation(Base):
         # cost может быть NULL (например, когда списание не произошло),
         # либо неотрицательное число
         CheckConstraint("cost IS NULL OR cost >= 0", name="ck_translations_cost_nonneg"),
-        Index("ix_translations_user_time", "user_id", "timestamp"),
+        # keyset-пагинация истории: WHERE user_id = ? AND (timestamp, id) < (?, ?)
+        Index("ix_translations_user_time", "user_id", "timestamp", "id"),
     )
 
     id: Mapped[str] = mapped_column(
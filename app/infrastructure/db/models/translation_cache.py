@@ -0,0 +1,26 @@
+# app/infrastructure/db/models/translation_cache.py
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.infrastructure.db.database import Base
+
+
+class TranslationCacheEntry(Base):
+    """Общий (между процессами) уровень кэша переводов."""
+    __tablename__ = "translation_cache"
+
+    # sha256 от (модель, пара языков, нормализованный текст)
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String, nullable=False)
+    source_lang: Mapped[str] = mapped_column(String, nullable=False)
+    target_lang: Mapped[str] = mapped_column(String, nullable=False)
+    output_text: Mapped[str] = mapped_column(String, nullable=False)
+    # UTC со стороны приложения, как в tasks: TTL-отсечка считается тем же datetime.utcnow(),
+    # а now() сервера БД отдаёт локальное время сессии
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False), default=datetime.utcnow, nullable=False, index=True
+    )
@@ -3,16 +3,18 @@ from __future__ import annotations
 import uuid
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, Boolean
-from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy import String, Boolean, event, inspect
+from sqlalchemy.orm import relationship, Mapped, WriteOnlyMapped, mapped_column, Session
 
 from app.infrastructure.db.database import Base
 from app.core.utils.hasher import PasswordHasher
 from app.core.utils.validator import UserValidator
+from app.core.principal import get_principal_cache
 from app.infrastructure.db.models.wallet import Wallet
 
 from app.infrastructure.db.models.transaction import Transaction
 from app.infrastructure.db.models.translation import Translation
+from app.infrastructure.db.models import stats as _stats  # noqa: F401  (listener счётчиков дашборда)
 __all__ = ["User", "Wallet", "Transaction", "Translation"]
 
 class User(Base):
@@ -38,18 +40,20 @@ class User(Base):
         cascade="all, delete-orphan",
         single_parent=True,  # важно для delete-orphan в 1:1
     )
-    transactions: Mapped[list["Transaction"]] = relationship(
+    # история растёт без ограничений: коллекции никогда не грузятся целиком,
+    # только постранично через user.transactions.select() / user.translations.select()
+    transactions: WriteOnlyMapped["Transaction"] = relationship(
         "Transaction",
         back_populates="user",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,
     )
 
-    translations: Mapped[list["Translation"]] = relationship(
+    translations: WriteOnlyMapped["Translation"] = relationship(
         "Translation",
         back_populates="user",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,
     )
 
     # --- Factory ---
@@ -82,6 +86,20 @@ class User(Base):
     def check_password(self, password: str) -> bool:
         return PasswordHasher.check(password, self._password_hash)
 
+    # async-варианты: bcrypt уходит в отдельный пул потоков, event loop свободен
+    async def set_password_async(self, new_password: str) -> None:
+        UserValidator.validate_password(new_password)
+        self._password_hash = await PasswordHasher.hash_async(new_password)
+
+    async def check_password_async(self, password: str) -> bool:
+        if not await PasswordHasher.check_async(password, self._password_hash):
+            return False
+        if PasswordHasher.needs_rehash(self._password_hash):
+            # cost поменялся — пароль известен только сейчас, пересчитываем хеш;
+            # сохранить изменение должен вызывающий (commit)
+            self._password_hash = await PasswordHasher.hash_async(password)
+        return True
+
     @property
     def password_hash(self) -> str:
         return self._password_hash
@@ -91,3 +109,34 @@ class User(Base):
         new_email = (new_email or "").strip().lower()
         UserValidator.validate_email(new_email)
         self.email = new_email
+
+
+# ───────────── инвалидация кэша принципалов ─────────────
+# поля, которые попадают в Principal или влияют на доверие к старым токенам
+_PRINCIPAL_FIELDS = ("email", "_password_hash", "is_admin")
+_PENDING_KEY = "principal_invalidate"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_principal_changes(session, flush_context) -> None:
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if any(state.attrs[f].history.has_changes() for f in _PRINCIPAL_FIELDS):
+                pending.add(str(obj.id))
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            pending.add(str(obj.id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_principals(session) -> None:
+    cache = get_principal_cache()
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_principal_changes(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
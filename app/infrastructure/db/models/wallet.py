@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 import uuid
-from sqlalchemy import Integer, String, ForeignKey, CheckConstraint, Index
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.infrastructure.db.database import Base
 
@@ -29,3 +31,35 @@ class Wallet(Base):
 
     def __repr__(self) -> str:
         return f"<Wallet(user_id={self.user_id}, balance={self.balance})>"
+
+
+HOLD_HELD = "held"
+HOLD_SETTLED = "settled"
+HOLD_RELEASED = "released"
+
+
+class WalletHold(Base):
+    """
+    Резерв средств под задачу: пишется в той же транзакции, что и уменьшение баланса.
+    id = ledger_id(user_id, external_id) — повторная доставка задачи находит свой
+    резерв и не списывает второй раз. held → settled (перевод зафиксирован)
+    или held → released (деньги вернулись на баланс).
+    """
+
+    __tablename__ = "wallet_holds"
+    __table_args__ = (
+        # поиск зависших резервов: WHERE status = 'held' AND updated_at < ?
+        Index("ix_wallet_holds_status_updated", "status", "updated_at"),
+    )
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    user_id: Mapped[str] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default=HOLD_HELD)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<WalletHold(id={self.id}, amount={self.amount}, status={self.status})>"
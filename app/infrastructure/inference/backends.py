@@ -0,0 +1,181 @@
+# app/infrastructure/inference/backends.py
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, Type
+
+log = logging.getLogger("inference.backends")
+
+LangPair = Tuple[str, str]
+
+REFERENCE_BACKEND = "pipeline"
+
+
+class InferenceBackend:
+    """
+    Способ исполнения модели перевода. load() возвращает объект с интерфейсом
+    translation-pipeline (tokenizer, model.generate, device): дальше инференс
+    (translate_encoded, батчинг, пул процессов) не зависит от бэкенда.
+    """
+
+    name: str = ""
+
+    def load(self, model_name: str) -> Any:
+        raise NotImplementedError
+
+
+BACKENDS: Dict[str, Type[InferenceBackend]] = {}
+
+
+def register_backend(cls: Type[InferenceBackend]) -> Type[InferenceBackend]:
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+@register_backend
+class PipelineBackend(InferenceBackend):
+    """Эталон: transformers.pipeline на float32 PyTorch — с ним сверяются остальные."""
+
+    name = REFERENCE_BACKEND
+
+    def load(self, model_name: str) -> Any:
+        from transformers import pipeline
+
+        return pipeline("translation", model=model_name)
+
+
+@register_backend
+class QuantizedBackend(PipelineBackend):
+    """
+    Динамическая int8-квантизация Linear-слоёв PyTorch: веса хранятся в int8,
+    активации квантуются на лету. Только CPU, без калибровки и экспорта.
+    """
+
+    name = "int8"
+
+    def load(self, model_name: str) -> Any:
+        import torch
+
+        pipe = super().load(model_name)
+        pipe.model = torch.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipe
+
+
+@register_backend
+class OnnxBackend(InferenceBackend):
+    """
+    ONNX Runtime через optimum. Экспорт и оптимизация графа — один раз на модель:
+    результат кладётся в INFERENCE_ONNX_CACHE_DIR и переиспользуется всеми
+    процессами. Каталог публикуется атомарным rename, так что параллельный
+    прогрев нескольких процессов пула не видит недописанный граф.
+    """
+
+    name = "onnx"
+
+    def __init__(self, cache_dir: Optional[str] = None, optimization_level: Optional[int] = None):
+        from app.core.settings import get_settings
+
+        settings = get_settings()
+        self.cache_dir = cache_dir or settings.INFERENCE_ONNX_CACHE_DIR
+        self.optimization_level = (
+            settings.INFERENCE_ONNX_OPTIMIZATION_LEVEL if optimization_level is None else optimization_level
+        )
+
+    def model_dir(self, model_name: str) -> str:
+        return os.path.join(self.cache_dir, model_name.replace("/", "--"), f"O{self.optimization_level}")
+
+    def load(self, model_name: str) -> Any:
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise RuntimeError("ONNX backend requires optimum[onnxruntime]") from e
+        from transformers import AutoTokenizer, pipeline
+
+        path = self.model_dir(model_name)
+        if not os.path.isdir(path):
+            self._export(model_name, path)
+        model = ORTModelForSeq2SeqLM.from_pretrained(path)
+        tokenizer = AutoTokenizer.from_pretrained(path)
+        return pipeline("translation", model=model, tokenizer=tokenizer)
+
+    def _export(self, model_name: str, path: str) -> None:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        from transformers import AutoTokenizer
+
+        log.info("exporting %s to ONNX (O%s) into %s ...", model_name, self.optimization_level, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".export-", dir=os.path.dirname(path))
+        try:
+            model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+            if self.optimization_level > 0:
+                from optimum.onnxruntime import ORTOptimizer
+                from optimum.onnxruntime.configuration import OptimizationConfig
+
+                ORTOptimizer.from_pretrained(model).optimize(
+                    save_dir=tmp,
+                    optimization_config=OptimizationConfig(optimization_level=self.optimization_level),
+                )
+            else:
+                model.save_pretrained(tmp)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(tmp)
+            try:
+                os.rename(tmp, path)
+            except OSError:
+                # другой процесс успел раньше — его граф такой же
+                if not os.path.isdir(path):
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+@lru_cache(maxsize=8)
+def parse_pair_backends(raw: str) -> Dict[LangPair, str]:
+    """"en-fr:onnx,fr-en:int8" → {("en", "fr"): "onnx", ("fr", "en"): "int8"}."""
+    out: Dict[LangPair, str] = {}
+    for part in (raw or "").split(","):
+        pair, _, backend = part.partition(":")
+        src, _, tgt = pair.strip().partition("-")
+        if src and tgt and backend.strip():
+            out[(src.lower(), tgt.lower())] = backend.strip().lower()
+    return out
+
+
+def backend_for(key: LangPair) -> str:
+    """Бэкенд языковой пары: INFERENCE_PAIR_BACKENDS, иначе INFERENCE_BACKEND."""
+    from app.core.settings import get_settings
+
+    settings = get_settings()
+    backend = parse_pair_backends(settings.INFERENCE_PAIR_BACKENDS).get(key, settings.INFERENCE_BACKEND)
+    if backend not in BACKENDS:
+        _warn_unknown(backend)
+        return REFERENCE_BACKEND
+    return backend
+
+
+@lru_cache(maxsize=None)
+def _warn_unknown(backend: str) -> None:
+    log.error("unknown inference backend %r, using %s", backend, REFERENCE_BACKEND)
+
+
+def load_pipeline(model_name: str, backend: str = REFERENCE_BACKEND) -> Tuple[Any, str]:
+    """
+    Загружает модель выбранным бэкендом; возвращает (pipeline, бэкенд, который реально
+    загрузился). Неизвестный или не поднявшийся бэкенд откатывается на эталонный
+    pipeline: медленнее, но сервис остаётся в строю, а ключи кэша — честными.
+    """
+    cls = BACKENDS.get(backend)
+    if cls is None:
+        log.error("unknown inference backend %r for %s, using %s", backend, model_name, REFERENCE_BACKEND)
+        cls = PipelineBackend
+    try:
+        return cls().load(model_name), cls.name
+    except Exception as e:
+        if cls is PipelineBackend:
+            raise
+        log.error("backend %s failed for %s (%s: %s), using %s",
+                  backend, model_name, type(e).__name__, e, REFERENCE_BACKEND)
+        return PipelineBackend().load(model_name), REFERENCE_BACKEND
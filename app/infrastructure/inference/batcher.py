@@ -0,0 +1,245 @@
+# app/infrastructure/inference/batcher.py
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from app.core.metrics import BATCH_WAIT_SECONDS
+from app.infrastructure.inference.generation import Encoding, padding_stats
+
+log = logging.getLogger("inference.batcher")
+
+# run_batch(key, texts, encodings): encodings — input_ids тех же текстов, посчитанные один раз при submit
+RunBatch = Callable[[Hashable, List[str], List[Encoding]], List[str]]
+Encode = Callable[[Hashable, str], Encoding]
+
+DEFAULT_LENGTH_BUCKETS = (8, 16, 32, 64, 128, 256)
+
+
+def parse_buckets(raw: str) -> Tuple[int, ...]:
+    """"8,16,32" → (8, 16, 32); мусор и неположительные значения отбрасываются."""
+    bounds = set()
+    for part in (raw or "").split(","):
+        try:
+            value = int(part)
+        except ValueError:
+            continue
+        if value > 0:
+            bounds.add(value)
+    return tuple(sorted(bounds))
+
+
+@dataclass
+class _Pending:
+    text: str
+    ids: Encoding
+    future: Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def tokens(self) -> int:
+        return max(1, len(self.ids))
+
+
+@dataclass
+class BatchStats:
+    """Счётчики для подбора окна батчинга."""
+    batches: int = 0
+    items: int = 0
+    max_batch_size: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+    real_tokens: int = 0
+    padded_tokens: int = 0
+
+    def record(self, size: int, waits_ms: List[float], real_tokens: int = 0, padded_tokens: int = 0) -> None:
+        self.batches += 1
+        self.items += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.wait_ms_total += sum(waits_ms)
+        self.wait_ms_max = max(self.wait_ms_max, max(waits_ms, default=0.0))
+        self.real_tokens += real_tokens
+        self.padded_tokens += padded_tokens
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "avg_wait_ms": round(self.wait_ms_total / self.items, 2) if self.items else 0.0,
+            "max_wait_ms": round(self.wait_ms_max, 2),
+            "padding_efficiency": round(self.real_tokens / self.padded_tokens, 3) if self.padded_tokens else 0.0,
+        }
+
+
+class BatchingEngine:
+    """
+    Микро-батчинг запросов к модели с группировкой по длине.
+    Текст токенизируется один раз при submit; ожидающие копятся отдельно по ключу
+    (пара языков) и корзине длины (length_buckets — верхние границы в токенах),
+    чтобы 5-токенная строка не ехала в одной пачке с абзацем на 400 токенов.
+    Корзина уходит в модель по окну window_ms либо когда набрался бюджет:
+    max_batch_tokens считается с паддингом (строк × самая длинная строка),
+    так что размер пачки определяется длиной текстов, max_batch_size — лишь потолок.
+    Один вызов run_batch(key, texts, encodings) переводит пачку на готовых input_ids
+    и раздаёт каждому вызывающему свой результат.
+    """
+
+    LOG_EVERY_N_BATCHES = 100
+
+    def __init__(
+        self,
+        run_batch: RunBatch,
+        *,
+        window_ms: float = 10,
+        max_batch_size: int = 16,
+        max_batch_tokens: int = 4096,
+        length_buckets: Sequence[int] = DEFAULT_LENGTH_BUCKETS,
+        encode: Optional[Encode] = None,
+        workers: int = 1,
+    ):
+        self._run_batch = run_batch
+        self._window = max(0.0, float(window_ms)) / 1000.0
+        self._max_batch_size = max(1, int(max_batch_size))
+        self._max_batch_tokens = max(1, int(max_batch_tokens))
+        self._buckets = tuple(sorted(int(b) for b in length_buckets if int(b) > 0))
+        self._encode = encode or (lambda _key, text: list(range(len(text.split()))))
+        self._workers = max(1, int(workers))
+
+        # (ключ, номер корзины длины) → ожидающие в порядке поступления
+        self._queues: Dict[Tuple[Hashable, int], Deque[_Pending]] = {}
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+        self.stats = BatchStats()
+
+    # --- Public API ---
+    def submit(self, key: Hashable, text: str, ids: Optional[Encoding] = None) -> Future:
+        """ids — уже посчитанные input_ids текста (например, при сегментации), иначе токенизируем здесь."""
+        fut: Future = Future()
+        item = _Pending(text=text, ids=list(ids) if ids is not None else self._encode(key, text), future=fut)
+        bucket = bisect.bisect_left(self._buckets, item.tokens)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BatchingEngine is closed")
+            self._ensure_threads()
+            self._queues.setdefault((key, bucket), deque()).append(item)
+            self._cond.notify()
+        return fut
+
+    def translate(self, key: Hashable, text: str, timeout: Optional[float] = None) -> str:
+        return self.submit(key, text).result(timeout=timeout)
+
+    def pending(self) -> int:
+        """Текстов, ждущих своего батча (без уже выполняющихся)."""
+        with self._cond:
+            return sum(len(q) for q in self._queues.values())
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join()
+        self._threads.clear()
+
+    # --- Internals ---
+    def _ensure_threads(self) -> None:
+        if self._threads:
+            return
+        for i in range(self._workers):
+            t = threading.Thread(target=self._loop, name=f"inference-batcher-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _is_full(self, q: Deque[_Pending]) -> bool:
+        if len(q) >= self._max_batch_size:
+            return True
+        return len(q) * max(p.tokens for p in q) >= self._max_batch_tokens
+
+    def _pop_batch(self, q: Deque[_Pending]) -> List[_Pending]:
+        batch: List[_Pending] = []
+        longest = 0
+        while q and len(batch) < self._max_batch_size:
+            # бюджет — с паддингом: все строки пачки дополняются до самой длинной
+            padded = (len(batch) + 1) * max(longest, q[0].tokens)
+            if batch and padded > self._max_batch_tokens:
+                break
+            item = q.popleft()
+            longest = max(longest, item.tokens)
+            batch.append(item)
+        return batch
+
+    def _take_ready_batch(self) -> Tuple[Optional[Tuple[Hashable, int]], List[_Pending]]:
+        """Ждёт (под self._cond), пока какая-нибудь очередь не созреет."""
+        while True:
+            now = time.monotonic()
+            ready_key, ready_at = None, None
+            wait_for: Optional[float] = None
+            for key, q in self._queues.items():
+                if not q:
+                    continue
+                deadline = q[0].enqueued_at + self._window
+                if self._closed or now >= deadline or self._is_full(q):
+                    # из созревших берём очередь с самым старым запросом
+                    if ready_at is None or q[0].enqueued_at < ready_at:
+                        ready_key, ready_at = key, q[0].enqueued_at
+                else:
+                    left = deadline - now
+                    wait_for = left if wait_for is None else min(wait_for, left)
+
+            if ready_key is not None:
+                q = self._queues[ready_key]
+                batch = self._pop_batch(q)
+                if not q:
+                    del self._queues[ready_key]
+                return ready_key, batch
+
+            if self._closed:
+                return None, []
+            self._cond.wait(timeout=wait_for)
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                queue_key, batch = self._take_ready_batch()
+            if queue_key is None:
+                return
+            self._execute(queue_key[0], batch)
+
+    def _execute(self, key: Hashable, batch: List[_Pending]) -> None:
+        batch = [p for p in batch if p.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.monotonic()
+        waits_ms = [(started - p.enqueued_at) * 1000.0 for p in batch]
+        for wait_ms in waits_ms:
+            BATCH_WAIT_SECONDS.observe(wait_ms / 1000.0)
+        try:
+            outputs = self._run_batch(key, [p.text for p in batch], [p.ids for p in batch])
+            if len(outputs) != len(batch):
+                raise RuntimeError(
+                    f"run_batch returned {len(outputs)} results for {len(batch)} inputs"
+                )
+        except Exception as e:
+            for p in batch:
+                p.future.set_exception(e)
+        else:
+            for p, out in zip(batch, outputs):
+                p.future.set_result(out)
+
+        real, padded = padding_stats([p.ids for p in batch])
+        with self._cond:
+            self.stats.record(len(batch), waits_ms, real, padded)
+            snapshot = self.stats.snapshot() if self.stats.batches % self.LOG_EVERY_N_BATCHES == 0 else None
+        log.debug("batch %s: size=%s max_wait_ms=%.1f", key, len(batch), max(waits_ms))
+        if snapshot:
+            log.info("batching stats: %s", snapshot)
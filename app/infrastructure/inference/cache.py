@@ -0,0 +1,233 @@
+# app/infrastructure/inference/cache.py
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Protocol, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import CACHE_LOOKUPS
+from app.infrastructure.db.models.translation_cache import TranslationCacheEntry
+
+log = logging.getLogger("inference.cache")
+
+_HSPACE = re.compile(r"[ \t\u00a0]+")
+
+
+def normalize_text(text: str) -> str:
+    """NFC + обрезка краёв + схлопывание пробелов внутри строки (переводы строк сохраняем)."""
+    text = unicodedata.normalize("NFC", text or "")
+    lines = [_HSPACE.sub(" ", line).strip() for line in text.strip().splitlines()]
+    return "\n".join(lines)
+
+
+def cache_key(text: str, source_lang: str, target_lang: str, model: str) -> str:
+    raw = "\x00".join((model, source_lang, target_lang, normalize_text(text)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    local_hits: int = 0
+    shared_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def snapshot(self) -> Dict[str, float]:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        hits = self.local_hits + self.shared_hits
+        return {
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ────────────────────────── LOCAL TIER ────────────────────────────────
+class LRUCache:
+    """Потокобезопасный LRU с TTL — процессный уровень кэша."""
+
+    def __init__(self, max_items: int, ttl_s: float, stats: Optional[CacheStats] = None):
+        self.max_items = max(1, int(max_items))
+        self.ttl_s = float(ttl_s)
+        self.stats = stats or CacheStats()
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < now:
+                del self._data[key]
+                self.stats.expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_s, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ────────────────────────── SHARED TIER ───────────────────────────────
+class CacheStore(Protocol):
+    """Общий уровень кэша (таблица в БД, Redis и т.п.)."""
+
+    async def get(self, key: str) -> Optional[str]: ...
+
+    async def set(self, key: str, value: str, *, model: str, source_lang: str, target_lang: str) -> None: ...
+
+
+class DbCacheStore:
+    """Общий уровень на таблице translation_cache; TTL проверяется при чтении."""
+
+    PURGE_EVERY_N_WRITES = 1000
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], ttl_s: float):
+        self._session_factory = session_factory
+        self.ttl_s = float(ttl_s)
+        self._writes = 0
+
+    def _cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=self.ttl_s)
+
+    async def get(self, key: str) -> Optional[str]:
+        async with self._session_factory() as db:
+            res = await db.execute(
+                select(TranslationCacheEntry.output_text)
+                .where(TranslationCacheEntry.key == key)
+                .where(TranslationCacheEntry.created_at >= self._cutoff())
+            )
+            return res.scalar_one_or_none()
+
+    async def set(self, key: str, value: str, *, model: str, source_lang: str, target_lang: str) -> None:
+        self._writes += 1
+        async with self._session_factory() as db:
+            try:
+                async with db.begin():
+                    await db.execute(delete(TranslationCacheEntry).where(TranslationCacheEntry.key == key))
+                    db.add(TranslationCacheEntry(
+                        key=key,
+                        model=model,
+                        source_lang=source_lang,
+                        target_lang=target_lang,
+                        output_text=value,
+                        created_at=datetime.utcnow(),
+                    ))
+            except IntegrityError:
+                # параллельный воркер записал тот же ключ — значение то же самое
+                pass
+            if self._writes % self.PURGE_EVERY_N_WRITES == 0:
+                async with db.begin():
+                    await db.execute(
+                        delete(TranslationCacheEntry).where(TranslationCacheEntry.created_at < self._cutoff())
+                    )
+
+
+# ────────────────────────── FACADE ────────────────────────────────────
+class TranslationCache:
+    """
+    Кэш результатов перевода по хэшу нормализованного текста.
+    Сначала процессный LRU, затем (если задан) общий store.
+    """
+
+    def __init__(self, *, max_items: int, ttl_s: float, store: Optional[CacheStore] = None):
+        self.stats = CacheStats()
+        self.local = LRUCache(max_items, ttl_s, self.stats)
+        self.store = store
+
+    # синхронный доступ к локальному уровню — для кода, работающего в потоках инференса
+    def get_local(self, key: str) -> Optional[str]:
+        value = self.local.get(key)
+        if value is None:
+            self.stats.misses += 1
+            CACHE_LOOKUPS.labels("miss").inc()
+        else:
+            self.stats.local_hits += 1
+            CACHE_LOOKUPS.labels("local_hit").inc()
+        return value
+
+    def set_local(self, key: str, value: str) -> None:
+        self.local.set(key, value)
+
+    async def get(self, text: str, source_lang: str, target_lang: str, model: str) -> Optional[str]:
+        key = cache_key(text, source_lang, target_lang, model)
+        value = self.local.get(key)
+        if value is not None:
+            self.stats.local_hits += 1
+            CACHE_LOOKUPS.labels("local_hit").inc()
+            return value
+        if self.store is not None:
+            try:
+                value = await self.store.get(key)
+            except Exception as e:
+                log.warning("shared cache get failed: %s", e)
+                value = None
+            if value is not None:
+                self.stats.shared_hits += 1
+                CACHE_LOOKUPS.labels("shared_hit").inc()
+                self.local.set(key, value)
+                return value
+        self.stats.misses += 1
+        CACHE_LOOKUPS.labels("miss").inc()
+        return None
+
+    async def set(self, text: str, source_lang: str, target_lang: str, model: str, value: str) -> None:
+        key = cache_key(text, source_lang, target_lang, model)
+        self.local.set(key, value)
+        if self.store is not None:
+            try:
+                await self.store.set(key, value, model=model, source_lang=source_lang, target_lang=target_lang)
+            except Exception as e:
+                log.warning("shared cache set failed: %s", e)
+
+
+_cache: Optional[TranslationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_translation_cache() -> Optional[TranslationCache]:
+    """Кэш процесса по настройкам TRANSLATION_CACHE_*; None, если кэш выключен."""
+    global _cache
+    from app.core.settings import get_settings
+
+    settings = get_settings()
+    if not settings.TRANSLATION_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            store: Optional[CacheStore] = None
+            if settings.TRANSLATION_CACHE_SHARED.strip().lower() == "db":
+                from app.infrastructure.db.database import SessionLocal
+                store = DbCacheStore(SessionLocal, ttl_s=settings.TRANSLATION_CACHE_TTL_S)
+            _cache = TranslationCache(
+                max_items=settings.TRANSLATION_CACHE_MAX_ITEMS,
+                ttl_s=settings.TRANSLATION_CACHE_TTL_S,
+                store=store,
+            )
+        return _cache
@@ -0,0 +1,50 @@
+# app/infrastructure/inference/generation.py
+from __future__ import annotations
+
+from typing import Any, List, Sequence, Tuple
+
+Encoding = List[int]
+
+
+def padding_stats(encodings: Sequence[Sequence[int]]) -> Tuple[int, int]:
+    """(реальных токенов, токенов с паддингом до самой длинной строки пачки)."""
+    if not encodings:
+        return 0, 0
+    real = sum(len(e) for e in encodings)
+    return real, len(encodings) * max(len(e) for e in encodings)
+
+
+def translate_encoded(pipe: Any, encodings: Sequence[Encoding]) -> List[str]:
+    """
+    Перевод уже токенизированной пачки: паддинг готовых input_ids и один generate.
+    То же, что делает translation-pipeline, но без повторной токенизации текстов.
+    """
+    import torch
+
+    tokenizer = pipe.tokenizer
+    inputs = tokenizer.pad({"input_ids": [list(e) for e in encodings]}, return_tensors="pt")
+    inputs = {name: tensor.to(pipe.device) for name, tensor in inputs.items()}
+    with torch.inference_mode():
+        output_ids = pipe.model.generate(**inputs)
+    return tokenizer.batch_decode(output_ids, skip_special_tokens=True, clean_up_tokenization_spaces=False)
+
+
+def budget_chunks(encodings: Sequence[Sequence[int]], max_tokens: int, max_size: int) -> List[List[int]]:
+    """
+    Индексы encodings, отсортированные по длине и нарезанные на пачки,
+    где строк × самая длинная строка ≤ max_tokens и строк ≤ max_size.
+    """
+    order = sorted(range(len(encodings)), key=lambda i: len(encodings[i]))
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    longest = 0
+    for i in order:
+        n = max(1, len(encodings[i]))
+        if current and (len(current) >= max_size or (len(current) + 1) * max(longest, n) > max_tokens):
+            chunks.append(current)
+            current, longest = [], 0
+        current.append(i)
+        longest = max(longest, n)
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,330 @@
+# app/infrastructure/inference/pool.py
+from __future__ import annotations
+
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.metrics import MODEL_LOAD_SECONDS
+from app.infrastructure.inference.backends import REFERENCE_BACKEND, load_pipeline
+from app.infrastructure.inference.generation import Encoding, translate_encoded
+
+log = logging.getLogger("inference.pool")
+
+LangPair = Tuple[str, str]
+
+
+# ────────────────────────── CHILD PROCESS ─────────────────────────────
+def _worker_main(
+    worker_id: int,
+    models: Dict[LangPair, str],
+    backends: Dict[LangPair, str],
+    threads: int,
+    requests: "mp.Queue",
+    results: "mp.Queue",
+) -> None:
+    """
+    Процесс инференса: ограничиваем потоки BLAS/torch, прогреваем все модели,
+    сообщаем родителю о готовности и обслуживаем свою очередь запросов.
+    """
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+        pipes: Dict[LangPair, Any] = {}
+        load_seconds: Dict[str, float] = {}
+        loaded: Dict[LangPair, str] = {}
+        for key, name in models.items():
+            started = time.monotonic()
+            pipes[key], loaded[key] = load_pipeline(name, backends.get(key, REFERENCE_BACKEND))
+            load_seconds["-".join(key)] = round(time.monotonic() - started, 3)
+    except Exception as e:
+        results.put(("failed", worker_id, f"{type(e).__name__}: {e}"))
+        return
+
+    # бэкенд, который реально поднялся (мог откатиться на эталон), — для ключей кэша
+    results.put(("ready", worker_id, {"load_seconds": load_seconds, "backends": loaded}))
+
+    while True:
+        item = requests.get()
+        if item is None:
+            break
+        req_id, key, texts, encodings = item
+        try:
+            if encodings:
+                # родитель уже токенизировал тексты — гоняем generate на готовых input_ids
+                results.put(("ok", req_id, translate_encoded(pipes[key], encodings)))
+            else:
+                outputs = pipes[key](list(texts), batch_size=len(texts))
+                results.put(("ok", req_id, [o["translation_text"] for o in outputs]))
+        except Exception as e:
+            results.put(("error", req_id, f"{type(e).__name__}: {e}"))
+
+
+# ────────────────────────── PARENT SIDE ───────────────────────────────
+class InferencePoolError(RuntimeError):
+    pass
+
+
+class InferencePool:
+    """
+    N процессов инференса с заранее загруженными моделями.
+    У каждого процесса своя multiprocessing-очередь: родитель сам выбирает наименее
+    загруженный процесс и помнит, какой запрос где, — поэтому при падении процесса
+    его незавершённые Future сразу получают ошибку, а не ждут таймаута.
+    Ответы разбирает поток-диспетчер, живость процессов проверяет отдельный поток
+    раз в check_interval_s, независимо от потока ответов.
+    """
+
+    def __init__(
+        self,
+        models: Dict[LangPair, str],
+        *,
+        backends: Optional[Dict[LangPair, str]] = None,
+        workers: int = 1,
+        threads: int = 1,
+        check_interval_s: float = 1.0,
+    ):
+        self.models = dict(models)
+        self.backends = dict(backends or {})
+        self.workers = max(1, int(workers))
+        self.threads = max(1, int(threads))
+        self.check_interval_s = max(0.05, float(check_interval_s))
+
+        self._ctx = mp.get_context("spawn")
+        self._requests: Dict[int, Any] = {}   # worker_id → его очередь запросов
+        self._results = self._ctx.Queue()
+        self._procs: Dict[int, Any] = {}
+        self._warm: Dict[int, Dict[str, float]] = {}
+        self._loaded: Dict[int, Dict[LangPair, str]] = {}   # worker_id → бэкенды, что реально поднялись
+        self._failed: Dict[int, str] = {}
+        self._pending: Dict[int, Future] = {}
+        self._assigned: Dict[int, int] = {}   # req_id → worker_id
+        self._load: Dict[int, int] = {}       # worker_id → запросов в работе
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._monitor: Optional[threading.Thread] = None
+
+    # --- lifecycle ---
+    def start(self) -> "InferencePool":
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+        self._dispatcher = threading.Thread(target=self._dispatch, name="inference-pool-dispatcher", daemon=True)
+        self._dispatcher.start()
+        self._monitor = threading.Thread(target=self._watch, name="inference-pool-monitor", daemon=True)
+        self._monitor.start()
+        log.info("inference pool started: workers=%s threads=%s models=%s backends=%s",
+                 self.workers, self.threads, list(self.models), self.backends)
+        return self
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stopped.set()
+        for requests in self._requests.values():
+            requests.put(None)
+        for proc in self._procs.values():
+            proc.join(timeout=timeout)
+            if proc.is_alive():
+                proc.terminate()
+        with self._lock:
+            for fut in self._pending.values():
+                fut.set_exception(InferencePoolError("inference pool stopped"))
+            self._pending.clear()
+            self._assigned.clear()
+            self._load.clear()
+        self._ready.clear()
+
+    def _spawn(self, worker_id: int) -> None:
+        # новая очередь: старую умерший процесс мог бросить с захваченной блокировкой
+        requests = self._ctx.Queue()
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.models, self.backends, self.threads, requests, self._results),
+            name=f"inference-{worker_id}",
+            daemon=True,
+        )
+        proc.start()
+        with self._lock:
+            self._requests[worker_id] = requests
+            self._procs[worker_id] = proc
+            self._load[worker_id] = 0
+
+    # --- readiness ---
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout=timeout)
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+            warm = dict(self._warm)
+            failed = dict(self._failed)
+        return {
+            "mode": "pool",
+            "ready": self.ready,
+            "workers": self.workers,
+            "alive": sum(1 for p in self._procs.values() if p.is_alive()),
+            "warm": len(warm),
+            "failed": failed,
+            "pending": pending,
+            "load_seconds": warm,
+            "backends": {"-".join(k): self.loaded_backend(k) or self.backends.get(k, REFERENCE_BACKEND)
+                         for k in self.models},
+        }
+
+    def loaded_backend(self, key: LangPair) -> Optional[str]:
+        """
+        Бэкенд пары в прогретых процессах; None — ни один ещё не прогрет.
+        Если процессы подняли разное (у части откат на эталон) — "int8+pipeline":
+        такие переводы кэшируются отдельно от однородных.
+        """
+        with self._lock:
+            names = {loaded[key] for w, loaded in self._loaded.items() if w in self._warm and key in loaded}
+        return "+".join(sorted(names)) or None
+
+    @property
+    def pending(self) -> int:
+        """Пачек, отправленных в процессы и ещё не вернувшихся."""
+        return len(self._pending)
+
+    # --- requests ---
+    def submit(self, key: LangPair, texts: List[str], encodings: Optional[List[Encoding]] = None) -> Future:
+        if key not in self.models:
+            raise ValueError("Модель перевода не поддерживается")
+        fut: Future = Future()
+        req_id = next(self._ids)
+        with self._lock:
+            worker_id = self._pick_worker()
+            self._pending[req_id] = fut
+            self._assigned[req_id] = worker_id
+            self._load[worker_id] += 1
+            requests = self._requests[worker_id]
+        requests.put((req_id, key, list(texts), encodings))
+        return fut
+
+    def _pick_worker(self) -> int:
+        """Наименее загруженный из живых прогретых процессов (под self._lock)."""
+        alive = [w for w, p in self._procs.items() if p.is_alive()] or list(self._procs)
+        warm = [w for w in alive if w in self._warm] or alive
+        return min(warm, key=lambda w: self._load.get(w, 0))
+
+    def translate_batch(
+        self,
+        key: LangPair,
+        texts: List[str],
+        encodings: Optional[List[Encoding]] = None,
+        timeout: Optional[float] = None,
+    ) -> List[str]:
+        return self.submit(key, texts, encodings).result(timeout=timeout)
+
+    # --- dispatcher ---
+    def _dispatch(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                kind, ident, payload = self._results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+            if kind == "ready":
+                with self._lock:
+                    self._warm[ident] = payload["load_seconds"]
+                    self._loaded[ident] = payload["backends"]
+                    self._failed.pop(ident, None)
+                    all_warm = len(self._warm) >= self.workers
+                log.info("inference worker %s warm: %s", ident, payload["load_seconds"])
+                for pair, seconds in payload["load_seconds"].items():
+                    MODEL_LOAD_SECONDS.labels(pair, str(ident)).set(seconds)
+                if all_warm:
+                    self._ready.set()
+            elif kind == "failed":
+                with self._lock:
+                    self._failed[ident] = payload
+                log.error("inference worker %s failed to load models: %s", ident, payload)
+            else:
+                with self._lock:
+                    fut = self._pending.pop(ident, None)
+                    worker_id = self._assigned.pop(ident, None)
+                    if worker_id is not None:
+                        self._load[worker_id] -= 1
+                if fut is None:
+                    continue
+                if kind == "ok":
+                    fut.set_result(payload)
+                else:
+                    fut.set_exception(InferencePoolError(payload))
+
+    def _watch(self) -> None:
+        # по таймеру, а не по простою диспетчера: под нагрузкой очередь ответов не пустеет
+        while not self._stopped.wait(self.check_interval_s):
+            try:
+                self._check_workers()
+            except Exception:
+                log.exception("inference pool liveness check failed")
+
+    def _check_workers(self) -> None:
+        for worker_id, proc in list(self._procs.items()):
+            if proc.is_alive() or self._stopped.is_set():
+                continue
+            with self._lock:
+                self._warm.pop(worker_id, None)
+                failed = worker_id in self._failed
+                lost = [req_id for req_id, w in self._assigned.items() if w == worker_id]
+                futures = [self._pending.pop(req_id, None) for req_id in lost]
+                for req_id in lost:
+                    del self._assigned[req_id]
+                self._load[worker_id] = 0
+            self._ready.clear()
+            for fut in futures:
+                if fut is not None:
+                    fut.set_exception(InferencePoolError(f"inference worker {worker_id} died"))
+            if failed:
+                # модели не грузятся — перезапуск ничего не даст
+                continue
+            log.error("inference worker %s died (exitcode=%s, %s requests failed), respawning",
+                      worker_id, proc.exitcode, len(lost))
+            self._spawn(worker_id)
+
+
+# ────────────────────────── SINGLETON ─────────────────────────────────
+_pool: Optional[InferencePool] = None
+_pool_lock = threading.Lock()
+
+
+def start_pool(
+    models: Dict[LangPair, str],
+    *,
+    workers: int,
+    threads: int,
+    backends: Optional[Dict[LangPair, str]] = None,
+) -> InferencePool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = InferencePool(models, backends=backends, workers=workers, threads=threads).start()
+        return _pool
+
+
+def get_pool() -> Optional[InferencePool]:
+    return _pool
+
+
+def stop_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.stop()
+            _pool = None
@@ -0,0 +1,121 @@
+# app/infrastructure/inference/segmenter.py
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, List, Tuple
+
+CountTokens = Callable[[str], int]
+
+# любой пробельный промежуток, содержащий перевод строки, — граница строки/абзаца
+_LINE_SEP = re.compile(r"(\s*\n\s*)")
+# конец предложения: знак(и) препинания, закрывающие кавычки/скобки и пробелы после
+_SENTENCE_END = re.compile(r"[.!?…]+[\"'»”’)\]]*(\s+)")
+
+
+@dataclass
+class Segmented:
+    """
+    Текст, разрезанный на куски для перевода.
+    parts — последовательность (переводить?, значение): куски текста
+    чередуются с исходными разделителями, которые возвращаются как есть.
+    """
+    parts: List[Tuple[bool, str]] = field(default_factory=list)
+
+    @property
+    def texts(self) -> List[str]:
+        return [value for is_text, value in self.parts if is_text]
+
+    def join(self, translations: List[str]) -> str:
+        it = iter(translations)
+        return "".join(next(it) if is_text else value for is_text, value in self.parts)
+
+    def _text(self, value: str) -> None:
+        self.parts.append((True, value))
+
+    def _sep(self, value: str) -> None:
+        if not value:
+            return
+        if self.parts and not self.parts[-1][0]:
+            self.parts[-1] = (False, self.parts[-1][1] + value)
+        else:
+            self.parts.append((False, value))
+
+
+def _sentences(line: str) -> List[Tuple[str, str]]:
+    """Разбивает строку на пары (предложение, пробелы после него)."""
+    out: List[Tuple[str, str]] = []
+    pos = 0
+    for m in _SENTENCE_END.finditer(line):
+        ws_start = m.start(1)
+        out.append((line[pos:ws_start], m.group(1)))
+        pos = m.end()
+    if pos < len(line):
+        out.append((line[pos:], ""))
+    return out
+
+
+def _split_words(sentence: str, count_tokens: CountTokens, max_tokens: int) -> List[str]:
+    """Крайний случай — одно предложение длиннее бюджета: режем по словам."""
+    pieces: List[str] = []
+    current: List[str] = []
+    for word in sentence.split(" "):
+        candidate = " ".join(current + [word])
+        if current and count_tokens(candidate) > max_tokens:
+            pieces.append(" ".join(current))
+            current = [word]
+        else:
+            current.append(word)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def _segment_line(out: Segmented, line: str, count_tokens: CountTokens, max_tokens: int) -> None:
+    if count_tokens(line) <= max_tokens:
+        out._text(line)
+        return
+
+    chunk, chunk_tokens, chunk_ws = "", 0, ""
+    for sentence, ws in _sentences(line):
+        tokens = count_tokens(sentence)
+        if chunk and chunk_tokens + tokens > max_tokens:
+            out._text(chunk)
+            out._sep(chunk_ws)
+            chunk, chunk_tokens, chunk_ws = "", 0, ""
+
+        if tokens > max_tokens:
+            pieces = _split_words(sentence, count_tokens, max_tokens)
+            for i, piece in enumerate(pieces):
+                out._text(piece)
+                out._sep(" " if i < len(pieces) - 1 else ws)
+            continue
+
+        chunk = f"{chunk}{chunk_ws}{sentence}" if chunk else sentence
+        chunk_tokens += tokens
+        chunk_ws = ws
+    if chunk:
+        out._text(chunk)
+        out._sep(chunk_ws)
+
+
+def segment(text: str, count_tokens: CountTokens, max_tokens: int) -> Segmented:
+    """
+    Режет текст по строкам/абзацам, длинные строки — по предложениям,
+    собирая соседние предложения в куски не длиннее max_tokens.
+    Все пробелы и переводы строк между кусками сохраняются для обратной сборки.
+    """
+    out = Segmented()
+    lead = len(text) - len(text.lstrip())
+    out._sep(text[:lead])
+    body = text[lead:]
+    trail = body[len(body.rstrip()):]
+    body = body[: len(body) - len(trail)]
+
+    for i, piece in enumerate(_LINE_SEP.split(body)):
+        if i % 2:
+            out._sep(piece)
+        elif piece:
+            _segment_line(out, piece, count_tokens, max_tokens)
+    out._sep(trail)
+    return out
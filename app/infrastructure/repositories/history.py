@@ -0,0 +1,233 @@
+# app/infrastructure/repositories/history.py
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+from sqlalchemy import DateTime, Integer, String, cast, desc, func, literal, null, select, tuple_, type_coerce, union_all
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.sql import Select
+
+from app.infrastructure.db.models.transaction import Transaction
+from app.infrastructure.db.models.translation import Translation
+
+HistoryModel = Union[Type[Translation], Type[Transaction]]
+
+
+class InvalidCursor(ValueError):
+    """Курсор не декодируется — клиент прислал мусор или курсор от другой версии."""
+
+
+# ───────────── курсор: непрозрачный base64url от (timestamp, id) ─────────────
+def encode_cursor(timestamp: datetime, row_id: str) -> str:
+    raw = json.dumps([timestamp.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(ts), str(row_id)
+    except Exception as e:
+        raise InvalidCursor("invalid cursor") from e
+
+
+def _sort_ts(db: AsyncSession, model: HistoryModel):
+    """
+    Колонка времени для ORDER BY и keyset-условия.
+    SQLite хранит DateTime строкой: server_default now() пишет её без микросекунд,
+    а параметры SQLAlchemy — с ними, и строка-курсор оказывается «больше» самой себя.
+    Там выравниваем формат до 26 символов; в остальных СУБД — сама колонка (и её индекс).
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        padded = cast(model.timestamp, String).concat(".000000")
+        return type_coerce(func.substr(padded, 1, 26), DateTime)
+    return model.timestamp
+
+
+class HistoryRepository:
+    """
+    Постраничная история пользователя в порядке (timestamp DESC, id DESC).
+    id — тай-брейкер: порядок стабилен при одинаковых timestamp,
+    а keyset-условие не зависит от строк, вставленных выше курсора.
+    """
+
+    @staticmethod
+    async def page(
+        db: AsyncSession,
+        model: HistoryModel,
+        user_id: str,
+        *,
+        limit: int,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+    ) -> Tuple[Sequence[Any], Optional[str]]:
+        """
+        Одна страница + курсор следующей (None — дальше пусто).
+        С курсором skip игнорируется; без курсора работает прежний OFFSET.
+        """
+        if limit <= 0:
+            return [], None
+        ts_col = _sort_ts(db, model)
+        stmt = (
+            select(model)
+            .where(model.user_id == user_id)
+            .order_by(desc(ts_col), desc(model.id))
+            .limit(limit + 1)
+        )
+        if cursor:
+            ts, row_id = decode_cursor(cursor)
+            stmt = stmt.where(tuple_(ts_col, model.id) < tuple_(ts, row_id))
+        elif skip:
+            stmt = stmt.offset(skip)
+
+        rows = (await db.execute(stmt)).scalars().all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, encode_cursor(last.timestamp, last.id)
+
+    @staticmethod
+    async def timeline(
+        db: AsyncSession,
+        user_id: str,
+        *,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Общая лента переводов и транзакций одним запросом:
+        UNION ALL двух веток (каждая уже отсортирована и обрезана по своему индексу),
+        затем общий ORDER BY + LIMIT в БД. Выбираются только нужные колонки.
+        """
+        if limit <= 0:
+            return [], None
+        keyset = decode_cursor(cursor) if cursor else None
+
+        def _branch(model, *columns):
+            ts_col = _sort_ts(db, model)
+            stmt = (
+                select(*columns, ts_col.label("timestamp"))
+                .where(model.user_id == user_id)
+                .order_by(desc(ts_col), desc(model.id))
+                .limit(limit + 1)
+            )
+            if keyset:
+                stmt = stmt.where(tuple_(ts_col, model.id) < tuple_(*keyset))
+            # ORDER BY/LIMIT внутри ветки UNION допустимы только в подзапросе
+            return select(stmt.subquery())
+
+        translations = _branch(
+            Translation,
+            literal("translation", String).label("kind"),
+            Translation.id.label("id"),
+            Translation.input_text.label("source_text"),
+            Translation.output_text.label("output_text"),
+            Translation.source_lang.label("source_lang"),
+            Translation.target_lang.label("target_lang"),
+            Translation.cost.label("cost"),
+            cast(null(), String).label("type"),
+            cast(null(), Integer).label("amount"),
+        )
+        transactions = _branch(
+            Transaction,
+            literal("transaction", String).label("kind"),
+            Transaction.id.label("id"),
+            cast(null(), String).label("source_text"),
+            cast(null(), String).label("output_text"),
+            cast(null(), String).label("source_lang"),
+            cast(null(), String).label("target_lang"),
+            cast(null(), Integer).label("cost"),
+            Transaction.type.label("type"),
+            Transaction.amount.label("amount"),
+        )
+        merged = union_all(translations, transactions).subquery()
+        stmt = (
+            select(merged)
+            .order_by(desc(merged.c.timestamp), desc(merged.c.id))
+            .limit(limit + 1)
+        )
+        rows = (await db.execute(stmt)).mappings().all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+        return [_timeline_item(row) for row in rows], next_cursor
+
+
+def _timeline_item(row) -> Dict[str, Any]:
+    # форма элементов — как у прежнего /history, по набору ключей на каждый kind
+    if row["kind"] == "translation":
+        return {
+            "kind": "translation",
+            "timestamp": row["timestamp"],
+            "source_text": row["source_text"],
+            "output_text": row["output_text"],
+            "source_lang": row["source_lang"],
+            "target_lang": row["target_lang"],
+            "cost": row["cost"],
+        }
+    return {
+        "kind": "transaction",
+        "timestamp": row["timestamp"],
+        "type": row["type"],
+        "amount": row["amount"],
+    }
+
+
+# ───────────── экспорт: только колонки, серверный курсор ─────────────
+EXPORT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "translations": (
+        "id", "timestamp", "user_id", "source_lang", "target_lang",
+        "input_text", "output_text", "cost", "external_id",
+    ),
+    "transactions": ("id", "timestamp", "user_id", "type", "amount"),
+}
+_EXPORT_MODELS: Dict[str, HistoryModel] = {"translations": Translation, "transactions": Transaction}
+
+
+def export_query(
+    kind: str,
+    *,
+    user_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    source_lang: Optional[str] = None,
+    target_lang: Optional[str] = None,
+) -> Select:
+    """
+    Выборка для экспорта в хронологическом порядке. user_id=None — по всем пользователям.
+    Фильтр по языковой паре есть только у переводов.
+    """
+    model = _EXPORT_MODELS[kind]
+    stmt = select(*(getattr(model, c) for c in EXPORT_COLUMNS[kind]))
+    if user_id is not None:
+        stmt = stmt.where(model.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(model.timestamp >= since)
+    if until is not None:
+        stmt = stmt.where(model.timestamp < until)
+    if model is Translation:
+        if source_lang:
+            stmt = stmt.where(Translation.source_lang == source_lang)
+        if target_lang:
+            stmt = stmt.where(Translation.target_lang == target_lang)
+    return stmt.order_by(model.timestamp, model.id)
+
+
+async def stream_export(
+    session_factory: async_sessionmaker, stmt: Select, batch_rows: int
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Отдаёт строки пачками по batch_rows. Своя сессия живёт ровно столько, сколько
+    читается ответ: StreamingResponse дочитывается уже после выхода из обработчика.
+    """
+    async with session_factory() as db:
+        result = await db.stream(stmt.execution_options(yield_per=batch_rows))
+        async for rows in result.mappings().partitions(batch_rows):
+            yield [dict(row) for row in rows]
@@ -0,0 +1,131 @@
+# app/infrastructure/repositories/stats.py
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, desc, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.db.models.stats import (
+    COUNTED_TABLES,
+    StatsCounter,
+    StatsTranslationDaily,
+    translation_day,
+)
+from app.infrastructure.db.models.transaction import Transaction
+from app.infrastructure.db.models.translation import Translation
+from app.infrastructure.db.models.user import User
+
+
+# ключ pg_advisory_xact_lock для пересборки статистики (произвольная константа)
+_REBUILD_LOCK_KEY = 0x5747_0017
+
+
+class StatsRepository:
+    """
+    Чтение предрасчитанной статистики дашборда и её полная пересборка.
+    Инкрементальные обновления — в listener'е models/stats.py.
+    """
+
+    @staticmethod
+    async def counters(db: AsyncSession) -> Dict[str, int]:
+        res = await db.execute(
+            select(StatsCounter.name, func.sum(StatsCounter.value)).group_by(StatsCounter.name)
+        )
+        values = {name: int(total or 0) for name, total in res.all()}
+        return {name: values.get(name, 0) for name in COUNTED_TABLES.values()}
+
+    @staticmethod
+    async def daily(db: AsyncSession, days: int) -> List[Dict[str, Any]]:
+        since = datetime.utcnow().date() - timedelta(days=max(1, days) - 1)
+        res = await db.execute(
+            select(
+                StatsTranslationDaily.day,
+                func.sum(StatsTranslationDaily.translations),
+                func.sum(StatsTranslationDaily.cost),
+            )
+            .where(StatsTranslationDaily.day >= since)
+            .group_by(StatsTranslationDaily.day)
+            .order_by(desc(StatsTranslationDaily.day))
+        )
+        return [
+            {"day": day, "translations": int(n or 0), "cost": int(cost or 0)}
+            for day, n, cost in res.all()
+        ]
+
+    @staticmethod
+    async def pairs(db: AsyncSession, limit: int) -> List[Dict[str, Any]]:
+        total = func.sum(StatsTranslationDaily.translations)
+        res = await db.execute(
+            select(
+                StatsTranslationDaily.source_lang,
+                StatsTranslationDaily.target_lang,
+                total,
+                func.sum(StatsTranslationDaily.cost),
+            )
+            .group_by(StatsTranslationDaily.source_lang, StatsTranslationDaily.target_lang)
+            .order_by(desc(total))
+            .limit(limit)
+        )
+        return [
+            {"source_lang": src, "target_lang": tgt, "translations": int(n or 0), "cost": int(cost or 0)}
+            for src, tgt, n, cost in res.all()
+        ]
+
+    @staticmethod
+    async def is_empty(db: AsyncSession) -> bool:
+        return await db.scalar(select(StatsCounter.name).limit(1)) is None
+
+    @staticmethod
+    async def rebuild_if_empty(db: AsyncSession) -> bool:
+        """
+        Пересборка, если статистики ещё нет. Несколько реплик стартуют одновременно:
+        на PostgreSQL проверка и пересборка идут под транзакционной advisory-блокировкой,
+        остальные реплики дожидаются её и видят уже заполненные счётчики.
+        Коммит (и снятие блокировки) — на вызывающей стороне.
+        """
+        if not await StatsRepository.is_empty(db):
+            return False
+        if db.bind.dialect.name == "postgresql":
+            await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _REBUILD_LOCK_KEY})
+            if not await StatsRepository.is_empty(db):
+                return False
+        await StatsRepository.rebuild(db)
+        return True
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> None:
+        """
+        Полный пересчёт из исходных таблиц: для первого запуска на существующей базе
+        и для сверки. Тяжёлый запрос — не для горячего пути. Коммит — на вызывающей стороне.
+        """
+        await db.execute(delete(StatsCounter))
+        await db.execute(delete(StatsTranslationDaily))
+
+        for name, model in (("users", User), ("translations", Translation), ("transactions", Transaction)):
+            count = await db.scalar(select(func.count()).select_from(model))
+            await db.execute(insert(StatsCounter).values(name=name, shard=0, value=int(count or 0)))
+
+        day = translation_day(Translation.timestamp)
+        res = await db.execute(
+            select(
+                day,
+                func.coalesce(Translation.source_lang, ""),
+                func.coalesce(Translation.target_lang, ""),
+                func.count(),
+                func.coalesce(func.sum(Translation.cost), 0),
+            ).group_by(day, Translation.source_lang, Translation.target_lang)
+        )
+        rows = [
+            {
+                "day": d if isinstance(d, date) else date.fromisoformat(str(d)[:10]),
+                "source_lang": src,
+                "target_lang": tgt,
+                "translations": int(n),
+                "cost": int(cost),
+            }
+            for d, src, tgt, n, cost in res.all()
+        ]
+        if rows:
+            await db.execute(insert(StatsTranslationDaily), rows)
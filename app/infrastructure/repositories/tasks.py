@@ -0,0 +1,121 @@
+# app/infrastructure/repositories/tasks.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.db.models.task import TaskState, TaskStatus
+from app.infrastructure.db.models.translation import Translation
+
+
+_INFLIGHT = (TaskStatus.QUEUED.value, TaskStatus.RUNNING.value)
+
+
+class TaskStateRepository:
+    """Короткие операции над таблицей tasks; коммит — на вызывающей стороне."""
+
+    @staticmethod
+    async def mark_queued(
+        db: AsyncSession, task_ids: Iterable[str], user_id: Optional[str], error: Optional[str] = None
+    ) -> None:
+        await TaskStateRepository._set(db, task_ids, user_id=user_id, status=TaskStatus.QUEUED, error=error)
+
+    @staticmethod
+    async def mark_running(db: AsyncSession, task_ids: Iterable[str], user_id: Optional[str], attempt: int) -> None:
+        await TaskStateRepository._set(
+            db, task_ids, user_id=user_id, status=TaskStatus.RUNNING, attempts=attempt, started_at=datetime.utcnow()
+        )
+
+    @staticmethod
+    async def mark_done(db: AsyncSession, task_ids: Iterable[str], user_id: Optional[str]) -> None:
+        await TaskStateRepository._set(
+            db, task_ids, user_id=user_id, status=TaskStatus.DONE, error=None, finished_at=datetime.utcnow()
+        )
+
+    @staticmethod
+    async def mark_failed(db: AsyncSession, task_ids: Iterable[str], user_id: Optional[str], error: str) -> None:
+        await TaskStateRepository._set(
+            db, task_ids, user_id=user_id, status=TaskStatus.FAILED, error=error[:1000], finished_at=datetime.utcnow()
+        )
+
+    @staticmethod
+    async def count_inflight(db: AsyncSession, user_id: str, since: Optional[datetime] = None) -> int:
+        """
+        Задачи пользователя, ещё не дошедшие до терминального статуса.
+        since — учитывать только двигавшиеся после него: задача, потерянная до брокера
+        (например, буфер издателя при остановке), не держит лимит пользователя вечно.
+        """
+        stmt = (
+            select(func.count())
+            .select_from(TaskState)
+            .where(TaskState.user_id == user_id)
+            .where(TaskState.status.in_(_INFLIGHT))
+        )
+        if since is not None:
+            stmt = stmt.where(TaskState.updated_at >= since)
+        return await db.scalar(stmt) or 0
+
+    @staticmethod
+    async def expire_stale(db: AsyncSession, older_than: datetime) -> int:
+        """queued/running без движения с older_than → failed; возвращает число задач."""
+        now = datetime.utcnow()
+        res = await db.execute(
+            update(TaskState)
+            .where(TaskState.status.in_(_INFLIGHT), TaskState.updated_at < older_than)
+            .values(
+                status=TaskStatus.FAILED.value,
+                error="task expired: no progress reported",
+                finished_at=now,
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return res.rowcount or 0
+
+    @staticmethod
+    async def count_finished_since(db: AsyncSession, since: datetime) -> int:
+        return await db.scalar(
+            select(func.count()).select_from(TaskState).where(TaskState.finished_at >= since)
+        ) or 0
+
+    @staticmethod
+    async def _set(
+        db: AsyncSession, task_ids: Iterable[str], *, user_id: Optional[str], status: TaskStatus, **values
+    ) -> None:
+        ids = list(task_ids)
+        if not ids:
+            return
+        values["status"] = status.value
+        values["updated_at"] = datetime.utcnow()
+        await db.execute(update(TaskState).where(TaskState.task_id.in_(ids)).values(**values))
+
+        # задачи, опубликованные до появления таблицы (или без записи от API), — создаём
+        res = await db.execute(select(TaskState.task_id).where(TaskState.task_id.in_(ids)))
+        known = set(res.scalars().all())
+        for task_id in ids:
+            if task_id not in known:
+                db.add(TaskState(task_id=task_id, user_id=user_id, **values))
+
+    @staticmethod
+    async def get_status(db: AsyncSession, task_id: str) -> Optional[dict]:
+        """Состояние задачи по первичному ключу + результат, если он уже записан."""
+        res = await db.execute(
+            select(TaskState, Translation.output_text, Translation.cost)
+            .outerjoin(Translation, Translation.external_id == TaskState.task_id)
+            .where(TaskState.task_id == task_id)
+        )
+        row = res.first()
+        if row is None:
+            return None
+        state, output_text, cost = row
+        return {
+            "task_id": task_id,
+            "status": state.status,
+            "output_text": output_text,
+            "cost": cost,
+            "error": state.error,
+            "updated_at": state.updated_at,
+        }
@@ -0,0 +1,59 @@
+# app/infrastructure/repositories/users.py
+from __future__ import annotations
+
+from enum import Enum
+from typing import Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, raiseload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from app.infrastructure.db.models.user import User
+
+
+class UserProfile(str, Enum):
+    """
+    Что поднимать вместе с User. Эндпоинт выбирает минимально достаточный профиль;
+    история (transactions / translations) не входит ни в один — она только постраничная.
+    """
+    IDENTITY = "identity"        # id, email, is_admin; без кошелька
+    WITH_WALLET = "with_wallet"  # identity + кошелёк
+    FULL = "full"                # все колонки (в т.ч. хеш пароля) + кошелёк
+
+
+_PROFILES: dict[UserProfile, Sequence[LoaderOption]] = {
+    UserProfile.IDENTITY: (
+        load_only(User.id, User.email, User.is_admin),
+        raiseload(User.wallet),
+    ),
+    UserProfile.WITH_WALLET: (
+        load_only(User.id, User.email, User.is_admin),
+        selectinload(User.wallet),
+    ),
+    UserProfile.FULL: (
+        selectinload(User.wallet),
+    ),
+}
+
+
+def user_options(profile: UserProfile) -> Sequence[LoaderOption]:
+    return _PROFILES[profile]
+
+
+class UserRepository:
+    """Загрузка пользователя по выбранному профилю."""
+
+    @staticmethod
+    async def get_by_id(
+        db: AsyncSession, user_id: str, profile: UserProfile = UserProfile.IDENTITY
+    ) -> Optional[User]:
+        res = await db.execute(select(User).options(*user_options(profile)).where(User.id == user_id))
+        return res.scalar_one_or_none()
+
+    @staticmethod
+    async def get_by_email(
+        db: AsyncSession, email: str, profile: UserProfile = UserProfile.IDENTITY
+    ) -> Optional[User]:
+        res = await db.execute(select(User).options(*user_options(profile)).where(User.email == email))
+        return res.scalar_one_or_none()
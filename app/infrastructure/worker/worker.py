@@ -6,13 +6,17 @@ import uuid
 import asyncio
 import signal
 import logging
+from contextlib import suppress
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import aio_pika
 import pika
 from app.core.settings import get_settings
 
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
 from sqlalchemy.ext.asyncio import (
-    create_async_engine,
     async_sessionmaker,
     AsyncSession,
 )
@@ -21,6 +25,8 @@ from sqlalchemy.ext.asyncio import (
 settings = get_settings()
 AMQP_URL = settings.AMQP_URL
 TASK_QUEUE = settings.TASK_QUEUE
+TASK_EVENTS_EXCHANGE = settings.TASK_EVENTS_EXCHANGE
+DEAD_LETTER_QUEUE = f"{TASK_QUEUE}.dlq"
 DB_URL = settings.DATABASE_URL_asyncpg
 
 
@@ -28,15 +34,47 @@ APP_PYTHONPATH = os.getenv("APP_PYTHONPATH", "/app_src")
 if APP_PYTHONPATH and APP_PYTHONPATH not in sys.path and os.path.isdir(APP_PYTHONPATH):
     sys.path.insert(0, APP_PYTHONPATH)
 
-from app.domain.services.translation_request import process_translation_request  # type: ignore
+from app.domain.services.translation_request import (  # type: ignore
+    Model,
+    process_translation_request,
+    process_translation_batch,
+)
+from app.domain.services.wallet_ledger import WalletLedger  # type: ignore
+from app.infrastructure.inference.pool import InferencePoolError  # type: ignore
+from app.infrastructure.repositories.tasks import TaskStateRepository  # type: ignore
+from app.infrastructure.db.database import make_engine  # type: ignore
+from app.infrastructure.bus.topology import (  # type: ignore
+    LANE_INTERACTIVE,
+    retry_queue,
+    retry_queue_arguments,
+    task_queue_arguments,
+    task_queues,
+)
+from app.infrastructure.worker.scheduler import FairScheduler, parse_weights  # type: ignore
+from app.core.metrics import (  # type: ignore
+    AMQP_CONSUME_SECONDS,
+    AMQP_QUEUE_DEPTH,
+    WORKER_LANE_DISPATCHED,
+    WORKER_LANE_PENDING,
+    register_engine,
+    start_metrics_server,
+)
+
+# полоса → очередь задач; у каждой своя очередь повторов "<очередь>.retry" (per-message TTL),
+# из которой сообщение по истечении возвращается в ту же полосу;
+# исчерпавшие попытки и нечитаемые сообщения — в общую DEAD_LETTER_QUEUE
+LANE_QUEUES = task_queues()
+QUEUE_LANES = {queue: lane for lane, queue in LANE_QUEUES.items()}
+RETRY_QUEUES = {retry_queue(queue) for queue in LANE_QUEUES.values()}
 
 # ────────────────────────── LOGGING ───────────────────────────────────
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 log = logging.getLogger("worker")
 
 # ────────────────────────── DB (async) ────────────────────────────────
-engine = create_async_engine(DB_URL, pool_pre_ping=True, future=True)
+engine = make_engine(DB_URL)
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+register_engine("worker", engine)
 
 # ────────────────────────── RABBITMQ ──────────────────────────────────
 params = pika.URLParameters(AMQP_URL)
@@ -60,12 +98,107 @@ def _extract_task_id(properties: Optional[pika.BasicProperties], payload: Dict[s
     )
 
 
-async def _handle_message_async(msg: Dict[str, Any], task_id: str) -> None:
+def _event(task_id: str, status: str, **extra: Any) -> Dict[str, Any]:
+    """Событие о завершении задачи — уходит в TASK_EVENTS_EXCHANGE с routing key = task_id."""
+    return {"task_id": task_id, "status": status, **extra}
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Ошибки, которые имеет смысл повторить: сеть, БД, пул инференса. Бизнес-ошибки (ValueError) — нет."""
+    if isinstance(exc, DBAPIError):
+        return exc.connection_invalidated or isinstance(exc, (OperationalError, InterfaceError))
+    return isinstance(exc, (ConnectionError, TimeoutError, asyncio.TimeoutError, InferencePoolError))
+
+
+def _error_text(exc: BaseException) -> str:
+    return (str(exc) or type(exc).__name__)[:500]
+
+
+def _task_ids(msg: Dict[str, Any], task_id: str) -> List[str]:
+    if msg.get("kind") == "batch":
+        return [str(i["correlation_id"]) for i in msg.get("items") or [] if "correlation_id" in i]
+    return [task_id]
+
+
+def _subset(msg: Dict[str, Any], task_ids: List[str]) -> Dict[str, Any]:
+    """Сообщение только с указанными задачами — для повтора части пачки."""
+    if msg.get("kind") != "batch":
+        return msg
+    keep = set(task_ids)
+    return {**msg, "items": [i for i in msg.get("items") or [] if str(i.get("correlation_id")) in keep]}
+
+
+def _attempt(headers: Optional[Dict[str, Any]]) -> int:
+    try:
+        return max(1, int((headers or {}).get("x-attempt", 1)))
+    except (TypeError, ValueError):
+        return 1
+
+
+async def _set_state(method, task_ids: Iterable[str], user_id: Optional[str], *args: Any) -> None:
+    """Обновление tasks в своей короткой транзакции; сбой записи статуса не должен ронять обработку."""
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    try:
+        async with SessionLocal() as db:
+            await method(db, task_ids, user_id, *args)
+            await db.commit()
+    except Exception as e:
+        log.error("failed to update state of %s tasks: %s", len(task_ids), e)
+
+
+async def _handle_batch_async(msg: Dict[str, Any], batch_id: str) -> List[Dict[str, Any]]:
+    """Пакетное сообщение: все элементы уходят в инференс одной пачкой."""
+    user_id = str(msg.get("user_id") or "").strip()
+    items = msg.get("items") or []
+    required = ("correlation_id", "input_text", "source_lang", "target_lang")
+    parsed = []
+    events: List[Dict[str, Any]] = []
+    for item in items:
+        missing = [k for k in required if k not in item]
+        if missing:
+            log.error("batch %s: invalid item, missing %s", batch_id, missing)
+            if "correlation_id" in item:
+                events.append(_event(str(item["correlation_id"]), "failed", error=f"missing {missing}"))
+            continue
+        parsed.append((
+            str(item["correlation_id"]),
+            _InputData(
+                input_text=str(item["input_text"]),
+                source_lang=str(item["source_lang"]),
+                target_lang=str(item["target_lang"]),
+            ),
+        ))
+    if not user_id or not parsed:
+        log.error("batch %s invalid payload", batch_id)
+        return events + [_event(task_id, "failed", error="invalid payload") for task_id, _ in parsed]
+
+    async with SessionLocal() as db:
+        results = await process_translation_batch(db=db, user_id=user_id, items=parsed)
+
+    for (task_id, _), result in zip(parsed, results):
+        if isinstance(result, Exception):
+            status = "retry" if _is_transient(result) else "failed"
+            log.error("task %s (batch %s) %s: %s", task_id, batch_id, status, result)
+            events.append(_event(task_id, status, error=_error_text(result)))
+        else:
+            log.info("task %s (batch %s) done: cost=%s", task_id, batch_id, result.get("cost"))
+            events.append(_event(
+                task_id, "done", output_text=result.get("output_text"), cost=result.get("cost")
+            ))
+    return events
+
+
+async def _handle_message_async(msg: Dict[str, Any], task_id: str) -> List[Dict[str, Any]]:
+    """Обрабатывает сообщение и возвращает события о завершённых задачах."""
+    if msg.get("kind") == "batch":
+        return await _handle_batch_async(msg, task_id)
     required = ("user_id", "input_text", "source_lang", "target_lang")
     missing = [k for k in required if k not in msg]
     if missing:
         log.error("task %s invalid payload, missing %s", task_id, missing)
-        return
+        return [_event(task_id, "failed", error=f"missing {missing}")]
     user_id = str(msg["user_id"]).strip()
     data = _InputData(
         input_text=str(msg["input_text"]),
@@ -81,27 +214,340 @@ async def _handle_message_async(msg: Dict[str, Any], task_id: str) -> None:
             external_id=task_id,  # идемпотентность
         )
         log.info("task %s done: cost=%s", task_id, result.get("cost"))
+    return [_event(task_id, "done", output_text=result.get("output_text"), cost=result.get("cost"))]
+
+
+async def _release_stale_holds() -> None:
+    """Возврат брошенных резервов кошелька: воркер упал между резервом и фиксацией перевода."""
+    older_than = datetime.utcnow() - timedelta(seconds=settings.WALLET_HOLD_TTL_S)
+    try:
+        async with SessionLocal() as db:
+            released = await WalletLedger.release_stale(db, older_than)
+            await db.commit()
+    except Exception as e:
+        log.error("stale wallet holds reconciliation failed: %s", e)
+        return
+    if released:
+        log.warning("released %s stale wallet holds", released)
+
+
+async def _expire_stale_tasks() -> None:
+    """
+    queued/running без движения дольше TASK_STALE_S → failed: сообщение потеряно
+    до брокера (буфер издателя при остановке) или воркер упал, а задача так и не
+    была доставлена снова. Иначе клиент ждёт её вечно.
+    """
+    older_than = datetime.utcnow() - timedelta(seconds=settings.TASK_STALE_S)
+    try:
+        async with SessionLocal() as db:
+            expired = await TaskStateRepository.expire_stale(db, older_than)
+            await db.commit()
+    except Exception as e:
+        log.error("stale tasks reconciliation failed: %s", e)
+        return
+    if expired:
+        log.warning("marked %s stale tasks as failed", expired)
+
+
+# (очередь, тело, заголовки, задержка в секундах) — куда переложить сообщение перед ack
+_Republish = Tuple[str, bytes, Dict[str, Any], Optional[float]]
+
+
+async def _process_delivery(
+    msg: Dict[str, Any], task_id: str, attempt: int, queue: str = TASK_QUEUE
+) -> Tuple[List[Dict[str, Any]], Optional[_Republish]]:
+    """
+    Общий для обоих режимов шаг: статусы в tasks, обработка, разбор ошибок.
+    Транзиентные ошибки уходят на повтор с экспоненциальной задержкой,
+    после TASK_MAX_RETRIES попыток — в DLQ и статус failed.
+    Возвращает только терминальные события (done/failed).
+    """
+    ids = _task_ids(msg, task_id)
+    user_id = str(msg.get("user_id") or "").strip() or None
+    await _set_state(TaskStateRepository.mark_running, ids, user_id, attempt)
+
+    try:
+        events = await _handle_message_async(msg, task_id)
+    except Exception as e:
+        status = "retry" if _is_transient(e) else "failed"
+        log.exception("processing error for task %s (attempt %s, %s): %s", task_id, attempt, status, e)
+        events = [_event(t, status, error=_error_text(e)) for t in ids]
+
+    retry = [e for e in events if e["status"] == "retry"]
+    events = [e for e in events if e["status"] != "retry"]
+    republish: Optional[_Republish] = None
+    if retry:
+        retry_ids = [e["task_id"] for e in retry]
+        error = retry[0]["error"]
+        body = json.dumps(_subset(msg, retry_ids)).encode("utf-8")
+        if attempt < settings.TASK_MAX_RETRIES:
+            delay = settings.TASK_RETRY_BACKOFF_S * 2 ** (attempt - 1)
+            log.warning("retrying %s tasks of %s in %.1fs (attempt %s): %s",
+                        len(retry_ids), task_id, delay, attempt + 1, error)
+            await _set_state(TaskStateRepository.mark_queued, retry_ids, user_id, error)
+            republish = (retry_queue(queue), body, {"x-attempt": attempt + 1, "x-error": error}, delay)
+        else:
+            error = f"retries exhausted after {attempt} attempts: {error}"
+            log.error("dead-lettering %s tasks of %s: %s", len(retry_ids), task_id, error)
+            republish = (DEAD_LETTER_QUEUE, body, {"x-attempt": attempt, "x-error": error}, None)
+            events += [_event(t, "failed", error=error) for t in retry_ids]
+
+    await _set_state(TaskStateRepository.mark_done, [e["task_id"] for e in events if e["status"] == "done"], user_id)
+    for event in events:
+        if event["status"] == "failed":
+            await _set_state(TaskStateRepository.mark_failed, [event["task_id"]], user_id, event.get("error") or "")
+    return events, republish
+
+
+def _outcome(events: List[Dict[str, Any]], republish: Optional[_Republish]) -> str:
+    if republish is not None:
+        return "retry" if republish[0] in RETRY_QUEUES else "failed"
+    return "failed" if any(e["status"] == "failed" for e in events) else "done"
+
+
+def _user_key(body: bytes) -> Optional[str]:
+    """Ключ справедливости внутри полосы; нечитаемые сообщения делят общий ключ None."""
+    try:
+        return str(json.loads(body.decode("utf-8")).get("user_id") or "") or None
+    except Exception:
+        return None
 
 
 def _on_message(ch, method, properties, body):
+    started = time.perf_counter()
+    # после повтора сообщение приходит с routing key своей полосы (x-dead-letter-routing-key)
+    queue = method.routing_key if method.routing_key in QUEUE_LANES else TASK_QUEUE
+    lane = QUEUE_LANES.get(queue, LANE_INTERACTIVE)
     try:
         msg = json.loads(body.decode("utf-8"))
     except Exception as e:
         log.error("bad message (json decode failed): %s", e)
-        ch.basic_ack(delivery_tag=method.delivery_tag)
+        try:
+            ch.basic_publish(exchange="", routing_key=DEAD_LETTER_QUEUE, body=body,
+                             properties=pika.BasicProperties(delivery_mode=2, headers={"x-error": str(e)}))
+        finally:
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+        AMQP_CONSUME_SECONDS.labels(lane, "bad_message").observe(time.perf_counter() - started)
         return
 
     task_id = _extract_task_id(properties, msg)
-    log.info("received task %s", task_id)
+    attempt = _attempt(properties.headers if properties else None)
+    log.info("received task %s (attempt %s)", task_id, attempt)
+
+    try:
+        events, republish = asyncio.run(_process_delivery(msg, task_id, attempt, queue))
+        if republish is not None:
+            queue, data, headers, delay = republish
+            ch.basic_publish(
+                exchange="", routing_key=queue, body=data,
+                properties=pika.BasicProperties(
+                    delivery_mode=2,
+                    correlation_id=task_id,
+                    headers=headers,
+                    priority=properties.priority if properties else None,
+                    expiration=str(int(delay * 1000)) if delay else None,
+                ),
+            )
+    except Exception as e:
+        # не смогли даже переложить сообщение — пусть брокер отдаст его снова
+        log.exception("task %s is returned to the queue: %s", task_id, e)
+        ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+        AMQP_CONSUME_SECONDS.labels(lane, "requeued").observe(time.perf_counter() - started)
+        return
+    ch.basic_ack(delivery_tag=method.delivery_tag)
+    AMQP_CONSUME_SECONDS.labels(lane, _outcome(events, republish)).observe(time.perf_counter() - started)
+
+    for event in events:
+        try:
+            ch.basic_publish(
+                exchange=TASK_EVENTS_EXCHANGE,
+                routing_key=event["task_id"],
+                body=json.dumps(event).encode("utf-8"),
+            )
+        except Exception as e:
+            log.error("failed to publish event for task %s: %s", event["task_id"], e)
+
+
+# ────────────────────────── ASYNC CONSUMER ────────────────────────────
+async def _republish_async(channel, queue: str, body: bytes, headers: Dict[str, Any],
+                           delay: Optional[float], correlation_id: Optional[str] = None,
+                           priority: Optional[int] = None) -> None:
+    await channel.default_exchange.publish(
+        aio_pika.Message(
+            body=body,
+            content_type="application/json",
+            correlation_id=correlation_id,
+            headers=headers,
+            priority=priority,
+            expiration=delay or None,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        ),
+        routing_key=queue,
+    )
 
+
+async def _on_message_async(message, channel, events_exchange, lane: str = LANE_INTERACTIVE) -> None:
+    started = time.perf_counter()
     try:
-        asyncio.run(_handle_message_async(msg, task_id))
+        msg = json.loads(message.body.decode("utf-8"))
     except Exception as e:
-        log.exception("processing error for task %s: %s", task_id, e)
+        log.error("bad message (json decode failed): %s", e)
+        try:
+            await _republish_async(channel, DEAD_LETTER_QUEUE, message.body, {"x-error": str(e)}, None)
+        finally:
+            await message.ack()
+        AMQP_CONSUME_SECONDS.labels(lane, "bad_message").observe(time.perf_counter() - started)
+        return
+
+    task_id = message.correlation_id or msg.get("correlation_id") or str(uuid.uuid4())
+    attempt = _attempt(message.headers)
+    log.info("received task %s (attempt %s)", task_id, attempt)
+
+    try:
+        # ack только после того, как транзакция в БД закоммичена и повтор (если нужен) опубликован
+        events, republish = await _process_delivery(msg, task_id, attempt, LANE_QUEUES.get(lane, TASK_QUEUE))
+        if republish is not None:
+            # повтор сохраняет AMQP-приоритет исходного сообщения
+            await _republish_async(channel, *republish, correlation_id=task_id, priority=message.priority)
+    except Exception as e:
+        log.exception("task %s is returned to the queue: %s", task_id, e)
+        await message.nack(requeue=True)
+        AMQP_CONSUME_SECONDS.labels(lane, "requeued").observe(time.perf_counter() - started)
+        return
+    await message.ack()
+    AMQP_CONSUME_SECONDS.labels(lane, _outcome(events, republish)).observe(time.perf_counter() - started)
+
+    for event in events:
+        try:
+            await events_exchange.publish(
+                aio_pika.Message(body=json.dumps(event).encode("utf-8"), content_type="application/json"),
+                routing_key=event["task_id"],
+            )
+        except Exception as e:
+            log.error("failed to publish event for task %s: %s", event["task_id"], e)
+
+
+async def _consume_async() -> None:
+    """
+    Один долгоживущий event loop + aio-pika.
+    prefetch задаёт, сколько сообщений брокер отдаёт заранее (у каждой полосы свой канал
+    и свой prefetch), WORKER_CONCURRENCY — сколько из них обрабатывается одновременно.
+    Полученные сообщения ждут в FairScheduler: освободившийся слот достаётся полосе
+    по весам WORKER_LANE_WEIGHTS, внутри полосы — следующему пользователю по кругу.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    sem = asyncio.Semaphore(max(1, settings.WORKER_CONCURRENCY))
+    in_flight: set[asyncio.Task] = set()
+    weights = parse_weights(settings.WORKER_LANE_WEIGHTS)
+    scheduler = FairScheduler({lane: weights.get(lane, 1) for lane in LANE_QUEUES})
+
+    channel = None
+    events_exchange = None
+
+    async def _run(message, lane: str) -> None:
+        try:
+            await _on_message_async(message, channel, events_exchange, lane)
+        finally:
+            sem.release()
+
+    async def _consume(lane: str, queue) -> None:
+        async with queue.iterator() as it:
+            async for message in it:
+                scheduler.put(lane, _user_key(message.body), message)
+                WORKER_LANE_PENDING.labels(lane).set(scheduler.pending(lane))
+
+    async def _dispatch() -> None:
+        # сначала свободный слот, потом выбор: решение принимается по самому свежему буферу
+        while True:
+            await sem.acquire()
+            lane, message = await scheduler.get()
+            WORKER_LANE_PENDING.labels(lane).set(scheduler.pending(lane))
+            WORKER_LANE_DISPATCHED.labels(lane).inc()
+            task = asyncio.create_task(_run(message, lane))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+    async def _poll_depth(queues) -> None:
+        # повторный declare с теми же аргументами ничего не меняет и возвращает message_count
+        while True:
+            for q in queues:
+                try:
+                    ok = await q.declare()
+                    AMQP_QUEUE_DEPTH.labels(q.name).set(ok.message_count)
+                except Exception as e:
+                    log.warning("queue depth poll for '%s' failed: %s", q.name, e)
+            await asyncio.sleep(max(1.0, settings.METRICS_QUEUE_POLL_S))
+
+    async def _reconcile() -> None:
+        while True:
+            await _release_stale_holds()
+            await _expire_stale_tasks()
+            await asyncio.sleep(max(1.0, settings.WALLET_HOLD_RECONCILE_S))
+
+    connection = None
+    while connection is None and not stop.is_set():
+        try:
+            connection = await aio_pika.connect_robust(AMQP_URL)
+        except Exception as e:
+            log.error("connection error: %s (reconnect in 3s)", e)
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), timeout=3)
+    if connection is None:
+        return
+
+    try:
+        channel = await connection.channel()
+        declared = []
+        for name in LANE_QUEUES.values():
+            declared.append(await channel.declare_queue(
+                retry_queue(name), durable=True, arguments=retry_queue_arguments(name)
+            ))
+        declared.append(await channel.declare_queue(DEAD_LETTER_QUEUE, durable=True))
+        events_exchange = await channel.declare_exchange(
+            TASK_EVENTS_EXCHANGE, aio_pika.ExchangeType.TOPIC, durable=True
+        )
+
+        background = []
+        for lane, name in LANE_QUEUES.items():
+            # prefetch на канал полосы: bulk не выбирает весь буфер воркера
+            prefetch = settings.WORKER_PREFETCH if lane == LANE_INTERACTIVE else settings.WORKER_BULK_PREFETCH
+            lane_channel = await connection.channel()
+            await lane_channel.set_qos(prefetch_count=max(1, prefetch))
+            queue = await lane_channel.declare_queue(name, durable=True, arguments=task_queue_arguments())
+            declared.append(queue)
+            background.append(asyncio.create_task(_consume(lane, queue)))
+            log.info("consuming lane '%s' from queue '%s' (async, prefetch=%s)", lane, name, prefetch)
+        log.info(
+            "lane weights %s, concurrency=%s", scheduler.weights, settings.WORKER_CONCURRENCY,
+        )
+        if settings.WORKER_PREFETCH <= settings.WORKER_CONCURRENCY:
+            # все выданные сообщения сразу уходят в работу — выбирать планировщику не из чего
+            log.warning(
+                "WORKER_PREFETCH=%s <= WORKER_CONCURRENCY=%s: per-user fairness in the interactive lane is off",
+                settings.WORKER_PREFETCH, settings.WORKER_CONCURRENCY,
+            )
+        background.append(asyncio.create_task(_dispatch()))
+        background.append(asyncio.create_task(_poll_depth(declared)))
+        background.append(asyncio.create_task(_reconcile()))
+        await stop.wait()
+
+        for task in background:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        if in_flight:
+            log.info("waiting for %s in-flight tasks ...", len(in_flight))
+            await asyncio.gather(*in_flight, return_exceptions=True)
     finally:
-        ch.basic_ack(delivery_tag=method.delivery_tag)
+        await connection.close()
+        await engine.dispose()
 
 
+# ────────────────────────── BLOCKING CONSUMER ─────────────────────────
 def _consume_loop():
     global connection, channel, running
 
@@ -109,11 +555,23 @@ def _consume_loop():
         try:
             connection = pika.BlockingConnection(params)
             channel = connection.channel()
-            channel.queue_declare(queue=TASK_QUEUE, durable=True)
+            # в блокирующем режиме глубина снимается только при (пере)подключении
+            declares = [(DEAD_LETTER_QUEUE, None)]
+            for name in LANE_QUEUES.values():
+                declares += [(name, task_queue_arguments()), (retry_queue(name), retry_queue_arguments(name))]
+            for name, args in declares:
+                ok = channel.queue_declare(queue=name, durable=True, arguments=args)
+                AMQP_QUEUE_DEPTH.labels(name).set(ok.method.message_count)
+            channel.exchange_declare(exchange=TASK_EVENTS_EXCHANGE, exchange_type="topic", durable=True)
             channel.basic_qos(prefetch_count=1)
-            channel.basic_consume(queue=TASK_QUEUE, on_message_callback=_on_message)
+            # в блокирующем режиме брошенные резервы и задачи проверяются при (пере)подключении
+            asyncio.run(_release_stale_holds())
+            asyncio.run(_expire_stale_tasks())
+            # без планировщика: по сообщению за раз из каждой полосы, веса не применяются
+            for name in LANE_QUEUES.values():
+                channel.basic_consume(queue=name, on_message_callback=_on_message)
 
-            log.info("consuming from queue '%s' ...", TASK_QUEUE)
+            log.info("consuming from queues %s ...", list(LANE_QUEUES.values()))
             channel.start_consuming()
 
         except Exception as e:
@@ -143,10 +601,38 @@ def _handle_sigterm(*_):
         pass
 
 
+def _mark_ready(ready: bool) -> None:
+    """Файл-флаг готовности для healthcheck контейнера: появляется только после прогрева моделей."""
+    path = settings.WORKER_READY_FILE
+    if not path:
+        return
+    if ready:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(Model.readiness(), f)
+    else:
+        with suppress(FileNotFoundError):
+            os.remove(path)
+
+
 def main():
-    signal.signal(signal.SIGINT, _handle_sigterm)
-    signal.signal(signal.SIGTERM, _handle_sigterm)
-    _consume_loop()
+    _mark_ready(False)
+    if settings.METRICS_ENABLED and settings.WORKER_METRICS_PORT:
+        start_metrics_server(settings.WORKER_METRICS_PORT)
+        log.info("metrics on :%s/metrics", settings.WORKER_METRICS_PORT)
+    log.info("warming up models ...")
+    Model.warmup()
+    log.info("models are warm: %s", Model.readiness())
+    _mark_ready(True)
+    try:
+        if settings.WORKER_MODE.strip().lower() == "blocking":
+            signal.signal(signal.SIGINT, _handle_sigterm)
+            signal.signal(signal.SIGTERM, _handle_sigterm)
+            _consume_loop()
+            return
+        asyncio.run(_consume_async())
+    finally:
+        _mark_ready(False)
+        Model.shutdown()
 
 
 if __name__ == "__main__":
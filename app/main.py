@@ -1,6 +1,7 @@
 # --- app/main.py (фрагменты) ---
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
@@ -8,6 +9,13 @@ from pathlib import Path
 from app.api.routers import auth, translate, wallet, history, home
 from app.infrastructure.db.init_db import init as init_db
 from app.infrastructure.db.config import get_settings
+from app.core.settings import get_settings as get_app_settings
+from app.core.metrics import MetricsMiddleware, register_engine, render_latest
+from app.infrastructure.db.database import engine, read_engine
+from app.domain.services.translation_request import Model
+from app.infrastructure.bus.publisher import start_publisher, stop_publisher
+from app.infrastructure.bus.events import start_event_hub, stop_event_hub
+from app.infrastructure.bus.admission import start_queue_monitor, stop_queue_monitor
 from app.presentation.web.router import router as web_router
 # from app.presentation.web import web   # не используется → можно убрать
 
@@ -21,7 +29,18 @@ async def lifespan(app: FastAPI):
     )
     if should_init:
         await init_db()
+    if get_app_settings().INFERENCE_WARMUP_ON_START:
+        # прогрев в фоне: /health отвечает 503, пока модели не загружены
+        asyncio.get_running_loop().run_in_executor(None, Model.warmup)
+    if not getattr(settings, "TESTING", False):
+        await start_publisher()
+        await start_event_hub()
+        await start_queue_monitor()
     yield
+    await stop_queue_monitor()
+    await stop_event_hub()
+    await stop_publisher()
+    Model.shutdown()
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -46,6 +65,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# метрики: латентность по маршрутам + пул БД; middleware последним — снаружи CORS
+if get_app_settings().METRICS_ENABLED:
+    register_engine("primary", engine)
+    if read_engine is not engine:
+        register_engine("replica", read_engine)
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        body, content_type = render_latest()
+        return Response(content=body, media_type=content_type)
+
 # роуты
 app.include_router(auth.router)
 app.include_router(translate.router)
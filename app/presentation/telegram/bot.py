@@ -1,4 +1,5 @@
 import os
+import time
 import logging
 from typing import Tuple, Optional
 
@@ -37,6 +38,10 @@ API_PASSWORD = os.getenv("API_PASSWORD", "").strip()
 if not API_BASE and API_URL:
     API_BASE = API_URL.split("/translate")[0].rstrip("/")
 
+# API может ответить 202 + task_id (перегрузка, модели не в процессе API) — ждём результат long-poll'ом
+TASK_WAIT_S = float(os.getenv("TASK_WAIT_S", "120"))
+TASK_POLL_S = 30.0
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -114,6 +119,34 @@ async def _api_post(path: str, payload: dict) -> dict:
         return resp.json()
 
 
+async def _wait_task(client: httpx.AsyncClient, task_id: str, headers: dict) -> dict:
+    """Long-poll /translate/task/{id}?wait=… до терминального статуса или TASK_WAIT_S."""
+    deadline = time.monotonic() + TASK_WAIT_S
+    status: dict = {"task_id": task_id, "status": "queued"}
+    while time.monotonic() < deadline:
+        wait = min(TASK_POLL_S, max(1.0, deadline - time.monotonic()))
+        resp = await client.get(
+            f"{API_BASE}/translate/task/{task_id}",
+            params={"wait": wait},
+            headers=headers,
+            timeout=wait + 10.0,
+        )
+        resp.raise_for_status()
+        status = resp.json()
+        if status.get("status") in ("done", "failed"):
+            break
+    return status
+
+
+async def _reply_translation(update: Update, data: dict) -> None:
+    translated = data.get("output_text") or "<нет перевода>"
+    cost = data.get("cost")
+    if cost is not None:
+        await update.message.reply_text(f"Перевод: {translated}\nСписано: {cost}")
+    else:
+        await update.message.reply_text(f"Перевод: {translated}")
+
+
 # -------------------- Команды бота --------------------
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -156,15 +189,21 @@ async def translate_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         async with httpx.AsyncClient(timeout=20.0, follow_redirects=True) as client:
             resp = await client.post(API_URL, json=payload, headers=headers)
+            if resp.status_code == 202:
+                # перевод поставлен в очередь — дожидаемся воркера
+                status = await _wait_task(client, resp.json()["task_id"], headers)
 
         if resp.status_code == 200:
-            data = resp.json()
-            translated = data.get("output_text") or "<нет перевода>"
-            cost = data.get("cost")
-            if cost is not None:
-                await update.message.reply_text(f"Перевод: {translated}\nСписано: {cost}")
+            await _reply_translation(update, resp.json())
+        elif resp.status_code == 202:
+            if status.get("status") == "done":
+                await _reply_translation(update, status)
+            elif status.get("status") == "failed":
+                await update.message.reply_text(f"Перевод не удался: {status.get('error') or 'ошибка воркера'}")
             else:
-                await update.message.reply_text(f"Перевод: {translated}")
+                await update.message.reply_text(
+                    f"Перевод ещё в очереди, задача {status['task_id']}. Попробуйте позже."
+                )
         else:
             detail = None
             try:
@@ -7,13 +7,11 @@ from pathlib import Path
 from fastapi import APIRouter, Depends, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.infrastructure.db.database import get_db
-from app.infrastructure.db.models.user import User
-from app.infrastructure.db.models.translation import Translation
-from app.infrastructure.db.models.transaction import Transaction
+from app.core.settings import get_settings
+from app.infrastructure.db.database import get_read_db
+from app.infrastructure.repositories.stats import StatsRepository
 
 router = APIRouter(prefix="/web", tags=["Web"])
 
@@ -34,11 +32,15 @@ async def web_root():
 
 
 @router.get("/dashboard", response_class=HTMLResponse)
-async def dashboard(request: Request, db: AsyncSession = Depends(get_db)) -> HTMLResponse:
-    # Простейшие метрики
-    users_count = await db.scalar(select(func.count(User.id)))
-    tr_count = await db.scalar(select(func.count(Translation.id)))
-    tx_count = await db.scalar(select(func.count(Transaction.id)))
+async def dashboard(request: Request, db: AsyncSession = Depends(get_read_db)) -> HTMLResponse:
+    # Предрасчитанные счётчики (models/stats.py) — без count(*) по большим таблицам
+    settings = get_settings()
+    counters = await StatsRepository.counters(db)
+    users_count = counters["users"]
+    tr_count = counters["translations"]
+    tx_count = counters["transactions"]
+    daily = await StatsRepository.daily(db, settings.STATS_DASHBOARD_DAYS)
+    pairs = await StatsRepository.pairs(db, settings.STATS_DASHBOARD_PAIRS)
 
     # Пытаемся отдать шаблон; если нет шаблона или ошибка — отдаём фолбэк
     try:
@@ -49,6 +51,8 @@ async def dashboard(request: Request, db: AsyncSession = Depends(get_db)) -> HTM
                 "users_count": users_count or 0,
                 "translations_count": tr_count or 0,
                 "transactions_count": tx_count or 0,
+                "daily_stats": daily,
+                "pair_stats": pairs,
             },
         )
     except Exception as e:
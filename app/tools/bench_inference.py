@@ -0,0 +1,92 @@
+# app/tools/bench_inference.py
+"""
+Бенчмарк пропускной способности бэкендов инференса на CPU: для каждого бэкенда
+модель загружается (время загрузки — отдельно, для onnx первый запуск включает
+экспорт графа), прогревается одной пачкой и затем переводит тексты --rounds раз
+пачками по бюджету токенов, как в воркере.
+
+    python -m app.tools.bench_inference --pair en-fr --rounds 5 --threads 4
+    python -m app.tools.bench_inference --backend pipeline --backend int8 --file texts.txt
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from typing import Any, Dict, List
+
+from app.core.settings import get_settings
+from app.infrastructure.inference.backends import BACKENDS
+from app.infrastructure.inference.generation import budget_chunks, padding_stats, translate_encoded
+from app.tools.inference_parity import load_texts, parse_pairs
+
+
+def _run(pipe: Any, texts: List[str], rounds: int) -> Dict[str, float]:
+    settings = get_settings()
+    encodings = [list(pipe.tokenizer.encode(t)) for t in texts]
+    chunks = [
+        [encodings[i] for i in idx]
+        for idx in budget_chunks(encodings, settings.INFERENCE_MAX_BATCH_TOKENS, settings.INFERENCE_MAX_BATCH_SIZE)
+    ]
+    translate_encoded(pipe, chunks[0])  # прогрев: аллокации, ленивые инициализации
+
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for chunk in chunks:
+            t0 = time.perf_counter()
+            translate_encoded(pipe, chunk)
+            latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    real = sum(padding_stats(chunk)[0] for chunk in chunks)
+    padded = sum(padding_stats(chunk)[1] for chunk in chunks)
+    return {
+        "texts_per_s": len(texts) * rounds / elapsed,
+        "tokens_per_s": real * rounds / elapsed,
+        "batch_p50_ms": statistics.median(latencies) * 1000,
+        "batches": len(chunks),
+        "padding_efficiency": real / padded if padded else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS),
+                        help="бэкенд (можно несколько; по умолчанию все)")
+    parser.add_argument("--pair", action="append", help="языковая пара, например en-fr (по умолчанию все)")
+    parser.add_argument("--file", help="тексты, по одному на строку")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None, help="потоков torch (по умолчанию как есть)")
+    args = parser.parse_args()
+
+    if args.threads:
+        import torch
+
+        torch.set_num_threads(args.threads)
+
+    from app.domain.services.translation_request import Model
+
+    backends = args.backend or sorted(BACKENDS)
+    for key in parse_pairs(args.pair):
+        model_name = Model.SUPPORTED_MODELS[key]
+        texts = load_texts(args.file, key[0])
+        print(f"{'-'.join(key)} {model_name}: {len(texts)} texts x {args.rounds} rounds")
+        for backend in backends:
+            started = time.perf_counter()
+            try:
+                pipe = BACKENDS[backend]().load(model_name)
+            except Exception as e:
+                print(f"  {backend:8} FAILED to load: {type(e).__name__}: {e}")
+                continue
+            load_s = time.perf_counter() - started
+            r = _run(pipe, texts, args.rounds)
+            print(
+                f"  {backend:8} load {load_s:6.1f} s   {r['texts_per_s']:7.1f} texts/s   "
+                f"{r['tokens_per_s']:8.1f} tokens/s   batch p50 {r['batch_p50_ms']:7.1f} ms   "
+                f"({r['batches']} batches, padding eff {r['padding_efficiency']:.2f})"
+            )
+
+
+if __name__ == "__main__":
+    main()
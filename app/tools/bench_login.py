@@ -0,0 +1,90 @@
+# app/tools/bench_login.py
+"""
+Бенчмарк проверки паролей под конкуренцией: bcrypt прямо в event loop
+(как было в /auth/login) против PasswordHasher.check_async (пул потоков).
+
+Параллельно с «логинами» крутится тикер, который каждые 10 мс просыпается
+и замеряет, на сколько опоздал: это задержка, которую видят все остальные
+запросы того же uvicorn-воркера.
+
+    python -m app.tools.bench_login --logins 64 --concurrency 16 --rounds 12
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict, List
+
+from app.core.utils.hasher import PasswordHasher
+
+TICK_S = 0.01
+
+
+async def _ticker(stop: asyncio.Event, lags: List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_S)
+        lags.append(time.perf_counter() - started - TICK_S)
+
+
+async def _run(mode: str, hashed: str, logins: int, concurrency: int) -> Dict[str, float]:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def _login() -> None:
+        async with sem:
+            started = time.perf_counter()
+            if mode == "inline":
+                ok = PasswordHasher.check("password1", hashed)
+            else:
+                ok = await PasswordHasher.check_async("password1", hashed)
+            assert ok
+            latencies.append(time.perf_counter() - started)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    latencies.sort()
+    return {
+        "logins_per_s": logins / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "loop_lag_max_ms": max(lags, default=0.0) * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=None, help="cost bcrypt (по умолчанию из настроек)")
+    parser.add_argument("--workers", type=int, default=None, help="PASSWORD_HASH_WORKERS")
+    args = parser.parse_args()
+
+    if args.workers:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    rounds = args.rounds or PasswordHasher.rounds()
+    hashed = PasswordHasher.hash("password1", rounds=rounds)
+
+    print(f"bcrypt cost={rounds} logins={args.logins} concurrency={args.concurrency}")
+    for mode in ("inline", "offload"):
+        r = await _run(mode, hashed, args.logins, args.concurrency)
+        print(
+            f"{mode:8} {r['logins_per_s']:8.1f} logins/s   p50 {r['p50_ms']:7.1f} ms   "
+            f"p95 {r['p95_ms']:7.1f} ms   max loop lag {r['loop_lag_max_ms']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
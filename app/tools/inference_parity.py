@@ -0,0 +1,135 @@
+# app/tools/inference_parity.py
+"""
+Сверка бэкендов инференса с эталоном (transformers.pipeline, fp32):
+одни и те же тексты переводятся эталоном и каждым кандидатом, считаются
+доля точных совпадений и средняя посимвольная близость переводов.
+Код возврата 1, если у какого-то бэкенда близость ниже --min-similarity.
+
+    python -m app.tools.inference_parity --backend int8 --backend onnx --pair en-fr
+    python -m app.tools.inference_parity --backend onnx --file texts.txt --show 5
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.settings import get_settings
+from app.infrastructure.inference.backends import BACKENDS, REFERENCE_BACKEND
+from app.infrastructure.inference.generation import budget_chunks, translate_encoded
+
+SAMPLES: Dict[str, List[str]] = {
+    "en": [
+        "Hello!",
+        "The weather is nice today.",
+        "Please send me the invoice by Friday.",
+        "How much does a ticket to Paris cost?",
+        "I have been working on this project for three years, and it is finally ready for release.",
+        "The meeting was postponed because the director was stuck in traffic.",
+        "Click the button below to confirm your email address.",
+        "Our team will contact you within two business days.",
+        "The museum is closed on Mondays, but it stays open late on Thursdays.",
+        "If the problem persists, restart the application and try again.",
+        "She bought apples, pears, a loaf of bread and a bottle of milk.",
+        "This sentence is intentionally long so that the batch contains texts of very different "
+        "lengths, which is exactly the case where padding and numeric precision matter most.",
+    ],
+    "fr": [
+        "Bonjour !",
+        "Il fait beau aujourd'hui.",
+        "Merci de m'envoyer la facture avant vendredi.",
+        "Combien coûte un billet pour Lyon ?",
+        "Je travaille sur ce projet depuis trois ans et il est enfin prêt à être publié.",
+        "La réunion a été reportée parce que le directeur était coincé dans les embouteillages.",
+        "Cliquez sur le bouton ci-dessous pour confirmer votre adresse e-mail.",
+        "Notre équipe vous contactera dans un délai de deux jours ouvrés.",
+        "Le musée est fermé le lundi, mais il reste ouvert tard le jeudi.",
+        "Si le problème persiste, redémarrez l'application et réessayez.",
+        "Elle a acheté des pommes, des poires, une baguette et une bouteille de lait.",
+        "Cette phrase est volontairement longue afin que le lot contienne des textes de longueurs "
+        "très différentes, ce qui est précisément le cas où le remplissage et la précision comptent.",
+    ],
+}
+
+
+def load_texts(path: Optional[str], source_lang: str) -> List[str]:
+    """Тексты из файла (по одному на строку) или встроенные примеры для языка источника."""
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    return list(SAMPLES.get(source_lang, SAMPLES["en"]))
+
+
+def parse_pairs(values: Optional[List[str]]) -> List[Tuple[str, str]]:
+    from app.domain.services.translation_request import Model
+
+    if not values:
+        return list(Model.SUPPORTED_MODELS)
+    pairs = [tuple(v.lower().split("-", 1)) for v in values]
+    unknown = [p for p in pairs if p not in Model.SUPPORTED_MODELS]
+    if unknown:
+        raise SystemExit(f"unsupported pairs: {['-'.join(p) for p in unknown]}")
+    return pairs  # type: ignore[return-value]
+
+
+def translate_all(pipe: Any, texts: List[str]) -> List[str]:
+    """Тексты в порядке входа; пачки — как у воркера, по бюджету токенов с паддингом."""
+    settings = get_settings()
+    encodings = [list(pipe.tokenizer.encode(t)) for t in texts]
+    outputs = [""] * len(texts)
+    for idx in budget_chunks(encodings, settings.INFERENCE_MAX_BATCH_TOKENS, settings.INFERENCE_MAX_BATCH_SIZE):
+        for i, out in zip(idx, translate_encoded(pipe, [encodings[i] for i in idx])):
+            outputs[i] = out
+    return outputs
+
+
+def compare(reference: List[str], candidate: List[str]) -> Dict[str, Any]:
+    ratios = [SequenceMatcher(None, r, c).ratio() for r, c in zip(reference, candidate)]
+    return {
+        "exact": sum(r == c for r, c in zip(reference, candidate)) / len(reference),
+        "similarity": sum(ratios) / len(ratios),
+        "worst": sorted(range(len(ratios)), key=ratios.__getitem__),
+        "ratios": ratios,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", action="append", choices=sorted(set(BACKENDS) - {REFERENCE_BACKEND}),
+                        help="кандидат для сверки (можно несколько; по умолчанию все)")
+    parser.add_argument("--pair", action="append", help="языковая пара, например en-fr (по умолчанию все)")
+    parser.add_argument("--file", help="тексты, по одному на строку")
+    parser.add_argument("--min-similarity", type=float, default=0.9)
+    parser.add_argument("--show", type=int, default=3, help="сколько худших расхождений показать")
+    args = parser.parse_args()
+
+    from app.domain.services.translation_request import Model
+
+    candidates = args.backend or sorted(set(BACKENDS) - {REFERENCE_BACKEND})
+    failed = False
+    for key in parse_pairs(args.pair):
+        model_name = Model.SUPPORTED_MODELS[key]
+        texts = load_texts(args.file, key[0])
+        reference = translate_all(BACKENDS[REFERENCE_BACKEND]().load(model_name), texts)
+        print(f"{'-'.join(key)} {model_name}: {len(texts)} texts")
+        for backend in candidates:
+            try:
+                outputs = translate_all(BACKENDS[backend]().load(model_name), texts)
+            except Exception as e:
+                print(f"  {backend:8} FAILED to run: {type(e).__name__}: {e}")
+                failed = True
+                continue
+            r = compare(reference, outputs)
+            ok = r["similarity"] >= args.min_similarity
+            failed = failed or not ok
+            print(f"  {backend:8} exact {r['exact']:6.1%}   similarity {r['similarity']:6.3f}   {'ok' if ok else 'FAIL'}")
+            for i in r["worst"][: args.show]:
+                if r["ratios"][i] >= 1.0:
+                    break
+                print(f"    [{r['ratios'][i]:.3f}] {texts[i]!r}\n      ref: {reference[i]!r}\n      got: {outputs[i]!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
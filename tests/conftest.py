@@ -0,0 +1,39 @@
+# tests/conftest.py
+import os
+import uuid
+
+# до импорта app.*: модули БД собирают движок из настроек при импорте
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.infrastructure.db.database import Base
+from app.infrastructure.db.models.user import User
+from app.infrastructure.db.models.wallet import Wallet
+from app.infrastructure.db.models import task as _task, translation_cache as _tc  # noqa: F401
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    await engine.dispose()
+
+
+async def add_user(session_factory, balance: int = 10) -> str:
+    user_id = str(uuid.uuid4())
+    async with session_factory() as db:
+        db.add(User(id=user_id, email=f"{user_id}@example.com", _password_hash="x", wallet=Wallet(balance=balance)))
+        await db.commit()
+    return user_id
+
+
+async def balance_of(session_factory, user_id: str) -> int:
+    from sqlalchemy import select
+
+    async with session_factory() as db:
+        return await db.scalar(select(Wallet.balance).where(Wallet.user_id == user_id))
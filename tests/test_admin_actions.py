@@ -0,0 +1,27 @@
+# tests/test_admin_actions.py
+from app.domain.services.admin_actions import AdminActions
+from app.domain.services.wallet_ledger import WalletLedger
+
+from tests.conftest import add_user
+
+
+async def test_view_transactions_streams_rows(session_factory, monkeypatch):
+    from app.core.settings import get_settings
+
+    monkeypatch.setattr(get_settings(), "EXPORT_BATCH_ROWS", 2)
+    first = await add_user(session_factory, balance=0)
+    other = await add_user(session_factory, balance=0)
+    async with session_factory() as db:
+        for i in range(5):
+            await WalletLedger.credit(db, first, 1, tx_type="TOPUP", idempotency_key=f"t{i}")
+        await WalletLedger.credit(db, other, 1, tx_type="TOPUP")
+        await db.commit()
+
+    async with session_factory() as db:
+        rows = [row async for row in AdminActions.view_transactions(db, first)]
+        everyone = [row async for row in AdminActions.view_transactions(db)]
+        translations = [row async for row in AdminActions.view_translations(db)]
+    assert len(rows) == 5 and {r["user_id"] for r in rows} == {first}
+    assert set(rows[0]) == {"id", "timestamp", "user_id", "type", "amount"}
+    assert len(everyone) == 6
+    assert translations == []
@@ -0,0 +1,95 @@
+# tests/test_admission.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.settings import get_settings
+from app.domain.services.admission import ACCEPT, DOWNGRADE, REJECT, decide
+from app.infrastructure.bus.admission import QueueStats
+from app.infrastructure.bus.topology import PRIORITY_LOW, PRIORITY_NORMAL
+from app.infrastructure.db.models.task import TaskState, TaskStatus
+from app.infrastructure.repositories.tasks import TaskStateRepository
+
+
+@pytest.fixture(autouse=True)
+def thresholds(monkeypatch):
+    settings = get_settings()
+    for name, value in {
+        "ADMISSION_USER_MAX_INFLIGHT": 10,
+        "ADMISSION_DOWNGRADE_DEPTH": 100,
+        "ADMISSION_DOWNGRADE_WAIT_S": 30.0,
+        "ADMISSION_REJECT_DEPTH": 1000,
+        "ADMISSION_REJECT_WAIT_S": 300.0,
+        "ADMISSION_RETRY_AFTER_MAX_S": 120,
+        "ADMISSION_POLL_S": 2.0,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+
+def test_user_cap_rejects_even_without_stats():
+    decision = decide(None, user_inflight=9, n_items=2)
+    assert decision.action == REJECT and decision.rejected
+    assert decision.retry_after_s == 2  # темпа нет — клиенту подсказывается интервал опроса
+    assert decide(None, user_inflight=9, n_items=1).action == ACCEPT
+
+
+def test_user_cap_retry_after_follows_wait_estimate():
+    stats = QueueStats(depth=50, consumers=1, throughput=10.0)
+    assert decide(stats, user_inflight=10, n_items=1).retry_after_s == 5
+
+
+def test_stale_stats_accept():
+    # монитор отдаёт None, когда снимок устарел: по очереди не режем
+    decision = decide(None, user_inflight=0, n_items=1)
+    assert decision.action == ACCEPT and decision.priority == PRIORITY_NORMAL
+
+
+def test_reject_by_depth():
+    decision = decide(QueueStats(depth=1000, consumers=1), user_inflight=0, n_items=1)
+    assert decision.action == REJECT
+    assert decision.retry_after_s == 120  # ожидание неизвестно — верхняя граница
+
+
+def test_reject_by_wait():
+    stats = QueueStats(depth=600, consumers=1, throughput=2.0)  # 300 с ожидания
+    decision = decide(stats, user_inflight=0, n_items=1)
+    assert decision.action == REJECT and decision.retry_after_s == 120
+
+
+def test_downgrade_by_depth_and_wait():
+    by_depth = decide(QueueStats(depth=100, consumers=1, throughput=100.0), user_inflight=0, n_items=1)
+    by_wait = decide(QueueStats(depth=60, consumers=1, throughput=2.0), user_inflight=0, n_items=1)
+    for decision in (by_depth, by_wait):
+        assert decision.action == DOWNGRADE and not decision.rejected
+        assert decision.priority == PRIORITY_LOW
+
+
+def test_no_throughput_ignores_wait_estimate():
+    # без замеренного темпа оценка ожидания бесконечна, но решают только пороги глубины
+    assert decide(QueueStats(depth=50, consumers=0, throughput=0.0), user_inflight=0, n_items=1).action == ACCEPT
+
+
+async def test_stale_tasks_leave_the_user_limit(session_factory):
+    now = datetime.utcnow()
+    old = now - timedelta(hours=2)
+    async with session_factory() as db:
+        db.add_all([
+            TaskState(task_id="fresh", user_id="u1", status=TaskStatus.QUEUED.value, updated_at=now),
+            TaskState(task_id="lost", user_id="u1", status=TaskStatus.QUEUED.value, updated_at=old),
+            TaskState(task_id="hung", user_id="u1", status=TaskStatus.RUNNING.value, updated_at=old),
+            TaskState(task_id="old-done", user_id="u1", status=TaskStatus.DONE.value, updated_at=old),
+        ])
+        await db.commit()
+
+    since = now - timedelta(hours=1)
+    async with session_factory() as db:
+        assert await TaskStateRepository.count_inflight(db, "u1") == 3
+        assert await TaskStateRepository.count_inflight(db, "u1", since=since) == 1
+        assert await TaskStateRepository.expire_stale(db, since) == 2
+        await db.commit()
+
+    async with session_factory() as db:
+        assert await TaskStateRepository.count_inflight(db, "u1") == 1
+        lost = await db.get(TaskState, "lost")
+        assert lost.status == TaskStatus.FAILED.value and lost.finished_at is not None
+        assert (await db.get(TaskState, "old-done")).status == TaskStatus.DONE.value
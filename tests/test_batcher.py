@@ -0,0 +1,81 @@
+# tests/test_batcher.py
+import threading
+
+from app.infrastructure.inference.batcher import BatchingEngine, parse_buckets
+from app.infrastructure.inference.generation import budget_chunks, padding_stats
+
+
+class Recorder:
+    def __init__(self):
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def __call__(self, key, texts, encodings):
+        with self._lock:
+            self.batches.append(list(encodings))
+        return [t.upper() for t in texts]
+
+
+def _ids(n):
+    return list(range(n))
+
+
+def test_parse_buckets():
+    assert parse_buckets("32, 8,x,-1,16,8") == (8, 16, 32)
+
+
+def test_batches_respect_padded_token_budget():
+    run = Recorder()
+    engine = BatchingEngine(run, window_ms=60_000, max_batch_size=64, max_batch_tokens=32, length_buckets=(100,))
+    futures = [engine.submit("en-fr", f"t{i}", _ids(8)) for i in range(10)]
+    # по бюджету пачки уходят, не дожидаясь окна
+    assert [f.result(timeout=5) for f in futures[:8]] == [f"T{i}" for i in range(8)]
+    engine.close()
+    assert [f.result(timeout=5) for f in futures[8:]] == ["T8", "T9"]
+
+    for batch in run.batches:
+        real, padded = padding_stats(batch)
+        assert padded <= 32
+    assert [len(b) for b in run.batches] == [4, 4, 2]
+
+
+def test_length_buckets_do_not_mix():
+    run = Recorder()
+    engine = BatchingEngine(run, window_ms=60_000, max_batch_size=64, max_batch_tokens=10_000, length_buckets=(8, 64))
+    for i in range(3):
+        engine.submit("en-fr", f"short{i}", _ids(4))
+        engine.submit("en-fr", f"long{i}", _ids(50))
+    engine.close()
+    assert sorted(sorted(len(e) for e in b) for b in run.batches) == [[4, 4, 4], [50, 50, 50]]
+
+
+def test_oversized_text_runs_alone():
+    run = Recorder()
+    engine = BatchingEngine(run, window_ms=60_000, max_batch_size=64, max_batch_tokens=16, length_buckets=())
+    futures = [engine.submit("en-fr", "big", _ids(40)), engine.submit("en-fr", "small", _ids(2))]
+    engine.close()
+    assert [f.result(timeout=5) for f in futures] == ["BIG", "SMALL"]
+    assert [len(b) for b in run.batches] == [1, 1]
+
+
+def test_run_batch_error_fails_every_caller():
+    def boom(key, texts, encodings):
+        raise ValueError("model crashed")
+
+    engine = BatchingEngine(boom, window_ms=60_000, max_batch_tokens=1000)
+    futures = [engine.submit("en-fr", f"t{i}", _ids(3)) for i in range(3)]
+    engine.close()
+    for f in futures:
+        assert isinstance(f.exception(timeout=5), ValueError)
+
+
+def test_budget_chunks_sorts_by_length_and_keeps_budget():
+    encodings = [_ids(n) for n in (30, 2, 2, 9, 3, 30)]
+    chunks = budget_chunks(encodings, max_tokens=20, max_size=3)
+    assert sorted(i for c in chunks for i in c) == list(range(6))
+    for chunk in chunks:
+        rows = [encodings[i] for i in chunk]
+        assert len(chunk) <= 3
+        assert len(chunk) == 1 or padding_stats(rows)[1] <= 20
+    # короткие едут вместе, длинные — по одной
+    assert chunks[0] == [1, 2, 4]
@@ -0,0 +1,65 @@
+# tests/test_scheduler.py
+import asyncio
+
+from app.infrastructure.worker.scheduler import FairScheduler, parse_weights
+
+
+def _drain(scheduler: FairScheduler):
+    out = []
+    while (picked := scheduler.get_nowait()) is not None:
+        out.append(picked)
+    return out
+
+
+def test_parse_weights():
+    assert parse_weights("interactive:4, bulk:1") == {"interactive": 4, "bulk": 1}
+    assert parse_weights("a:0,b:x,,c") == {"a": 1, "b": 1, "c": 1}
+
+
+def test_lanes_follow_weights_without_starving_bulk():
+    scheduler = FairScheduler({"interactive": 4, "bulk": 1})
+    for i in range(20):
+        scheduler.put("interactive", "u", f"i{i}")
+        scheduler.put("bulk", "u", f"b{i}")
+    lanes = [lane for lane, _ in _drain(scheduler)[:10]]
+    assert lanes.count("interactive") == 8
+    assert lanes.count("bulk") == 2
+    # bulk получает свою долю в каждом окне из пяти выдач
+    assert "bulk" in lanes[:5] and "bulk" in lanes[5:]
+
+
+def test_users_round_robin_within_lane():
+    scheduler = FairScheduler({"interactive": 1})
+    for i in range(5):
+        scheduler.put("interactive", "heavy", f"h{i}")
+    scheduler.put("interactive", "light", "l0")
+    items = [item for _, item in _drain(scheduler)]
+    assert items[:2] == ["h0", "l0"]
+    # порядок задач одного пользователя сохраняется
+    assert items[2:] == ["h1", "h2", "h3", "h4"]
+
+
+def test_idle_lane_does_not_bank_credit():
+    scheduler = FairScheduler({"interactive": 1, "bulk": 1})
+    for i in range(3):
+        scheduler.put("interactive", "u", i)
+    _drain(scheduler)
+    scheduler.put("interactive", "u", "i")
+    scheduler.put("bulk", "u", "b")
+    assert [lane for lane, _ in _drain(scheduler)] in (["interactive", "bulk"], ["bulk", "interactive"])
+
+
+def test_unknown_lane_gets_weight_one():
+    scheduler = FairScheduler({"interactive": 1})
+    scheduler.put("other", None, "x")
+    assert scheduler.get_nowait() == ("other", "x")
+    assert len(scheduler) == 0
+
+
+async def test_get_waits_for_put():
+    scheduler = FairScheduler({"interactive": 1})
+    getter = asyncio.create_task(scheduler.get())
+    await asyncio.sleep(0)
+    assert not getter.done()
+    scheduler.put("interactive", "u", "x")
+    assert await asyncio.wait_for(getter, 1) == ("interactive", "x")
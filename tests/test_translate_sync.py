@@ -0,0 +1,110 @@
+# tests/test_translate_sync.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.api.routers import translate as router
+from app.core.principal import Principal
+from app.domain.schemas.classes import TranslationIn
+from app.domain.services.inference import InferenceService
+from app.infrastructure.db.models.transaction import Transaction
+from app.infrastructure.db.models.wallet import HOLD_RELEASED, HOLD_SETTLED, WalletHold
+
+from tests.conftest import add_user, balance_of
+
+
+class FakeService:
+    def __init__(self, result="bonjour"):
+        self.result = result
+        self.calls = 0
+
+    async def translate_sync(self, text, source_lang, target_lang):
+        self.calls += 1
+        if isinstance(self.result, BaseException):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def service(monkeypatch):
+    svc = FakeService()
+    monkeypatch.setattr(router, "get_inference_service", lambda: svc)
+    return svc
+
+
+async def _call(session_factory, user_id, key=None, source="en"):
+    data = TranslationIn(input_text="hello", source_lang=source, target_lang="fr")
+    async with session_factory() as db:
+        return await router.translate_sync(data, db, Principal(id=user_id, email="u@example.com"), key)
+
+
+async def _hold_statuses(session_factory):
+    async with session_factory() as db:
+        return list((await db.scalars(select(WalletHold.status))).all())
+
+
+async def test_charges_before_returning(session_factory, service):
+    user_id = await add_user(session_factory, balance=2)
+    out = await _call(session_factory, user_id, key="k1")
+    assert out.output_text == "bonjour" and out.cost == 1
+    assert await balance_of(session_factory, user_id) == 1
+    assert await _hold_statuses(session_factory) == [HOLD_SETTLED]
+
+    # повтор с тем же ключом — тот же перевод без второго списания и инференса
+    assert (await _call(session_factory, user_id, key="k1")).output_text == "bonjour"
+    assert service.calls == 1
+    assert await balance_of(session_factory, user_id) == 1
+    async with session_factory() as db:
+        assert await db.scalar(select(func.count()).select_from(Transaction)) == 1
+
+
+async def test_no_funds_is_402_without_inference(session_factory, service):
+    user_id = await add_user(session_factory, balance=0)
+    with pytest.raises(HTTPException) as e:
+        await _call(session_factory, user_id)
+    assert e.value.status_code == 402
+    assert service.calls == 0
+    assert await _hold_statuses(session_factory) == []
+
+
+async def test_unsupported_pair_is_rejected_before_hold(session_factory, service):
+    user_id = await add_user(session_factory, balance=2)
+    with pytest.raises(HTTPException) as e:
+        await _call(session_factory, user_id, source="xx")
+    assert e.value.status_code == 422
+    assert service.calls == 0
+    assert await balance_of(session_factory, user_id) == 2
+
+
+async def test_timeout_releases_hold(session_factory, service):
+    user_id = await add_user(session_factory, balance=2)
+    service.result = asyncio.TimeoutError()
+    with pytest.raises(HTTPException) as e:
+        await _call(session_factory, user_id)
+    assert e.value.status_code == 504
+    assert await balance_of(session_factory, user_id) == 2
+    assert await _hold_statuses(session_factory) == [HOLD_RELEASED]
+
+
+def test_admit_takes_slots_atomically(monkeypatch):
+    from app.core.settings import get_settings
+    from app.domain.services.translation_request import Model
+
+    monkeypatch.setattr(get_settings(), "INFERENCE_SYNC_MAX_INFLIGHT", 2)
+    monkeypatch.setattr(Model, "readiness", classmethod(lambda cls: {"ready": True}))
+    svc = InferenceService()
+    assert svc.admit("a") is None
+    assert svc.admit("b") is None
+    assert svc.admit("c") == "too many sync translations in flight"
+    svc._release()
+    assert svc.admit("d") is None
+    assert svc.inflight == 2
+
+
+def test_admit_does_not_load_models(monkeypatch):
+    from app.domain.services.translation_request import Model
+
+    monkeypatch.setattr(Model, "warmup", classmethod(lambda cls, wait=True: pytest.fail("warmup in API")))
+    assert InferenceService().admit("a") == "models are not loaded in this process"
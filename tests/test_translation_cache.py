@@ -0,0 +1,24 @@
+# tests/test_translation_cache.py
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.infrastructure.db.models.translation_cache import TranslationCacheEntry
+from app.infrastructure.inference.cache import DbCacheStore
+
+
+async def test_db_store_ttl_is_utc(session_factory):
+    store = DbCacheStore(session_factory, ttl_s=60)
+    await store.set("k", "hello", model="m", source_lang="en", target_lang="fr")
+    async with session_factory() as db:
+        entry = await db.get(TranslationCacheEntry, "k")
+        # метка времени — UTC приложения, а не локальное now() сервера БД
+        assert abs((entry.created_at - datetime.utcnow()).total_seconds()) < 5
+    assert await store.get("k") == "hello"
+
+    async with session_factory() as db:
+        await db.execute(
+            update(TranslationCacheEntry).values(created_at=datetime.utcnow() - timedelta(seconds=61))
+        )
+        await db.commit()
+    assert await store.get("k") is None
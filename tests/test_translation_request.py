@@ -0,0 +1,131 @@
+# tests/test_translation_request.py
+import pytest
+from sqlalchemy import func, select
+
+from app.domain.services.translation_request import Model, TranslationRequest
+from app.domain.services.wallet_ledger import WalletLedger, ledger_id
+from app.infrastructure.db.models.transaction import Transaction
+from app.infrastructure.db.models.translation import Translation
+from app.infrastructure.db.models.wallet import HOLD_HELD, HOLD_RELEASED, HOLD_SETTLED, WalletHold
+
+from tests.conftest import add_user, balance_of
+
+
+@pytest.fixture(autouse=True)
+def _no_cache(monkeypatch):
+    async def _none(self, *args):
+        return None
+
+    monkeypatch.setattr(TranslationRequest, "_cache_get", _none)
+    monkeypatch.setattr(TranslationRequest, "_cache_set", _none)
+
+
+def _request(user_id: str, external_id: str = "task-1") -> TranslationRequest:
+    return TranslationRequest(
+        user_id=user_id, wallet=None, input_text="hello", source_lang="en",
+        target_lang="fr", model=Model(), external_id=external_id, cost=1,
+    )
+
+
+async def _hold_status(session_factory, user_id: str, external_id: str = "task-1"):
+    async with session_factory() as db:
+        return await db.scalar(select(WalletHold.status).where(WalletHold.id == ledger_id(user_id, external_id)))
+
+
+async def _count(session_factory, model) -> int:
+    async with session_factory() as db:
+        return await db.scalar(select(func.count()).select_from(model))
+
+
+async def test_process_settles_hold(session_factory, monkeypatch):
+    user_id = await add_user(session_factory, balance=5)
+
+    async def infer(self):
+        return "bonjour"
+
+    monkeypatch.setattr(TranslationRequest, "_infer", infer)
+    async with session_factory() as db:
+        assert await _request(user_id).process(db) == "bonjour"
+
+    assert await balance_of(session_factory, user_id) == 4
+    assert await _hold_status(session_factory, user_id) == HOLD_SETTLED
+    assert await _count(session_factory, Transaction) == 1
+
+
+async def test_redelivery_after_crash_reuses_hold(session_factory, monkeypatch):
+    user_id = await add_user(session_factory, balance=5)
+
+    # первая доставка: резерв взят, воркер «упал» до фиксации
+    async with session_factory() as db:
+        req = _request(user_id)
+        req._prepare()
+        assert await req._reserve(db) is None
+    assert await balance_of(session_factory, user_id) == 4
+    assert await _hold_status(session_factory, user_id) == HOLD_HELD
+
+    async def infer(self):
+        return "bonjour"
+
+    monkeypatch.setattr(TranslationRequest, "_infer", infer)
+    async with session_factory() as db:
+        assert await _request(user_id).process(db) == "bonjour"
+
+    # списано ровно один раз
+    assert await balance_of(session_factory, user_id) == 4
+    assert await _hold_status(session_factory, user_id) == HOLD_SETTLED
+
+    # доставка уже выполненной задачи ничего не меняет
+    async with session_factory() as db:
+        assert await _request(user_id).process(db) == "bonjour"
+    assert await balance_of(session_factory, user_id) == 4
+    assert await _count(session_factory, Translation) == 1
+    assert await _count(session_factory, Transaction) == 1
+
+
+async def test_failed_inference_releases_hold(session_factory, monkeypatch):
+    user_id = await add_user(session_factory, balance=5)
+
+    async def infer(self):
+        raise ConnectionError("pool is down")
+
+    monkeypatch.setattr(TranslationRequest, "_infer", infer)
+    async with session_factory() as db:
+        with pytest.raises(ConnectionError):
+            await _request(user_id).process(db)
+    assert await balance_of(session_factory, user_id) == 5
+    assert await _hold_status(session_factory, user_id) == HOLD_RELEASED
+
+    # повтор после отмены резервирует заново и списывает один раз
+    async def ok(self):
+        return "bonjour"
+
+    monkeypatch.setattr(TranslationRequest, "_infer", ok)
+    async with session_factory() as db:
+        assert await _request(user_id).process(db) == "bonjour"
+    assert await balance_of(session_factory, user_id) == 4
+    assert await _hold_status(session_factory, user_id) == HOLD_SETTLED
+
+
+async def test_stale_hold_is_released_and_resettled(session_factory, monkeypatch):
+    from datetime import datetime, timedelta
+
+    user_id = await add_user(session_factory, balance=5)
+    async with session_factory() as db:
+        req = _request(user_id)
+        req._prepare()
+        await req._reserve(db)
+
+    async with session_factory() as db:
+        assert await WalletLedger.release_stale(db, datetime.utcnow() + timedelta(seconds=1)) == 1
+        await db.commit()
+    assert await balance_of(session_factory, user_id) == 5
+    assert await _hold_status(session_factory, user_id) == HOLD_RELEASED
+
+    # резерв вернули, а задача всё же доставлена — списание берётся заново
+    async def infer(self):
+        return "bonjour"
+
+    monkeypatch.setattr(TranslationRequest, "_infer", infer)
+    async with session_factory() as db:
+        assert await _request(user_id).process(db) == "bonjour"
+    assert await balance_of(session_factory, user_id) == 4
@@ -0,0 +1,105 @@
+# tests/test_wallet_ledger.py
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.domain.services.wallet_ledger import InsufficientFunds, WalletLedger, WalletNotFound, ledger_id
+from app.infrastructure.db.models.transaction import Transaction
+
+from tests.conftest import add_user, balance_of
+
+
+async def _transactions(session_factory, user_id):
+    async with session_factory() as db:
+        return await db.scalar(select(func.count()).select_from(Transaction).where(Transaction.user_id == user_id))
+
+
+async def test_debit_is_conditional(session_factory):
+    user_id = await add_user(session_factory, balance=3)
+    async with session_factory() as db:
+        result = await WalletLedger.debit(db, user_id, 2, tx_type="DEBIT")
+        assert result.applied and result.balance == 1
+        with pytest.raises(InsufficientFunds):
+            await WalletLedger.debit(db, user_id, 2, tx_type="DEBIT")
+        await db.commit()
+    # неудачное списание откатило и запись журнала (SAVEPOINT), и баланс не ушёл в минус
+    assert await balance_of(session_factory, user_id) == 1
+    assert await _transactions(session_factory, user_id) == 1
+
+
+async def test_idempotency_key_applies_once(session_factory):
+    user_id = await add_user(session_factory, balance=0)
+    async with session_factory() as db:
+        first = await WalletLedger.credit(db, user_id, 5, tx_type="TOPUP", idempotency_key="topup-1")
+        again = await WalletLedger.credit(db, user_id, 5, tx_type="TOPUP", idempotency_key="topup-1")
+        await db.commit()
+    assert first.applied and first.balance == 5
+    assert not again.applied and again.balance == 5
+    assert first.transaction_id == again.transaction_id == ledger_id(user_id, "topup-1")
+    assert await balance_of(session_factory, user_id) == 5
+    assert await _transactions(session_factory, user_id) == 1
+
+
+async def test_idempotency_key_across_sessions(session_factory):
+    user_id = await add_user(session_factory, balance=10)
+    for _ in range(2):
+        async with session_factory() as db:
+            await WalletLedger.debit(db, user_id, 4, tx_type="DEBIT", idempotency_key="order-1")
+            await db.commit()
+    assert await balance_of(session_factory, user_id) == 6
+    assert await _transactions(session_factory, user_id) == 1
+
+
+async def test_concurrent_debits_never_overdraw(session_factory):
+    user_id = await add_user(session_factory, balance=3)
+
+    async def debit(i):
+        async with session_factory() as db:
+            try:
+                await WalletLedger.debit(db, user_id, 1, tx_type="DEBIT", idempotency_key=f"k{i}")
+                await db.commit()
+                return True
+            except InsufficientFunds:
+                await db.rollback()
+                return False
+
+    results = await asyncio.gather(*(debit(i) for i in range(6)))
+    assert sum(results) == 3
+    assert await balance_of(session_factory, user_id) == 0
+    assert await _transactions(session_factory, user_id) == 3
+
+
+async def test_missing_wallet(session_factory):
+    async with session_factory() as db:
+        with pytest.raises(WalletNotFound):
+            await WalletLedger.debit(db, "no-such-user", 1, tx_type="DEBIT")
+
+
+async def test_credit_can_create_wallet(session_factory):
+    from app.infrastructure.db.models.wallet import Wallet
+
+    user_id = await add_user(session_factory, balance=0)
+    async with session_factory() as db:
+        await db.execute(Wallet.__table__.delete().where(Wallet.user_id == user_id))
+        await db.commit()
+    async with session_factory() as db:
+        result = await WalletLedger.credit(db, user_id, 7, tx_type="TOPUP", create_wallet=True)
+        await db.commit()
+    assert result.balance == 7
+    assert await balance_of(session_factory, user_id) == 7
+
+
+async def test_hold_release_and_replay(session_factory):
+    user_id = await add_user(session_factory, balance=2)
+    async with session_factory() as db:
+        held = await WalletLedger.hold(db, user_id, 2, idempotency_key="task-1")
+        replay = await WalletLedger.hold(db, user_id, 2, idempotency_key="task-1")
+        assert held.applied and held.balance == 0
+        assert not replay.applied and replay.balance == 0
+        with pytest.raises(InsufficientFunds):
+            await WalletLedger.hold(db, user_id, 1, idempotency_key="task-2")
+        assert await WalletLedger.release(db, user_id, idempotency_key="task-1")
+        assert not await WalletLedger.release(db, user_id, idempotency_key="task-1")
+        await db.commit()
+    assert await balance_of(session_factory, user_id) == 2